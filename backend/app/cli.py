@@ -0,0 +1,127 @@
+"""Command-line access to the simulation history.
+
+Run from the repository root::
+
+    python -m backend.app.cli export --format ndjson --output history.ndjson
+    python -m backend.app.cli import --input history.ndjson --batch-size 500
+    python -m backend.app.cli enable-incremental-vacuum
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import BinaryIO
+
+from . import crud
+from .db import SessionLocal, auto_vacuum_mode, enable_incremental_vacuum, get_engine
+from .export import iter_export
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--scenario-id", type=int, choices=range(1, 6))
+    parser.add_argument("--min-avg-yield", type=float)
+    parser.add_argument("--max-avg-yield", type=float)
+    parser.add_argument("--created-after", help="ISO date or timestamp")
+    parser.add_argument("--created-before", help="ISO date or timestamp")
+
+
+def _filters(args: argparse.Namespace) -> dict[str, object]:
+    return {
+        "scenario_id": args.scenario_id,
+        "min_avg_yield": args.min_avg_yield,
+        "max_avg_yield": args.max_avg_yield,
+        "created_after": (
+            crud.normalize_date_filter(args.created_after, is_end=False)
+            if args.created_after
+            else None
+        ),
+        "created_before": (
+            crud.normalize_date_filter(args.created_before, is_end=True)
+            if args.created_before
+            else None
+        ),
+    }
+
+
+def _export(args: argparse.Namespace, output: BinaryIO) -> int:
+    db = SessionLocal()
+    try:
+        records = crud.iter_simulation_records(
+            db, batch_size=args.batch_size, **_filters(args)
+        )
+        for chunk in iter_export(records, args.format):
+            output.write(chunk)
+    finally:
+        db.close()
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        if args.input == "-":
+            report = crud.import_simulations(db, sys.stdin.buffer, args.batch_size)
+        else:
+            with open(args.input, "rb") as handle:
+                report = crud.import_simulations(db, handle, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser(
+        "export", help="stream stored simulations as NDJSON or CSV"
+    )
+    export_parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    export_parser.add_argument("--output", help="file to write (default: stdout)")
+    export_parser.add_argument("--batch-size", type=int, default=1000)
+    _add_filter_arguments(export_parser)
+
+    import_parser = commands.add_parser(
+        "import", help="load NDJSON simulations (as written by export)"
+    )
+    import_parser.add_argument("--input", default="-", help="file to read (default: stdin)")
+    import_parser.add_argument("--batch-size", type=int, default=500)
+
+    commands.add_parser(
+        "enable-incremental-vacuum",
+        help="convert an existing SQLite database to auto_vacuum=INCREMENTAL "
+        "(one full VACUUM; stop the server first)",
+    )
+
+    return parser
+
+
+def _enable_incremental_vacuum() -> int:
+    engine = get_engine()
+    before = auto_vacuum_mode(engine)
+    converted = enable_incremental_vacuum(engine)
+    report = {"before": before, "after": auto_vacuum_mode(engine), "converted": converted}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "export":
+        if args.output:
+            with open(args.output, "wb") as handle:
+                return _export(args, handle)
+        return _export(args, sys.stdout.buffer)
+    if args.command == "import":
+        return _import(args)
+    if args.command == "enable-incremental-vacuum":
+        return _enable_incremental_vacuum()
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,36 @@
 from __future__ import annotations
 
 import uuid
+from itertools import groupby
+from typing import Callable, Iterable, Iterator
 
+from pydantic import ValidationError
 from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
 from . import models, schemas
+from .simulation.cancellation import CancellationToken
+from .simulation.engine import (
+    CHECKSUM_PREFIX,
+    aggregate_stats,
+    build_runs,
+    combine_run_checksums,
+    regenerate_run_seasons,
+    run_checksum,
+    season_checksum,
+)
+from .simulation.stats import RunningStats
+
+
+class ChecksumMismatchError(ValueError):
+    """Regenerated seasons do not match the checksum stored for a simulation."""
+
+
+def normalize_date_filter(value: str, is_end: bool) -> str:
+    if len(value) == 10:
+        return f"{value}T23:59:59.999Z" if is_end else f"{value}T00:00:00.000Z"
+    return value
 
 
 def _build_simulation_filters(
@@ -33,58 +58,318 @@ def _build_simulation_filters(
     return clauses, needs_run_join
 
 
-def create_simulation(db: Session, payload: schemas.SimulationCreate) -> models.Simulation:
+def _season_key(season) -> tuple[int, str, float]:
+    if isinstance(season, dict):
+        return season["season_index"], season["rainfall"], season["yield_amount"]
+    return season.season_index, season.rainfall, season.yield_amount
+
+
+def _run_settings(run) -> tuple[int, int, int, int]:
+    if isinstance(run, dict):
+        return run["run_index"], run["prob_low"], run["prob_normal"], run["prob_high"]
+    return run.run_index, run.prob_low, run.prob_normal, run.prob_high
+
+
+def _runs_checksum(runs, seasons_by_run: list[list], like: str | None = None) -> str:
+    """Checksum of the runs' seasons, in the v1 format if ``like`` is a v1 checksum."""
+    if like is not None and not like.startswith(CHECKSUM_PREFIX):
+        ordered = sorted(
+            zip(runs, seasons_by_run), key=lambda pair: _run_settings(pair[0])[0]
+        )
+        return season_checksum(
+            (_run_settings(run)[0], (_season_key(season) for season in seasons))
+            for run, seasons in ordered
+        )
+    return combine_run_checksums(
+        run_checksum(_run_settings(run)[0], (_season_key(season) for season in seasons))
+        for run, seasons in zip(runs, seasons_by_run)
+    )
+
+
+def _season_stats(seasons_by_run: Iterable[list]) -> tuple[RunningStats, int]:
+    yields: list[float] = []
+    low_season_count = 0
+    for seasons in seasons_by_run:
+        for season in seasons:
+            _, rainfall, yield_amount = _season_key(season)
+            yields.append(yield_amount)
+            if rainfall == "low":
+                low_season_count += 1
+    return RunningStats.from_values(yields), low_season_count
+
+
+def _regenerate_seasons(seed: int, num_seasons: int, runs) -> list[list[dict[str, object]]]:
+    regenerated = []
+    for run in runs:
+        run_index, prob_low, prob_normal, prob_high = _run_settings(run)
+        regenerated.append(
+            regenerate_run_seasons(
+                seed=seed,
+                run_index=run_index,
+                num_seasons=num_seasons,
+                probabilities=schemas.RainfallProbabilities(
+                    low=prob_low, normal=prob_normal, high=prob_high
+                ),
+            )
+        )
+    return regenerated
+
+
+def _prepare_simulation(
+    payload: schemas.SimulationCreate, simulation_id: str, trusted: bool
+) -> tuple[dict[str, object], list[tuple[dict[str, object], list[dict[str, object]]]]]:
+    """Turn a payload into insert rows: the simulation and ``(run, seasons)`` pairs."""
+    checksum = payload.checksum
+    seasons_by_run: list[list] | None = None
+    if any(run.seasons for run in payload.runs):
+        seasons_by_run = [run.seasons for run in payload.runs]
+        computed = _runs_checksum(payload.runs, seasons_by_run, like=checksum)
+        if checksum is not None and checksum != computed:
+            raise ValueError("checksum does not match the seasons")
+        checksum = computed
+
+    store_seasons = payload.storage_mode == "full"
+    if not store_seasons and not trusted:
+        regenerated = _regenerate_seasons(payload.seed, payload.num_seasons, payload.runs)
+        if _runs_checksum(payload.runs, regenerated, like=checksum) != checksum:
+            raise ValueError("seasons cannot be regenerated from the seed")
+        seasons_by_run = regenerated
+
+    stats, low_season_count = (
+        _season_stats(seasons_by_run) if seasons_by_run is not None else (None, None)
+    )
+
+    simulation = {
+        "id": simulation_id,
+        "name": payload.name,
+        "run_mode": payload.run_mode,
+        "storage_mode": payload.storage_mode,
+        "checksum": checksum,
+        "num_seasons": payload.num_seasons,
+        "num_replications": payload.num_replications,
+        "seed": payload.seed,
+        "average_yield": payload.average_yield,
+        "min_yield": payload.min_yield,
+        "max_yield": payload.max_yield,
+        "yield_variability": payload.yield_variability,
+        "low_yield_percent": payload.low_yield_percent,
+        "yield_sum": stats.total if stats else None,
+        "yield_m2": stats.m2 if stats else None,
+        "low_season_count": low_season_count,
+    }
+    if payload.created_at is not None:
+        simulation["created_at"] = payload.created_at
+
+    return simulation, _run_rows(simulation_id, payload.runs, store_seasons)
+
+
+def _run_rows(
+    simulation_id: str, runs: Iterable[schemas.SimulationRunCreate], store_seasons: bool
+) -> list[tuple[dict[str, object], list[dict[str, object]]]]:
+    return [
+        (
+            {
+                "simulation_id": simulation_id,
+                "run_index": run.run_index,
+                "scenario_id": run.scenario_id,
+                "prob_low": run.prob_low,
+                "prob_normal": run.prob_normal,
+                "prob_high": run.prob_high,
+                "average_yield": run.average_yield,
+                "min_yield": run.min_yield,
+                "max_yield": run.max_yield,
+                "yield_variability": run.yield_variability,
+                "low_yield_percent": run.low_yield_percent,
+            },
+            [
+                {
+                    "season_index": season.season_index,
+                    "rainfall": season.rainfall,
+                    "yield_amount": season.yield_amount,
+                }
+                for season in run.seasons
+            ]
+            if store_seasons
+            else [],
+        )
+        for run in runs
+    ]
+
+
+def _insert_simulations(db: Session, prepared: list) -> None:
+    """Insert prepared simulations with one executemany per table.
+
+    Core inserts skip the ORM unit of work; run ids are read back with one
+    query so season rows can reference them.
+    """
+    if not prepared:
+        return
+    simulation_table = models.Simulation.__table__
+
+    simulations = [simulation for simulation, _ in prepared]
+    # executemany needs one key set; rows without created_at use the default.
+    for group in (
+        [row for row in simulations if "created_at" in row],
+        [row for row in simulations if "created_at" not in row],
+    ):
+        if group:
+            db.execute(simulation_table.insert(), group)
+
+    _insert_runs(db, [pair for _, run_pairs in prepared for pair in run_pairs])
+
+
+def _insert_runs(
+    db: Session,
+    run_pairs: list[tuple[dict[str, object], list[dict[str, object]]]],
+    min_run_index: int = 0,
+) -> None:
+    """Insert ``(run, seasons)`` rows; runs below ``min_run_index`` already exist."""
+    if not run_pairs:
+        return
+    run_table = models.SimulationRun.__table__
+    season_table = models.SeasonResult.__table__
+
+    db.execute(run_table.insert(), [run for run, _ in run_pairs])
+
+    simulation_ids = list({run["simulation_id"] for run, _ in run_pairs})
+    run_ids = {
+        (simulation_id, run_index): run_id
+        for run_id, simulation_id, run_index in db.execute(
+            select(run_table.c.id, run_table.c.simulation_id, run_table.c.run_index).where(
+                run_table.c.simulation_id.in_(simulation_ids),
+                run_table.c.run_index >= min_run_index,
+            )
+        )
+    }
+    season_rows = [
+        {
+            "simulation_run_id": run_ids[(run["simulation_id"], run["run_index"])],
+            "season_index": season["season_index"],
+            "rainfall": season["rainfall"],
+            "yield": season["yield_amount"],
+        }
+        for run, seasons in run_pairs
+        for season in seasons
+    ]
+    if season_rows:
+        db.execute(season_table.insert(), season_rows)
+
+
+def create_simulation(
+    db: Session, payload: schemas.SimulationCreate, trusted: bool = False
+) -> models.Simulation:
+    """Store a simulation.
+
+    ``recompute`` simulations keep only the simulation and run rows plus a
+    checksum of the seasons. Unless the payload comes straight from the engine
+    (``trusted``), the seasons are regenerated once to make sure they can be.
+    """
     simulation_id = payload.id or str(uuid.uuid4())
 
     existing = db.get(models.Simulation, simulation_id)
     if existing:
         raise ValueError(f"simulation {simulation_id} already exists")
 
-    simulation = models.Simulation(
-        id=simulation_id,
-        name=payload.name,
-        run_mode=payload.run_mode,
-        num_seasons=payload.num_seasons,
-        num_replications=payload.num_replications,
-        seed=payload.seed,
-        average_yield=payload.average_yield,
-        min_yield=payload.min_yield,
-        max_yield=payload.max_yield,
-        yield_variability=payload.yield_variability,
-        low_yield_percent=payload.low_yield_percent,
+    _insert_simulations(db, [_prepare_simulation(payload, simulation_id, trusted)])
+    db.commit()
+    return get_simulation(db, simulation_id)
+
+
+MAX_IMPORT_ERRORS = 1000
+
+
+def new_import_report() -> dict[str, object]:
+    return {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+
+
+def _record_import_error(
+    report: dict[str, object],
+    outcome: str,
+    line: int,
+    simulation_id: str | None,
+    error: str,
+) -> None:
+    report[outcome] += 1
+    errors = report["errors"]
+    if len(errors) < MAX_IMPORT_ERRORS:
+        errors.append({"line": line, "id": simulation_id, "error": error})
+
+
+def import_simulation_batch(
+    db: Session,
+    lines: list[tuple[int, str | bytes]],
+    report: dict[str, object],
+) -> None:
+    """Validate and insert one batch of NDJSON ``SimulationCreate`` records.
+
+    Existing ids are looked up with a single ``IN`` query and the batch is
+    committed once. If the commit fails, the batch is retried record by
+    record so only the offending records are reported as failed.
+    """
+    pending: list[tuple[int, str, schemas.SimulationCreate]] = []
+    for line, raw in lines:
+        try:
+            payload = schemas.SimulationCreate.model_validate_json(raw)
+        except ValidationError as exc:
+            _record_import_error(report, "failed", line, None, schemas.format_validation_error(exc))
+            continue
+        pending.append((line, payload.id or str(uuid.uuid4()), payload))
+
+    ids = [simulation_id for _, simulation_id, _ in pending]
+    existing = set(
+        db.scalars(select(models.Simulation.id).where(models.Simulation.id.in_(ids)))
     )
-    db.add(simulation)
-    db.flush()
-
-    for run in payload.runs:
-        db_run = models.SimulationRun(
-            simulation_id=simulation.id,
-            run_index=run.run_index,
-            scenario_id=run.scenario_id,
-            prob_low=run.prob_low,
-            prob_normal=run.prob_normal,
-            prob_high=run.prob_high,
-            average_yield=run.average_yield,
-            min_yield=run.min_yield,
-            max_yield=run.max_yield,
-            yield_variability=run.yield_variability,
-            low_yield_percent=run.low_yield_percent,
-        )
-        db.add(db_run)
-        db.flush()
-
-        for season in run.seasons:
-            db_season = models.SeasonResult(
-                simulation_run_id=db_run.id,
-                season_index=season.season_index,
-                rainfall=season.rainfall,
-                yield_amount=season.yield_amount,
+    accepted: list[tuple[int, str]] = []
+    prepared = []
+    for line, simulation_id, payload in pending:
+        if simulation_id in existing:
+            _record_import_error(
+                report, "skipped", line, simulation_id, "simulation already exists"
             )
-            db.add(db_season)
+            continue
+        try:
+            prepared.append(_prepare_simulation(payload, simulation_id, False))
+        except ValueError as exc:
+            _record_import_error(report, "failed", line, simulation_id, str(exc))
+            continue
+        accepted.append((line, simulation_id))
+        existing.add(simulation_id)
 
-    db.commit()
-    db.refresh(simulation)
-    return simulation
+    if not prepared:
+        return
+    try:
+        _insert_simulations(db, prepared)
+        db.commit()
+        report["imported"] += len(prepared)
+        return
+    except IntegrityError:
+        db.rollback()
+
+    for (line, simulation_id), item in zip(accepted, prepared):
+        try:
+            _insert_simulations(db, [item])
+            db.commit()
+            report["imported"] += 1
+        except IntegrityError as exc:
+            db.rollback()
+            _record_import_error(report, "failed", line, simulation_id, str(exc.orig))
+
+
+def import_simulations(
+    db: Session, lines: Iterable[str | bytes], batch_size: int = 500
+) -> dict[str, object]:
+    report = new_import_report()
+    batch: list[tuple[int, str | bytes]] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) >= batch_size:
+            import_simulation_batch(db, batch, report)
+            batch = []
+    if batch:
+        import_simulation_batch(db, batch, report)
+    return report
 
 
 def get_simulation(db: Session, simulation_id: str) -> models.Simulation | None:
@@ -100,6 +385,52 @@ def get_simulation(db: Session, simulation_id: str) -> models.Simulation | None:
     return db.scalars(stmt).first()
 
 
+def read_simulation(db: Session, simulation_id: str) -> schemas.SimulationRead | None:
+    """Load a simulation for the API, regenerating seasons of ``recompute`` rows."""
+    simulation = get_simulation(db, simulation_id)
+    if not simulation:
+        return None
+    result = schemas.SimulationRead.model_validate(simulation)
+    if simulation.storage_mode != "recompute":
+        return result
+
+    regenerated = _regenerate_seasons(
+        simulation.seed, simulation.num_seasons, simulation.runs
+    )
+    if (
+        _runs_checksum(simulation.runs, regenerated, like=simulation.checksum)
+        != simulation.checksum
+    ):
+        raise ChecksumMismatchError(
+            f"simulation {simulation_id} does not match its stored checksum"
+        )
+    result.runs = [
+        run.model_copy(
+            update={
+                "seasons": [
+                    schemas.SeasonResultRead.model_validate(season) for season in seasons
+                ]
+            }
+        )
+        for run, seasons in zip(result.runs, regenerated)
+    ]
+    return result
+
+
+def get_simulation_revision(
+    db: Session, simulation_id: str
+) -> tuple[int, str, str | None] | None:
+    """``(version, created_at, checksum)`` of a simulation, read without its runs."""
+    row = db.execute(
+        select(
+            models.Simulation.version,
+            models.Simulation.created_at,
+            models.Simulation.checksum,
+        ).where(models.Simulation.id == simulation_id)
+    ).first()
+    return tuple(row) if row is not None else None
+
+
 def get_simulations(
     db: Session,
     limit: int = 20,
@@ -143,6 +474,126 @@ def get_simulations(
     return list(db.scalars(stmt).all())
 
 
+_SIMULATION_EXPORT_FIELDS = (
+    "id",
+    "name",
+    "created_at",
+    "run_mode",
+    "storage_mode",
+    "checksum",
+    "num_seasons",
+    "num_replications",
+    "seed",
+    "average_yield",
+    "min_yield",
+    "max_yield",
+    "yield_variability",
+    "low_yield_percent",
+)
+_RUN_EXPORT_FIELDS = (
+    "run_index",
+    "scenario_id",
+    "prob_low",
+    "prob_normal",
+    "prob_high",
+    "average_yield",
+    "min_yield",
+    "max_yield",
+    "yield_variability",
+    "low_yield_percent",
+)
+
+
+def iter_simulation_records(
+    db: Session,
+    batch_size: int = 1000,
+    scenario_id: int | None = None,
+    min_avg_yield: float | None = None,
+    max_avg_yield: float | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+) -> Iterator[dict[str, object]]:
+    """Stream matching simulations with their runs and seasons, one at a time.
+
+    One joined query is read through a server-side cursor (``yield_per``) and
+    grouped as it arrives, so memory is bounded by the largest simulation.
+    Records use the ``SimulationCreate`` field names plus ``created_at``;
+    seasons of ``recompute`` simulations are regenerated from the seed.
+    """
+    simulation = models.Simulation.__table__
+    run = models.SimulationRun.__table__
+    season = models.SeasonResult.__table__
+
+    stmt = select(
+        *(simulation.c[name].label(f"sim_{name}") for name in _SIMULATION_EXPORT_FIELDS),
+        run.c.id.label("run_id"),
+        *(run.c[name].label(f"run_{name}") for name in _RUN_EXPORT_FIELDS),
+        season.c.season_index,
+        season.c.rainfall,
+        season.c["yield"].label("yield_amount"),
+    ).select_from(
+        simulation.outerjoin(run, run.c.simulation_id == simulation.c.id).outerjoin(
+            season, season.c.simulation_run_id == run.c.id
+        )
+    )
+
+    clauses, needs_run_join = _build_simulation_filters(
+        scenario_id,
+        min_avg_yield,
+        max_avg_yield,
+        created_after,
+        created_before,
+    )
+    if clauses:
+        matching = select(models.Simulation.id)
+        if needs_run_join:
+            matching = matching.join(models.SimulationRun)
+        for clause in clauses:
+            matching = matching.where(clause)
+        stmt = stmt.where(simulation.c.id.in_(matching))
+    stmt = stmt.order_by(simulation.c.id, run.c.id, season.c.id)
+
+    rows = db.execute(stmt, execution_options={"yield_per": batch_size})
+    for _, simulation_rows in groupby(rows, key=lambda row: row.sim_id):
+        record: dict[str, object] | None = None
+        runs: list[dict[str, object]] = []
+        for run_id, run_rows in groupby(simulation_rows, key=lambda row: row.run_id):
+            run_rows = list(run_rows)
+            first = run_rows[0]
+            if record is None:
+                record = {
+                    name: getattr(first, f"sim_{name}") for name in _SIMULATION_EXPORT_FIELDS
+                }
+            if run_id is None:
+                continue
+            runs.append(
+                {
+                    **{name: getattr(first, f"run_{name}") for name in _RUN_EXPORT_FIELDS},
+                    "seasons": [
+                        {
+                            "season_index": row.season_index,
+                            "rainfall": row.rainfall,
+                            "yield_amount": row.yield_amount,
+                        }
+                        for row in run_rows
+                        if row.season_index is not None
+                    ],
+                }
+            )
+        if record is None:
+            continue
+        if record["storage_mode"] == "recompute" and runs:
+            regenerated = _regenerate_seasons(record["seed"], record["num_seasons"], runs)
+            if _runs_checksum(runs, regenerated, like=record["checksum"]) != record["checksum"]:
+                raise ChecksumMismatchError(
+                    f"simulation {record['id']} does not match its stored checksum"
+                )
+            for run, seasons in zip(runs, regenerated):
+                run["seasons"] = seasons
+        record["runs"] = runs
+        yield record
+
+
 def get_simulation_count(
     db: Session,
     scenario_id: int | None = None,
@@ -184,9 +635,80 @@ def delete_simulation(db: Session, simulation_id: str) -> bool:
 
 
 def delete_all_simulations(db: Session) -> int:
-    result = db.execute(delete(models.Simulation))
-    db.commit()
-    return int(result.rowcount or 0)
+    return delete_simulations_in_chunks(db)
+
+
+def delete_simulations_in_chunks(
+    db: Session,
+    chunk_size: int = 100,
+    season_chunk_size: int = 5000,
+    scenario_id: int | None = None,
+    min_avg_yield: float | None = None,
+    max_avg_yield: float | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Delete matching simulations in short transactions.
+
+    Each transaction removes at most ``season_chunk_size`` season rows or one
+    chunk of simulations and their runs, so other writers get the SQLite write
+    lock between chunks instead of waiting for one large cascading delete.
+    """
+    clauses, needs_run_join = _build_simulation_filters(
+        scenario_id,
+        min_avg_yield,
+        max_avg_yield,
+        created_after,
+        created_before,
+    )
+    deleted = 0
+
+    while True:
+        stmt = select(models.Simulation.id)
+        if needs_run_join:
+            stmt = stmt.join(models.SimulationRun).distinct()
+        for clause in clauses:
+            stmt = stmt.where(clause)
+        simulation_ids = list(db.scalars(stmt.limit(chunk_size)).all())
+        if not simulation_ids:
+            break
+
+        run_ids = select(models.SimulationRun.id).where(
+            models.SimulationRun.simulation_id.in_(simulation_ids)
+        )
+        while True:
+            season_ids = (
+                select(models.SeasonResult.id)
+                .where(models.SeasonResult.simulation_run_id.in_(run_ids))
+                .limit(season_chunk_size)
+            )
+            result = db.execute(
+                delete(models.SeasonResult)
+                .where(models.SeasonResult.id.in_(season_ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if not result.rowcount:
+                break
+
+        db.execute(
+            delete(models.SimulationRun)
+            .where(models.SimulationRun.simulation_id.in_(simulation_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(models.Simulation)
+            .where(models.Simulation.id.in_(simulation_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        deleted += len(simulation_ids)
+        if on_progress is not None:
+            on_progress(deleted)
+
+    return deleted
 
 
 def update_simulation(
@@ -197,6 +719,134 @@ def update_simulation(
         return None
     if payload.name is not None:
         simulation.name = payload.name
+    simulation.version = models.Simulation.version + 1
+    db.commit()
+    db.refresh(simulation)
+    return simulation
+
+
+class SimulationExtensionError(ValueError):
+    """A simulation cannot be extended with more replications."""
+
+
+def _rebuild_summary(
+    db: Session, simulation: models.Simulation
+) -> tuple[RunningStats, int, str]:
+    """Season statistics and a v2 checksum for a simulation stored without them."""
+    runs = db.scalars(
+        select(models.SimulationRun)
+        .where(models.SimulationRun.simulation_id == simulation.id)
+        .order_by(models.SimulationRun.run_index)
+        .options(selectinload(models.SimulationRun.seasons))
+    ).all()
+    if simulation.storage_mode == "recompute":
+        seasons_by_run = _regenerate_seasons(simulation.seed, simulation.num_seasons, runs)
+        if (
+            _runs_checksum(runs, seasons_by_run, like=simulation.checksum)
+            != simulation.checksum
+        ):
+            raise ChecksumMismatchError(
+                f"simulation {simulation.id} does not match its stored checksum"
+            )
+    else:
+        seasons_by_run = [run.seasons for run in runs]
+    stats, low_season_count = _season_stats(seasons_by_run)
+    return stats, low_season_count, _runs_checksum(runs, seasons_by_run)
+
+
+def extend_simulation(
+    db: Session,
+    simulation_id: str,
+    additional_replications: int,
+    cancel: CancellationToken | None = None,
+) -> models.Simulation | None:
+    """Append replications to a stored single-scenario simulation.
+
+    Run ``i`` only depends on ``seed + i``, so only the new runs are simulated.
+    They are merged into the stored aggregates through the simulation's running
+    statistics and per-run checksum; simulations stored before those existed
+    have them rebuilt from their seasons once. A concurrent extension of the
+    same simulation makes the later one fail with ``SimulationExtensionError``.
+    """
+    simulation = db.get(models.Simulation, simulation_id)
+    if not simulation:
+        return None
+    if simulation.run_mode != "single":
+        raise SimulationExtensionError("only single-scenario simulations can be extended")
+    if simulation.seed is None:
+        raise SimulationExtensionError("simulations without a seed cannot be extended")
+    last_run = db.scalars(
+        select(models.SimulationRun)
+        .where(models.SimulationRun.simulation_id == simulation_id)
+        .order_by(models.SimulationRun.run_index.desc())
+        .limit(1)
+    ).first()
+    if last_run is None:
+        raise SimulationExtensionError("simulation has no runs to extend")
+
+    if (
+        simulation.yield_sum is None
+        or simulation.yield_m2 is None
+        or simulation.low_season_count is None
+        or not (simulation.checksum or "").startswith(CHECKSUM_PREFIX)
+    ):
+        stats, low_season_count, checksum = _rebuild_summary(db, simulation)
+    else:
+        stats = RunningStats(
+            count=simulation.num_seasons * simulation.num_replications,
+            total=simulation.yield_sum,
+            m2=simulation.yield_m2,
+            minimum=simulation.min_yield,
+            maximum=simulation.max_yield,
+        )
+        low_season_count = simulation.low_season_count
+        checksum = simulation.checksum
+
+    start_index = last_run.run_index + 1
+    new_runs = [
+        schemas.SimulationRunCreate.model_validate(run)
+        for run in build_runs(
+            seed=simulation.seed,
+            start_index=start_index,
+            count=additional_replications,
+            scenario_id=last_run.scenario_id,
+            num_seasons=simulation.num_seasons,
+            probabilities=schemas.RainfallProbabilities(
+                low=last_run.prob_low, normal=last_run.prob_normal, high=last_run.prob_high
+            ),
+            cancel=cancel,
+        )
+    ]
+    new_stats, new_low_season_count = _season_stats(run.seasons for run in new_runs)
+    stats = stats.merge(new_stats)
+    low_season_count += new_low_season_count
+    checksum = combine_run_checksums(
+        (
+            run_checksum(run.run_index, (_season_key(season) for season in run.seasons))
+            for run in new_runs
+        ),
+        base=checksum,
+    )
+
+    try:
+        _insert_runs(
+            db,
+            _run_rows(simulation_id, new_runs, simulation.storage_mode == "full"),
+            min_run_index=start_index,
+        )
+    except IntegrityError:
+        db.rollback()
+        raise SimulationExtensionError(
+            "simulation was extended concurrently; retry the request"
+        ) from None
+    for name, value in aggregate_stats(stats, low_season_count).items():
+        setattr(simulation, name, value)
+    simulation.num_replications += additional_replications
+    simulation.yield_sum = stats.total
+    simulation.yield_m2 = stats.m2
+    simulation.low_season_count = low_season_count
+    simulation.checksum = checksum
+    simulation.version = models.Simulation.version + 1
     db.commit()
     db.refresh(simulation)
     return simulation
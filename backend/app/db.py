@@ -1,41 +1,168 @@
 from __future__ import annotations
 
+import logging
 import os
+import threading
 from pathlib import Path
 from typing import Generator
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
+from . import query_log
+
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 DEFAULT_DB_PATH = DATA_DIR / "rice_yield.db"
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL is None:
-    DATABASE_URL = f"sqlite+pysqlite:///{DEFAULT_DB_PATH.as_posix()}"
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def _database_url() -> str:
+    url = os.getenv("DATABASE_URL")
+    if url is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        url = f"sqlite+pysqlite:///{DEFAULT_DB_PATH.as_posix()}"
+    return url
+
+
+def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON;")
+    # Only takes effect for a database file that has no tables yet.
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+    cursor.close()
+
 
-connect_args: dict[str, object] = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def get_engine() -> Engine:
+    """Create the engine and the schema on first use.
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Nothing touches the filesystem or the database at import time, so worker
+    processes and tests only pay for it when they actually need a connection.
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _engine_lock:
+        if _engine is None:
+            url = _database_url()
+            connect_args: dict[str, object] = {}
+            if url.startswith("sqlite"):
+                connect_args = {"check_same_thread": False}
+            engine = create_engine(url, connect_args=connect_args)
+            if url.startswith("sqlite"):
+                event.listen(engine, "connect", _set_sqlite_pragma)
+            slow_query_ms = query_log.slow_query_threshold_ms()
+            if slow_query_ms is not None:
+                query_log.install(engine, slow_query_ms)
+            init_db(engine)
+            _engine = engine
+    return _engine
 
-if DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(Engine, "connect")
-    def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.close()
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw) -> Session:
+        local_kw.setdefault("bind", get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autoflush=False, autocommit=False)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def init_db(bind: Engine) -> None:
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+
+
+def add_missing_columns(bind: Engine) -> None:
+    """Add model columns missing from tables created by an older schema.
+
+    ``create_all`` only creates missing tables; new nullable or defaulted
+    columns are added in place so existing databases keep working.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+
+# PRAGMA auto_vacuum values.
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def auto_vacuum_mode(bind: Engine) -> int | None:
+    if bind.dialect.name != "sqlite":
+        return None
+    with bind.connect() as connection:
+        return int(connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() or 0)
+
+
+def enable_incremental_vacuum(bind: Engine) -> bool:
+    """Switch an existing SQLite database to ``auto_vacuum=INCREMENTAL``.
+
+    The pragma only applies to a new file, or after a full ``VACUUM``; the
+    ``VACUUM`` rewrites the whole database, needs free disk space for a copy
+    and blocks writers while it runs, so this is a one-time maintenance step.
+    Returns whether the database was converted.
+    """
+    mode = auto_vacuum_mode(bind)
+    if mode is None or mode == AUTO_VACUUM_INCREMENTAL:
+        return False
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+    return auto_vacuum_mode(bind) == AUTO_VACUUM_INCREMENTAL
+
+
+def incremental_vacuum(bind: Engine, pages_per_step: int = 1000) -> int:
+    """Return free SQLite pages to the OS a few at a time instead of a full VACUUM.
+
+    Does nothing unless the database uses ``auto_vacuum=INCREMENTAL``: new
+    databases do, older ones are converted once with ``enable_incremental_vacuum``
+    (``python -m backend.app.cli enable-incremental-vacuum``).
+    """
+    if bind.dialect.name != "sqlite":
+        return 0
+    if auto_vacuum_mode(bind) != AUTO_VACUUM_INCREMENTAL:
+        logger.warning(
+            "database does not use auto_vacuum=INCREMENTAL, so deleted pages are "
+            "not returned to the OS; run `python -m backend.app.cli "
+            "enable-incremental-vacuum` once to convert it"
+        )
+        return 0
+    released = 0
+    with bind.connect() as connection:
+        while True:
+            free_pages = int(connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0)
+            if free_pages == 0:
+                break
+            connection.exec_driver_sql(f"PRAGMA incremental_vacuum({pages_per_step})")
+            connection.commit()
+            remaining = int(connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0)
+            if remaining >= free_pages:
+                break
+            released += free_pages - remaining
+    return released
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import csv
+import io
+from typing import Iterable, Iterator, Literal
+
+from . import schemas
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = (
+    "simulation_id",
+    "name",
+    "created_at",
+    "run_mode",
+    "storage_mode",
+    "seed",
+    "num_seasons",
+    "num_replications",
+    "run_index",
+    "scenario_id",
+    "prob_low",
+    "prob_normal",
+    "prob_high",
+    "season_index",
+    "rainfall",
+    "yield",
+)
+
+
+def iter_ndjson(records: Iterable[dict[str, object]]) -> Iterator[bytes]:
+    """One ``SimulationCreate`` JSON document per line, ready for re-import."""
+    for record in records:
+        simulation = schemas.SimulationCreate.model_validate(record)
+        yield simulation.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+
+
+def iter_csv(
+    records: Iterable[dict[str, object]], rows_per_chunk: int = 1000
+) -> Iterator[bytes]:
+    """One CSV row per season, flushed every ``rows_per_chunk`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+    pending = 0
+
+    for record in records:
+        for run in record["runs"]:
+            for season in run["seasons"]:
+                writer.writerow(
+                    (
+                        record["id"],
+                        record["name"],
+                        record["created_at"],
+                        record["run_mode"],
+                        record["storage_mode"],
+                        record["seed"],
+                        record["num_seasons"],
+                        record["num_replications"],
+                        run["run_index"],
+                        run["scenario_id"],
+                        run["prob_low"],
+                        run["prob_normal"],
+                        run["prob_high"],
+                        season["season_index"],
+                        season["rainfall"],
+                        season["yield_amount"],
+                    )
+                )
+                pending += 1
+                if pending >= rows_per_chunk:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+                    pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_export(
+    records: Iterable[dict[str, object]], export_format: ExportFormat
+) -> Iterator[bytes]:
+    if export_format == "csv":
+        return iter_csv(records)
+    return iter_ndjson(records)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response, status
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CACHE_CONTROL = "no-cache"
+GZIP_CODING = "gzip"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag for the identity-coded representation identified by ``parts``.
+
+    A strong tag promises byte-identical bodies, so a response sent with a
+    ``Content-Encoding`` must carry ``coded_etag(etag, coding)`` instead.
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """``etag`` for the same representation sent with ``Content-Encoding: coding``."""
+    return f'{etag[:-1]}-{coding}"'
+
+
+def if_none_match_tags(request: Request) -> set[str]:
+    header = request.headers.get("if-none-match", "")
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    return {
+        candidate.strip().removeprefix("W/")
+        for candidate in header.split(",")
+        if candidate.strip()
+    }
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` names ``etag`` in any content coding (or is ``*``)."""
+    candidates = if_none_match_tags(request)
+    if "*" in candidates:
+        return True
+    return etag in candidates or coded_etag(etag, GZIP_CODING) in candidates
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
+
+
+class CodedETagMiddleware:
+    """Gives responses compressed by an inner ``GZipMiddleware`` their own ETag.
+
+    Compression happens after the endpoint has tagged the identity body, so the
+    tag is rewritten here to ``coded_etag(etag, coding)``, and every tagged
+    response gets ``Vary: Accept-Encoding``. A ``304`` answering a coded tag
+    echoes that tag, since it has no body for the compressor to mark.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_coded_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                if etag is not None:
+                    headers.add_vary_header("Accept-Encoding")
+                    coding = headers.get("content-encoding")
+                    if coding:
+                        headers["etag"] = coded_etag(etag, coding)
+                    elif message["status"] == status.HTTP_304_NOT_MODIFIED:
+                        gzipped = coded_etag(etag, GZIP_CODING)
+                        if gzipped in if_none_match_tags(Request(scope)):
+                            headers["etag"] = gzipped
+            await send(message)
+
+        await self.app(scope, receive, send_with_coded_etag)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Literal
+
+from sqlalchemy import delete, select, update
+
+from . import crud, models
+from .db import SessionLocal, get_engine, incremental_vacuum
+
+JobStatus = Literal["pending", "running", "vacuuming", "completed", "failed"]
+
+
+@dataclass
+class DeletionJob:
+    id: str
+    total: int
+    filters: dict[str, object] = field(default_factory=dict)
+    status: JobStatus = "pending"
+    deleted: int = 0
+    error: str | None = None
+
+
+MAX_TRACKED_JOBS = 100
+
+_FINISHED = ("completed", "failed")
+
+
+def _snapshot(row: models.DeletionJob) -> DeletionJob:
+    return DeletionJob(
+        id=row.id,
+        total=row.total,
+        filters=dict(row.filters),
+        status=row.status,
+        deleted=row.deleted,
+        error=row.error,
+    )
+
+
+def create_deletion_job(total: int, filters: dict[str, object]) -> DeletionJob:
+    """Record a pending job, dropping the oldest finished ones beyond the limit.
+
+    Jobs live in the ``deletion_jobs`` table, so their status can be read from
+    any worker process.
+    """
+    job = DeletionJob(id=uuid.uuid4().hex, total=total, filters=dict(filters))
+    with SessionLocal() as db:
+        table = models.DeletionJob
+        stale = (
+            select(table.id)
+            .where(table.status.in_(_FINISHED))
+            .order_by(table.created_at.desc())
+            .offset(MAX_TRACKED_JOBS - 1)
+        )
+        db.execute(delete(table).where(table.id.in_(stale)))
+        db.add(
+            models.DeletionJob(
+                id=job.id,
+                status=job.status,
+                total=job.total,
+                deleted=job.deleted,
+                filters=job.filters,
+            )
+        )
+        db.commit()
+    return job
+
+
+def get_job(job_id: str) -> DeletionJob | None:
+    with SessionLocal() as db:
+        row = db.get(models.DeletionJob, job_id)
+        return _snapshot(row) if row is not None else None
+
+
+def _update(job: DeletionJob, **changes: object) -> None:
+    for key, value in changes.items():
+        setattr(job, key, value)
+    with SessionLocal() as db:
+        db.execute(
+            update(models.DeletionJob)
+            .where(models.DeletionJob.id == job.id)
+            .values(**changes)
+        )
+        db.commit()
+
+
+def run_deletion_job(job_id: str, chunk_size: int) -> None:
+    """Delete the job's simulations chunk by chunk, then reclaim free pages."""
+    job = get_job(job_id)
+    if job is None:
+        return
+
+    _update(job, status="running")
+    db = SessionLocal()
+    try:
+        crud.delete_simulations_in_chunks(
+            db,
+            chunk_size=chunk_size,
+            on_progress=lambda deleted: _update(job, deleted=deleted),
+            **job.filters,
+        )
+        _update(job, status="vacuuming")
+        incremental_vacuum(get_engine())
+    except Exception as exc:
+        db.rollback()
+        _update(job, status="failed", error=str(exc))
+        return
+    finally:
+        db.close()
+    _update(job, status="completed")
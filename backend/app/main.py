@@ -1,21 +1,63 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Literal
-
-from fastapi import Depends, FastAPI, HTTPException, Query, status
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterator, Literal, TypeVar
+
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from . import crud, schemas
-from .db import Base, engine, get_db
-from .simulation.engine import SCENARIOS, YIELD_BY_RAINFALL, build_simulation_payload
-from .simulation import arena_engine
+from . import crud, jobs, query_log, schemas
+from .db import SessionLocal, get_db, get_engine, incremental_vacuum
+from .export import MEDIA_TYPES, ExportFormat, iter_export
+from .http_cache import (
+    CodedETagMiddleware,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
+from .serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    TrustedJSONResponse,
+    negotiate_media_type,
+    sse_event,
+    to_columns,
+    trusted_response,
+)
+from .simulation.engine import YIELD_BY_RAINFALL, build_simulation_payload
+from .simulation import arena_engine, fields, historical, presets
+from .simulation.cancellation import CancellationToken, Cancelled
+from .simulation.presets import list_presets_for_api
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Rice Yield Explorer API")
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Connect (and create the schema) once per worker before serving traffic
+    # rather than at import time.
+    await run_in_threadpool(get_engine)
+    yield
+
+
+app = FastAPI(title="Rice Yield Explorer API", lifespan=lifespan)
 
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:8080")
 allowed_origins = [origin.strip() for origin in cors_origins.split(",") if origin.strip()]
@@ -28,6 +70,21 @@ if allowed_origins:
         allow_headers=["*"],
     )
 
+# Responses smaller than this are sent uncompressed; the saving would not
+# cover the extra header and CPU time.
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+if GZIP_MINIMUM_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=6)
+    # Added after (so wrapping) the compressor, to see its Content-Encoding.
+    app.add_middleware(CodedETagMiddleware)
+
+# Counts each endpoint's statements; a no-op unless SLOW_QUERY_MS is set.
+app.add_middleware(query_log.QueryLogMiddleware)
+
+# Large-result endpoints answer in JSON, columnar JSON or MessagePack
+# depending on the Accept header, so caches must key on it.
+VARY_ACCEPT = {"Vary": "Accept"}
+
 
 @app.get("/")
 def root() -> dict[str, str]:
@@ -48,37 +105,295 @@ def health(db: Session = Depends(get_db)) -> dict[str, str]:
         return {"status": "degraded", "database": "error"}
 
 
+@lru_cache(maxsize=1)
+def _scenario_models() -> list[schemas.Scenario]:
+    return [
+        schemas.Scenario.model_validate(scenario) for scenario in list_presets_for_api()
+    ]
+
+
+presets.registry.subscribe(lambda _table: _scenario_models.cache_clear())
+
+
 @app.get("/api/scenarios", response_model=list[schemas.Scenario])
-def list_scenarios() -> list[schemas.Scenario]:
-    return [schemas.Scenario.model_validate(scenario) for scenario in SCENARIOS]
+def list_scenarios(
+    request: Request, response: Response
+) -> list[schemas.Scenario] | Response:
+    # Checking the registry first picks up an edited presets file, which
+    # clears the cached models through the subscription above.
+    etag = make_etag("scenarios", presets.registry.table().digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    return _scenario_models()
+
+
+@app.post("/api/admin/presets/reload", response_model=schemas.PresetReloadResponse)
+def reload_presets() -> schemas.PresetReloadResponse:
+    try:
+        table = presets.registry.reload()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        )
+    return schemas.PresetReloadResponse(digest=table.digest, presets=len(table.presets))
+
+
+@app.get("/api/debug/queries", response_model=schemas.QueryLogResponse)
+def get_query_log() -> dict[str, object]:
+    if not query_log.enabled():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Query logging is disabled; set SLOW_QUERY_MS to enable it",
+        )
+    return query_log.snapshot()
+
+
+@app.delete("/api/debug/queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_query_log() -> None:
+    query_log.reset()
+    return None
 
 
 @app.get("/api/yield-by-rainfall", response_model=schemas.YieldByRainfall)
-def get_yield_by_rainfall() -> schemas.YieldByRainfall:
+def get_yield_by_rainfall(
+    request: Request, response: Response
+) -> schemas.YieldByRainfall | Response:
+    etag = make_etag("yield-by-rainfall", sorted(YIELD_BY_RAINFALL.items()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
     return schemas.YieldByRainfall.model_validate(YIELD_BY_RAINFALL)
 
 
+T = TypeVar("T")
+
+# Upper bound on the engine time of one request; 0 disables it. Work is also
+# cancelled as soon as the client disconnects.
+SIMULATION_TIMEOUT = float(os.getenv("SIMULATION_TIMEOUT_SECONDS", "60"))
+DISCONNECT_POLL_INTERVAL = 0.05
+
+
+def _new_token() -> CancellationToken:
+    return CancellationToken(timeout=SIMULATION_TIMEOUT or None)
+
+
+async def _cancel_on_disconnect(request: Request, token: CancellationToken) -> None:
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel("client disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _run_cancellable(
+    request: Request, func: Callable[..., T], *args: object, **kwargs: object
+) -> T:
+    """Run an engine call in the thread pool with a token the engine checks
+    between replications; it is tripped on disconnect or timeout."""
+    token = _new_token()
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, token))
+    try:
+        return await run_in_threadpool(func, *args, cancel=token, **kwargs)
+    except Cancelled as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        )
+    finally:
+        token.cancel()
+        watcher.cancel()
+
+
+def _simulate_kwargs(payload: schemas.SimulateRequest) -> dict[str, object]:
+    return {
+        "scenario": payload.scenario,
+        "seasons": payload.seasons,
+        "replications": payload.replications,
+        "probabilities": (
+            payload.probabilities.model_dump() if payload.probabilities else None
+        ),
+        "categories": (
+            [category.model_dump(by_alias=True) for category in payload.categories]
+            if payload.categories
+            else None
+        ),
+        "historical": payload.historical.model_dump() if payload.historical else None,
+        "chart": payload.chart.model_dump() if payload.chart else None,
+        "seed": payload.seed,
+        "include_rows": bool(payload.include_rows),
+        "time_budget_ms": payload.time_budget_ms,
+        "sampling": payload.sampling,
+        "rng_kind": payload.rng,
+        "risk": payload.risk.model_dump() if payload.risk else None,
+    }
+
+
+def _compare_kwargs(payload: schemas.CompareRequest) -> dict[str, object]:
+    return {
+        "seasons": payload.seasons,
+        "replications": payload.replications,
+        "seed": payload.seed,
+        "time_budget_ms": payload.time_budget_ms,
+        "sampling": payload.sampling,
+        "rng_kind": payload.rng,
+        "risk": payload.risk.model_dump() if payload.risk else None,
+        "bootstrap": payload.bootstrap.model_dump() if payload.bootstrap else None,
+    }
+
+
+async def _open_historical(payload: schemas.SimulateRequest) -> None:
+    # Maps (and converts a CSV for) the series up front, so a missing series is
+    # a 422 rather than an error halfway through a response or stream.
+    if payload.historical is None:
+        return
+    try:
+        await run_in_threadpool(historical.open_series, payload.historical.series)
+    except historical.HistoricalDataError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        )
+
+
+def _columnar_result(result: dict[str, object] | None) -> dict[str, object] | None:
+    if result is None or result.get("rows") is None:
+        return result
+    return {**result, "rows": to_columns(result["rows"])}
+
+
 @app.post("/api/simulate", response_model=schemas.SimulateResponse)
-def simulate(payload: schemas.SimulateRequest) -> schemas.SimulateResponse:
-    result = arena_engine.simulate(
-        scenario=payload.scenario,
+async def simulate(payload: schemas.SimulateRequest, request: Request) -> Response:
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    await _open_historical(payload)
+    result = await _run_cancellable(
+        request, arena_engine.simulate, **_simulate_kwargs(payload)
+    )
+    if media_type == COLUMNAR_MEDIA_TYPE:
+        result = _columnar_result(result)
+    return trusted_response(result, media_type, headers=VARY_ACCEPT)
+
+
+# Proxies such as nginx buffer responses unless told otherwise.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def _event_stream(
+    request: Request,
+    make_events: Callable[[CancellationToken], Iterator[tuple[str, dict[str, object]]]],
+) -> AsyncIterator[bytes]:
+    # Each event is computed in the thread pool; leaving the generator early
+    # (disconnect, timeout) trips the token so the engine stops too.
+    token = _new_token()
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, token))
+    events = make_events(token)
+    try:
+        while (item := await run_in_threadpool(next, events, None)) is not None:
+            yield sse_event(*item)
+    except Cancelled as exc:
+        yield sse_event("error", {"detail": str(exc)})
+    finally:
+        token.cancel()
+        watcher.cancel()
+
+
+@app.post("/api/simulate/stream")
+async def simulate_stream(
+    payload: schemas.SimulateRequest, request: Request
+) -> StreamingResponse:
+    """``/api/simulate`` as Server-Sent Events.
+
+    A ``progress`` event follows each replication with its stats and the running
+    overall stats; the final ``result`` event carries the ``/api/simulate`` body.
+    """
+    await _open_historical(payload)
+    kwargs = _simulate_kwargs(payload)
+    return StreamingResponse(
+        _event_stream(
+            request, lambda token: arena_engine.iter_simulate(**kwargs, cancel=token)
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@app.post("/api/simulate/batch", response_model=schemas.SimulateBatchResponse)
+async def simulate_batch(
+    payload: schemas.SimulateBatchRequest, request: Request
+) -> Response:
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    results: list[dict[str, object] | None] = [None] * len(payload.items)
+    valid_indexes: list[int] = []
+    requests: list[dict[str, object]] = []
+
+    for index, item in enumerate(payload.items):
+        try:
+            item_request = schemas.SimulateRequest.model_validate(item)
+        except ValidationError as exc:
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "result": None,
+                "error": schemas.format_validation_error(exc),
+            }
+            continue
+        valid_indexes.append(index)
+        requests.append(_simulate_kwargs(item_request))
+
+    outcomes = await _run_cancellable(request, arena_engine.simulate_batch, requests)
+    for index, outcome in zip(valid_indexes, outcomes):
+        if media_type == COLUMNAR_MEDIA_TYPE:
+            outcome = {**outcome, "result": _columnar_result(outcome["result"])}
+        results[index] = {"index": index, **outcome}
+
+    return trusted_response({"results": results}, media_type, headers=VARY_ACCEPT)
+
+
+@app.post("/api/simulate/fields", response_model=schemas.FieldsSimulateResponse)
+async def simulate_fields(
+    payload: schemas.FieldsSimulateRequest, request: Request
+) -> TrustedJSONResponse:
+    result = await _run_cancellable(
+        request,
+        fields.simulate_fields,
+        fields=[
+            field.model_dump(by_alias=True, exclude_none=True)
+            for field in payload.fields
+        ],
         seasons=payload.seasons,
         replications=payload.replications,
-        probabilities=payload.probabilities.model_dump(),
+        correlation=payload.correlation,
         seed=payload.seed,
-        include_rows=bool(payload.include_rows),
+        rng_kind=payload.rng,
     )
-    return schemas.SimulateResponse.model_validate(result)
+    return trusted_response(result)
 
 
 @app.post("/api/compare", response_model=schemas.CompareResponse)
-def compare(payload: schemas.CompareRequest) -> schemas.CompareResponse:
-    result = arena_engine.compare(
-        seasons=payload.seasons,
-        replications=payload.replications,
-        seed=payload.seed,
+async def compare(
+    payload: schemas.CompareRequest, request: Request
+) -> TrustedJSONResponse:
+    result = await _run_cancellable(
+        request, arena_engine.compare, **_compare_kwargs(payload)
+    )
+    return TrustedJSONResponse(result)
+
+
+@app.post("/api/compare/stream")
+async def compare_stream(
+    payload: schemas.CompareRequest, request: Request
+) -> StreamingResponse:
+    """``/api/compare`` as Server-Sent Events.
+
+    A ``scenario`` event is sent as soon as each preset finishes; the final
+    ``result`` event carries the ``/api/compare`` body.
+    """
+    kwargs = _compare_kwargs(payload)
+    return StreamingResponse(
+        _event_stream(
+            request, lambda token: arena_engine.iter_compare(**kwargs, cancel=token)
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
-    return schemas.CompareResponse.model_validate(result)
 
 
 @app.post(
@@ -101,21 +416,85 @@ def create_simulation(
     response_model=schemas.SimulationRead,
     status_code=status.HTTP_201_CREATED,
 )
-def run_simulation(
-    payload: schemas.SimulationExecuteRequest, db: Session = Depends(get_db)
+async def run_simulation(
+    payload: schemas.SimulationExecuteRequest,
+    request: Request,
+    db: Session = Depends(get_db),
 ) -> schemas.SimulationRead:
-    simulation_payload = build_simulation_payload(payload)
+    simulation_payload = await _run_cancellable(request, build_simulation_payload, payload)
     try:
-        simulation = crud.create_simulation(db, simulation_payload)
+        simulation = await run_in_threadpool(
+            crud.create_simulation, db, simulation_payload, trusted=True
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
     return simulation
 
 
-def _normalize_date_filter(value: str, is_end: bool) -> str:
-    if len(value) == 10:
-        return f"{value}T23:59:59.999Z" if is_end else f"{value}T00:00:00.000Z"
-    return value
+async def _iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, bytes]]:
+    line_number = 0
+    remainder = b""
+    async for chunk in chunks:
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if remainder.strip():
+        yield line_number + 1, remainder
+
+
+@app.post("/api/simulations/import", response_model=schemas.SimulationImportReport)
+async def import_simulations(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=5000),
+) -> schemas.SimulationImportReport:
+    """Import an NDJSON body of ``POST /api/simulations`` records.
+
+    The body is read and validated incrementally; each batch is inserted and
+    committed in the thread pool so the event loop keeps serving requests.
+    """
+    report = crud.new_import_report()
+    batch: list[tuple[int, bytes]] = []
+    db = SessionLocal()
+    try:
+        async for line in _iter_ndjson_lines(request.stream()):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                await run_in_threadpool(crud.import_simulation_batch, db, batch, report)
+                batch = []
+        if batch:
+            await run_in_threadpool(crud.import_simulation_batch, db, batch, report)
+    finally:
+        db.close()
+    return schemas.SimulationImportReport.model_validate(report)
+
+
+def simulation_filters(
+    scenario_id: int | None = Query(None, ge=1, le=5),
+    min_avg_yield: float | None = Query(None, ge=0),
+    max_avg_yield: float | None = Query(None, ge=0),
+    created_after: str | None = Query(None),
+    created_before: str | None = Query(None),
+) -> dict[str, object]:
+    return {
+        "scenario_id": scenario_id,
+        "min_avg_yield": min_avg_yield,
+        "max_avg_yield": max_avg_yield,
+        "created_after": (
+            crud.normalize_date_filter(created_after, is_end=False)
+            if created_after
+            else None
+        ),
+        "created_before": (
+            crud.normalize_date_filter(created_before, is_end=True)
+            if created_before
+            else None
+        ),
+    }
 
 
 @app.get("/api/simulations", response_model=schemas.SimulationListResponse)
@@ -124,44 +503,18 @@ def list_simulations(
     offset: int = Query(0, ge=0),
     sort_by: Literal["created_at", "average_yield"] = Query("created_at"),
     sort_order: Literal["asc", "desc"] = Query("desc"),
-    scenario_id: int | None = Query(None, ge=1, le=5),
-    min_avg_yield: float | None = Query(None, ge=0),
-    max_avg_yield: float | None = Query(None, ge=0),
-    created_after: str | None = Query(None),
-    created_before: str | None = Query(None),
+    filters: dict[str, object] = Depends(simulation_filters),
     db: Session = Depends(get_db),
 ) -> schemas.SimulationListResponse:
-    normalized_after = (
-        _normalize_date_filter(created_after, is_end=False)
-        if created_after
-        else None
-    )
-    normalized_before = (
-        _normalize_date_filter(created_before, is_end=True)
-        if created_before
-        else None
-    )
-
     items = crud.get_simulations(
         db,
         limit=limit,
         offset=offset,
         sort_by=sort_by,
         sort_order=sort_order,
-        scenario_id=scenario_id,
-        min_avg_yield=min_avg_yield,
-        max_avg_yield=max_avg_yield,
-        created_after=normalized_after,
-        created_before=normalized_before,
-    )
-    total = crud.get_simulation_count(
-        db,
-        scenario_id=scenario_id,
-        min_avg_yield=min_avg_yield,
-        max_avg_yield=max_avg_yield,
-        created_after=normalized_after,
-        created_before=normalized_before,
+        **filters,
     )
+    total = crud.get_simulation_count(db, **filters)
     return schemas.SimulationListResponse(
         items=items,
         total=total,
@@ -170,14 +523,105 @@ def list_simulations(
     )
 
 
+def _stream_export(
+    export_format: ExportFormat, filters: dict[str, object]
+) -> Iterator[bytes]:
+    # The session lives as long as the stream instead of the request scope.
+    db = SessionLocal()
+    try:
+        yield from iter_export(crud.iter_simulation_records(db, **filters), export_format)
+    finally:
+        db.close()
+
+
+@app.get("/api/simulations/export")
+def export_simulations(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    filters: dict[str, object] = Depends(simulation_filters),
+) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_export(export_format, filters),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="simulations.{export_format}"'
+        },
+    )
+
+
+@app.post(
+    "/api/simulations/delete-jobs",
+    response_model=schemas.DeletionJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_deletion_job(
+    background_tasks: BackgroundTasks,
+    chunk_size: int = Query(100, ge=1, le=10000),
+    filters: dict[str, object] = Depends(simulation_filters),
+    db: Session = Depends(get_db),
+) -> schemas.DeletionJobRead:
+    total = crud.get_simulation_count(db, **filters)
+    job = jobs.create_deletion_job(total, filters)
+    background_tasks.add_task(jobs.run_deletion_job, job.id, chunk_size)
+    return schemas.DeletionJobRead.model_validate(job)
+
+
+@app.get("/api/simulations/delete-jobs/{job_id}", response_model=schemas.DeletionJobRead)
+def get_deletion_job(job_id: str) -> schemas.DeletionJobRead:
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return schemas.DeletionJobRead.model_validate(job)
+
+
 @app.get("/api/simulations/{simulation_id}", response_model=schemas.SimulationRead)
 def get_simulation(
-    simulation_id: str, db: Session = Depends(get_db)
-) -> schemas.SimulationRead:
-    simulation = crud.get_simulation(db, simulation_id)
+    simulation_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> schemas.SimulationRead | Response:
+    # Stored simulations only change through PATCH, which bumps the version,
+    # so a matching ETag is answered from the summary columns alone. The
+    # creation time and checksum tell apart a simulation deleted and
+    # re-created (e.g. imported) under the same id, whose version restarts.
+    revision = crud.get_simulation_revision(db, simulation_id)
+    if revision is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    etag = make_etag("simulation", simulation_id, *revision, media_type)
+    if etag_matches(request, etag):
+        response = not_modified(etag)
+        response.headers.update(VARY_ACCEPT)
+        return response
+
+    try:
+        simulation = crud.read_simulation(db, simulation_id)
+    except crud.ChecksumMismatchError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)
+        )
     if not simulation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return simulation
+    etag = make_etag(
+        "simulation",
+        simulation_id,
+        simulation.version,
+        simulation.created_at,
+        simulation.checksum,
+        media_type,
+    )
+    if media_type == JSON_MEDIA_TYPE:
+        set_cache_headers(response, etag)
+        response.headers.update(VARY_ACCEPT)
+        return simulation
+
+    content = simulation.model_dump(mode="json", by_alias=True)
+    if media_type == COLUMNAR_MEDIA_TYPE:
+        for run in content["runs"]:
+            run["seasons"] = to_columns(run["seasons"])
+    encoded = trusted_response(content, media_type, headers=VARY_ACCEPT)
+    set_cache_headers(encoded, etag)
+    return encoded
 
 
 @app.patch("/api/simulations/{simulation_id}", response_model=schemas.SimulationSummary)
@@ -192,6 +636,35 @@ def update_simulation(
     return simulation
 
 
+@app.post(
+    "/api/simulations/{simulation_id}/replications",
+    response_model=schemas.SimulationSummary,
+)
+async def extend_simulation(
+    simulation_id: str,
+    payload: schemas.SimulationExtendRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> schemas.SimulationSummary:
+    try:
+        simulation = await _run_cancellable(
+            request,
+            crud.extend_simulation,
+            db,
+            simulation_id,
+            payload.additional_replications,
+        )
+    except crud.ChecksumMismatchError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)
+        )
+    except crud.SimulationExtensionError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if not simulation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return simulation
+
+
 @app.delete("/api/simulations/{simulation_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_simulation(simulation_id: str, db: Session = Depends(get_db)) -> None:
     deleted = crud.delete_simulation(db, simulation_id)
@@ -201,6 +674,11 @@ def delete_simulation(simulation_id: str, db: Session = Depends(get_db)) -> None
 
 
 @app.delete("/api/simulations", status_code=status.HTTP_204_NO_CONTENT)
-def delete_all_simulations(db: Session = Depends(get_db)) -> None:
-    crud.delete_all_simulations(db)
+def delete_all_simulations(
+    chunk_size: int = Query(100, ge=1, le=10000),
+    filters: dict[str, object] = Depends(simulation_filters),
+    db: Session = Depends(get_db),
+) -> None:
+    crud.delete_simulations_in_chunks(db, chunk_size=chunk_size, **filters)
+    incremental_vacuum(get_engine())
     return None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy import (
+    JSON,
     CheckConstraint,
     Float,
     ForeignKey,
@@ -26,6 +27,10 @@ class Simulation(Base):
         server_default=text("strftime('%Y-%m-%dT%H:%M:%fZ','now')"),
     )
     run_mode: Mapped[str] = mapped_column(String, nullable=False, server_default="single")
+    storage_mode: Mapped[str] = mapped_column(String, nullable=False, server_default="full")
+    checksum: Mapped[str | None] = mapped_column(String)
+    # Bumped on every update; part of the simulation's ETag.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
     num_seasons: Mapped[int] = mapped_column(Integer, nullable=False)
     num_replications: Mapped[int] = mapped_column(Integer, nullable=False)
     seed: Mapped[int | None] = mapped_column(Integer)
@@ -34,6 +39,10 @@ class Simulation(Base):
     max_yield: Mapped[float] = mapped_column(Float, nullable=False)
     yield_variability: Mapped[str] = mapped_column(String, nullable=False)
     low_yield_percent: Mapped[float] = mapped_column(Float, nullable=False)
+    # Mergeable summary of every season yield, used to append replications.
+    yield_sum: Mapped[float | None] = mapped_column(Float)
+    yield_m2: Mapped[float | None] = mapped_column(Float)
+    low_season_count: Mapped[int | None] = mapped_column(Integer)
 
     runs: Mapped[list["SimulationRun"]] = relationship(
         back_populates="simulation", cascade="all, delete-orphan", passive_deletes=True
@@ -41,6 +50,9 @@ class Simulation(Base):
 
     __table_args__ = (
         CheckConstraint("run_mode IN ('single','all_scenarios')", name="ck_simulations_run_mode"),
+        CheckConstraint(
+            "storage_mode IN ('full','recompute')", name="ck_simulations_storage_mode"
+        ),
         CheckConstraint("num_seasons > 0", name="ck_simulations_num_seasons"),
         CheckConstraint("num_replications > 0", name="ck_simulations_num_replications"),
         CheckConstraint("average_yield >= 0", name="ck_simulations_avg_yield"),
@@ -123,3 +135,27 @@ class SeasonResult(Base):
         ),
         Index("idx_season_results_run_id", "simulation_run_id"),
     )
+
+
+class DeletionJob(Base):
+    # Kept in the database so any worker can report on a job another started.
+    __tablename__ = "deletion_jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+        server_default=text("strftime('%Y-%m-%dT%H:%M:%fZ','now')"),
+    )
+    status: Mapped[str] = mapped_column(String, nullable=False, server_default="pending")
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    error: Mapped[str | None] = mapped_column(String)
+    filters: Mapped[dict[str, object]] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending','running','vacuuming','completed','failed')",
+            name="ck_deletion_jobs_status",
+        ),
+    )
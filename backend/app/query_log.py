@@ -0,0 +1,235 @@
+"""Opt-in statement timing and slow-query log for the database engine.
+
+Enabled by setting ``SLOW_QUERY_MS``: every statement is timed with the
+engine's ``before_cursor_execute``/``after_cursor_execute`` events and counted
+against the endpoint that ran it; statements taking at least the threshold are
+logged together with their ``EXPLAIN QUERY PLAN`` (SQLite), captured on a
+separate cursor so the statement's own results are left alone. The counts and
+the most recent slow statements are served by ``GET /api/debug/queries``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MAX_SLOW_QUERIES = 100
+OUTSIDE_REQUEST = "(no request)"
+_START_TIME = "query_log_start_time"
+_PLAN_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def slow_query_threshold_ms() -> float | None:
+    """``SLOW_QUERY_MS`` as milliseconds; ``None`` when unset (logging off)."""
+    value = os.getenv("SLOW_QUERY_MS", "").strip()
+    if not value:
+        return None
+    threshold = float(value)
+    if threshold < 0:
+        raise ValueError("SLOW_QUERY_MS must not be negative")
+    return threshold
+
+
+@dataclass
+class _EndpointStats:
+    requests: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    total_ms: float = 0.0
+    slow_statements: int = 0
+
+
+@dataclass
+class _RequestQueries:
+    scope: Scope
+    statements: int = 0
+
+
+@dataclass
+class _QueryLog:
+    threshold_ms: float | None = None
+    endpoints: dict[str, _EndpointStats] = field(default_factory=dict)
+    slow: deque[dict[str, object]] = field(
+        default_factory=lambda: deque(maxlen=MAX_SLOW_QUERIES)
+    )
+
+
+_log = _QueryLog()
+_lock = threading.Lock()
+_current_request: ContextVar[_RequestQueries | None] = ContextVar(
+    "query_log_request", default=None
+)
+
+
+def _endpoint(scope: Scope) -> str:
+    # The router stores the matched route in the scope, so requests are
+    # grouped by path template rather than by concrete ids.
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _stats(endpoint: str) -> _EndpointStats:
+    stats = _log.endpoints.get(endpoint)
+    if stats is None:
+        stats = _log.endpoints[endpoint] = _EndpointStats()
+    return stats
+
+
+def _query_plan(cursor, statement: str, parameters) -> list[str]:
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [str(row[-1]) for row in plan_cursor.fetchall()]
+    except Exception as exc:  # the driver's own error type
+        return [f"unavailable: {exc}"]
+    finally:
+        plan_cursor.close()
+
+
+def _before_cursor_execute(
+    conn, _cursor, _statement, _parameters, context, _executemany
+):
+    # The start time lives on the statement's execution context, so a statement
+    # that raises (and never reaches after_cursor_execute) leaves nothing behind
+    # on the pooled connection. The few context-less statements SQLAlchemy runs
+    # itself overwrite a single slot on the connection instead.
+    if context is not None:
+        context._query_start = time.perf_counter()
+    else:
+        conn.info[_START_TIME] = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    if context is not None:
+        started = getattr(context, "_query_start", None)
+    else:
+        started = conn.info.pop(_START_TIME, None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    threshold = _log.threshold_ms
+    if threshold is None:
+        return
+    request = _current_request.get()
+    endpoint = _endpoint(request.scope) if request is not None else OUTSIDE_REQUEST
+    slow = elapsed_ms >= threshold
+    plan: list[str] = []
+    if (
+        slow
+        and not executemany
+        and conn.dialect.name == "sqlite"
+        and statement.lstrip().upper().startswith(_PLAN_PREFIXES)
+    ):
+        plan = _query_plan(cursor, statement, parameters)
+    with _lock:
+        stats = _stats(endpoint)
+        stats.statements += 1
+        stats.total_ms += elapsed_ms
+        if request is not None:
+            request.statements += 1
+        if slow:
+            stats.slow_statements += 1
+            _log.slow.append(
+                {
+                    "endpoint": endpoint,
+                    "statement": statement,
+                    "duration_ms": round(elapsed_ms, 3),
+                    "plan": plan,
+                    "full_scan": any(
+                        line.startswith("SCAN") and "INDEX" not in line for line in plan
+                    ),
+                }
+            )
+    if slow:
+        logger.warning(
+            "slow query (%.1f ms) on %s: %s%s",
+            elapsed_ms,
+            endpoint,
+            statement,
+            "".join(f"\n  {line}" for line in plan),
+        )
+
+
+def install(engine: Engine, threshold_ms: float) -> None:
+    """Time ``engine``'s statements, logging those taking ``threshold_ms`` or more."""
+    _log.threshold_ms = threshold_ms
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstall(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+    _log.threshold_ms = None
+
+
+def enabled() -> bool:
+    return _log.threshold_ms is not None
+
+
+def reset() -> None:
+    with _lock:
+        _log.endpoints.clear()
+        _log.slow.clear()
+
+
+def snapshot() -> dict[str, object]:
+    """Per-endpoint statement counts (busiest first) and the recent slow statements."""
+    with _lock:
+        endpoints = sorted(
+            _log.endpoints.items(), key=lambda item: (-item[1].statements, item[0])
+        )
+        return {
+            "slow_threshold_ms": _log.threshold_ms,
+            "endpoints": [
+                {
+                    "endpoint": endpoint,
+                    "requests": stats.requests,
+                    "statements": stats.statements,
+                    "max_statements": stats.max_statements,
+                    "total_ms": round(stats.total_ms, 3),
+                    "slow_statements": stats.slow_statements,
+                }
+                for endpoint, stats in endpoints
+            ],
+            "slow_queries": list(reversed(_log.slow)),
+        }
+
+
+class QueryLogMiddleware:
+    """Attributes the statements run while serving a request to its endpoint."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+        request = _RequestQueries(scope)
+        token = _current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            if request.statements:
+                with _lock:
+                    stats = _stats(_endpoint(scope))
+                    stats.requests += 1
+                    stats.max_statements = max(stats.max_statements, request.statements)
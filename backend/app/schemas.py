@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
 
 
 def to_camel(text: str) -> str:
@@ -10,6 +10,15 @@ def to_camel(text: str) -> str:
     return parts[0] + "".join(word.capitalize() for word in parts[1:])
 
 
+def format_validation_error(exc: ValidationError) -> str:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error.get("loc", ()))
+        message = error.get("msg", "invalid value")
+        messages.append(f"{location}: {message}" if location else message)
+    return "; ".join(messages)
+
+
 class SchemaBase(BaseModel):
     model_config = ConfigDict(
         from_attributes=True,
@@ -22,6 +31,9 @@ class SchemaBase(BaseModel):
 RainfallLevel = Literal["low", "normal", "high"]
 YieldVariability = Literal["low", "medium", "high"]
 RunMode = Literal["single", "all_scenarios"]
+StorageMode = Literal["full", "recompute"]
+SamplingMode = Literal["iid", "stratified"]
+RngKind = Literal["legacy", "pcg32"]
 ScenarioKey = Literal[
     "custom",
     "balanced",
@@ -59,6 +71,11 @@ class Scenario(SchemaBase):
     default_probabilities: RainfallProbabilities
 
 
+class PresetReloadResponse(SchemaBase):
+    digest: str
+    presets: int = Field(ge=0)
+
+
 class YieldByRainfall(SchemaBase):
     low: float
     normal: float
@@ -100,46 +117,310 @@ class ReplicationResult(SchemaBase):
 class SimulationRow(SchemaBase):
     replication: int = Field(ge=1)
     season: int = Field(ge=1)
-    rainfall: RainfallLevel
+    # A RainfallLevel, or a category name when the request defines categories.
+    rainfall: str
+    yield_amount: float = Field(ge=0, alias="yield")
+
+
+class ConfidenceInterval(SchemaBase):
+    level: float = Field(gt=0, lt=1)
+    low: float
+    high: float
+
+
+class RiskRequest(SchemaBase):
+    level: float = Field(default=0.95, ge=0.5, lt=1)
+    consecutive_low_seasons: int = Field(default=3, ge=1, le=50)
+
+
+class RiskMetrics(SchemaBase):
+    level: float
+    # Per-replication cumulative yield over all seasons.
+    cumulative_yield_mean: float
+    value_at_risk: float
+    conditional_value_at_risk: float
+    consecutive_low_seasons: int = Field(ge=1)
+    # Share of replications with at least that many low seasons in a row.
+    consecutive_low_probability: float = Field(ge=0, le=1)
+
+
+class ChartRequest(SchemaBase):
+    histogram_bins: int = Field(default=20, ge=1, le=200)
+
+
+class SeasonBand(SchemaBase):
+    season: int = Field(ge=1)
+    # Across replications.
+    mean_yield: float
+    min_yield: float
+    max_yield: float
+
+
+class HistogramBin(SchemaBase):
+    low: float
+    high: float
+    count: int = Field(ge=0)
+
+
+class ChartData(SchemaBase):
+    seasons: list[SeasonBand]
+    # Equal-width bins over all season yields.
+    histogram: list[HistogramBin]
+
+
+class RainfallCategory(SchemaBase):
+    name: str = Field(min_length=1, max_length=32)
+    probability: float = Field(ge=0, le=1)
     yield_amount: float = Field(ge=0, alias="yield")
 
 
+class HistoricalRainfall(SchemaBase):
+    # File stem in RAINFALL_DATA_DIR (``<series>.f64`` or ``<series>.csv``).
+    series: str = Field(
+        min_length=1, max_length=128, pattern=r"^[A-Za-z0-9][A-Za-z0-9_.-]*$"
+    )
+    # Consecutive recorded seasons copied per bootstrap block.
+    block_length: int = Field(default=3, ge=1, le=50)
+    # Below low_below is a low season; at or above high_above a high one.
+    low_below: float
+    high_above: float
+
+    @model_validator(mode="after")
+    def _check_thresholds(self) -> "HistoricalRainfall":
+        if self.low_below > self.high_above:
+            raise ValueError("low_below must not exceed high_above")
+        return self
+
+
+def _check_rainfall_model(
+    probabilities: RainfallProbabilitiesFloat | None,
+    categories: list[RainfallCategory] | None,
+) -> None:
+    if (probabilities is None) == (categories is None):
+        raise ValueError("provide either probabilities or categories")
+    if categories is not None:
+        names = [category.name for category in categories]
+        if len(set(names)) != len(names):
+            raise ValueError("category names must be unique")
+        total = sum(category.probability for category in categories)
+        if abs(total - 1.0) > 1e-6:
+            raise ValueError("category probabilities must sum to 1.0")
+
+
 class SimulateRequest(SchemaBase):
     scenario: ScenarioKey
     seasons: int = Field(ge=1, le=50)
     replications: int = Field(ge=1, le=100)
-    probabilities: RainfallProbabilitiesFloat
+    # Exactly one of probabilities (low/normal/high), categories or historical.
+    probabilities: RainfallProbabilitiesFloat | None = None
+    categories: list[RainfallCategory] | None = Field(
+        default=None, min_length=2, max_length=32
+    )
+    historical: HistoricalRainfall | None = None
     seed: str | None = None
     include_rows: bool | None = Field(default=False, alias="includeRows")
+    # Stop starting replications once this much time has passed.
+    time_budget_ms: int | None = Field(default=None, ge=1, le=60000)
+    sampling: SamplingMode = "iid"
+    # "legacy" keeps the historical seeded outputs; "pcg32" uses split streams.
+    rng: RngKind = "legacy"
+    # Opt-in tail-risk section in the response.
+    risk: RiskRequest | None = None
+    # Opt-in chart data, so charts need not be drawn from includeRows.
+    chart: ChartRequest | None = None
+
+    @model_validator(mode="after")
+    def _check_rainfall_model(self) -> "SimulateRequest":
+        if self.historical is None:
+            _check_rainfall_model(self.probabilities, self.categories)
+        elif self.probabilities is not None or self.categories is not None:
+            raise ValueError("historical replaces probabilities and categories")
+        elif self.sampling == "stratified":
+            raise ValueError("stratified sampling does not apply to historical rainfall")
+        return self
 
 
 class SimulateResponse(SchemaBase):
     seasons: int = Field(ge=1)
     replications: int = Field(ge=1)
-    probabilities: RainfallProbabilitiesFloat
+    probabilities: RainfallProbabilitiesFloat | None
+    categories: list[RainfallCategory] | None = None
+    historical: HistoricalRainfall | None = None
     seed: str | None
+    sampling: SamplingMode = "iid"
+    rng: RngKind = "legacy"
     overall: SimulationStats
     replication_results: list[ReplicationResult]
+    completed_replications: int = Field(ge=1)
+    # 95% interval for the mean yield across replications; needs two of them.
+    mean_yield_ci: ConfidenceInterval | None = None
+    risk: RiskMetrics | None = None
+    chart: ChartData | None = None
     rows: list[SimulationRow] | None = None
 
 
+class SimulateBatchRequest(SchemaBase):
+    # Items are validated one by one so a bad item does not fail the batch.
+    items: list[dict[str, Any]] = Field(min_length=1, max_length=100)
+
+
+class SimulateBatchItem(SchemaBase):
+    index: int = Field(ge=0)
+    status: Literal["ok", "error"]
+    result: SimulateResponse | None = None
+    error: str | None = None
+
+
+class SimulateBatchResponse(SchemaBase):
+    results: list[SimulateBatchItem]
+
+
+class FieldSpec(SchemaBase):
+    name: str = Field(min_length=1, max_length=64)
+    # Identical plots share one multinomial draw per season.
+    plots: int = Field(default=1, ge=1, le=1_000_000)
+    probabilities: RainfallProbabilitiesFloat | None = None
+    # Yield per level with probabilities; defaults to /api/yield-by-rainfall.
+    yields: YieldByRainfall | None = None
+    # Ordered from driest to wettest.
+    categories: list[RainfallCategory] | None = Field(
+        default=None, min_length=2, max_length=32
+    )
+
+    @model_validator(mode="after")
+    def _check_field_model(self) -> "FieldSpec":
+        _check_rainfall_model(self.probabilities, self.categories)
+        if self.yields is not None and self.categories is not None:
+            raise ValueError("yields only apply with probabilities")
+        return self
+
+
+# Work of a fields request, in draws per season and replication: one per
+# category of a single-plot field (fields are drawn together in columns), and
+# FIELD_PLOTS_DRAW_COST per category of a field of several plots, whose
+# multinomial costs about that many column draws. The limit admits 10,000
+# three-category fields for 3,300 seasons x replications, about 20 s with the legacy
+# generator and 50 s with pcg32 on a slow core, inside the default timeout.
+FIELD_PLOTS_DRAW_COST = 15
+MAX_FIELD_DRAWS = 100_000_000
+
+
+class FieldsSimulateRequest(SchemaBase):
+    # Plots that share their settings can be one field with ``plots``, drawn
+    # as a single multinomial per season whatever their number.
+    fields: list[FieldSpec] = Field(min_length=1, max_length=10_000)
+    seasons: int = Field(ge=1, le=50)
+    replications: int = Field(ge=1, le=100)
+    # Latent rainfall correlation between any two plots (regional shock share).
+    correlation: float = Field(default=0.0, ge=0, le=1)
+    seed: str | None = None
+    rng: RngKind = "legacy"
+
+    @model_validator(mode="after")
+    def _check_field_names(self) -> "FieldsSimulateRequest":
+        names = [field.name for field in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError("field names must be unique")
+        draws = sum(
+            (len(field.categories) if field.categories else 3)
+            * (1 if field.plots == 1 else FIELD_PLOTS_DRAW_COST)
+            for field in self.fields
+        )
+        if draws * self.seasons * self.replications > MAX_FIELD_DRAWS:
+            raise ValueError(
+                "fields x categories x seasons x replications must not exceed "
+                f"{MAX_FIELD_DRAWS}, counting each category of a field of several "
+                f"plots {FIELD_PLOTS_DRAW_COST} times"
+            )
+        return self
+
+
+class CategoryCount(SchemaBase):
+    name: str
+    count: int = Field(ge=0)
+
+
+class FieldResult(SchemaBase):
+    name: str
+    plots: int = Field(ge=1)
+    overall: SimulationStats
+    # Plot-seasons per rainfall level or category, driest first.
+    rainfall_counts: list[CategoryCount]
+
+
+class FieldsSimulateResponse(SchemaBase):
+    seasons: int = Field(ge=1)
+    replications: int = Field(ge=1)
+    seed: str
+    correlation: float
+    rng: RngKind
+    # Fields and plots times seasons times replications.
+    field_seasons: int = Field(ge=1)
+    plot_seasons: int = Field(ge=1)
+    fields: list[FieldResult]
+    pooled: SimulationStats
+    # Stats of the mean yield over all plots, per replication and season.
+    regional: SimulationStats
+
+
+class BootstrapRequest(SchemaBase):
+    resamples: int = Field(default=1000, ge=100, le=10000)
+    level: float = Field(default=0.95, ge=0.5, lt=1)
+
+
+class BootstrapInterval(SchemaBase):
+    scenario: PresetScenarioKey
+    mean_yield: float
+    low: float
+    high: float
+
+
+class BootstrapDifference(SchemaBase):
+    scenario_a: PresetScenarioKey
+    scenario_b: PresetScenarioKey
+    # Mean yield of scenario_a minus that of scenario_b.
+    difference: float
+    low: float
+    high: float
+    # The interval excludes zero.
+    significant: bool
+
+
+class BootstrapResult(SchemaBase):
+    resamples: int = Field(ge=1)
+    level: float
+    scenarios: list[BootstrapInterval]
+    differences: list[BootstrapDifference]
+
+
 class CompareRequest(SchemaBase):
     seasons: int = Field(ge=1, le=50)
     replications: int = Field(ge=1, le=100)
     seed: str | None = None
+    time_budget_ms: int | None = Field(default=None, ge=1, le=60000)
+    sampling: SamplingMode = "iid"
+    rng: RngKind = "legacy"
+    risk: RiskRequest | None = None
+    bootstrap: BootstrapRequest | None = None
 
 
 class CompareScenario(SchemaBase):
     scenario: PresetScenarioKey
     probabilities: RainfallProbabilitiesFloat
     overall: SimulationStats
+    completed_replications: int = Field(ge=1)
+    mean_yield_ci: ConfidenceInterval | None = None
+    risk: RiskMetrics | None = None
 
 
 class CompareResponse(SchemaBase):
     seasons: int = Field(ge=1)
     replications: int = Field(ge=1)
     seed: str | None
+    sampling: SamplingMode = "iid"
+    rng: RngKind = "legacy"
     scenarios: list[CompareScenario]
+    bootstrap: BootstrapResult | None = None
 
 
 class SeasonResultBase(SchemaBase):
@@ -153,7 +434,8 @@ class SeasonResultCreate(SeasonResultBase):
 
 
 class SeasonResultRead(SeasonResultBase):
-    id: int
+    # Seasons regenerated for "recompute" simulations have no stored row id.
+    id: int | None = None
 
 
 class SimulationRunBase(SchemaBase):
@@ -187,6 +469,8 @@ class SimulationRunRead(SimulationRunBase):
 class SimulationBase(SchemaBase):
     name: str = Field(min_length=1)
     run_mode: RunMode = "single"
+    storage_mode: StorageMode = "full"
+    checksum: str | None = None
     num_seasons: int = Field(ge=1)
     num_replications: int = Field(ge=1)
     seed: int | None = None
@@ -199,13 +483,29 @@ class SimulationBase(SchemaBase):
 
 class SimulationCreate(SimulationBase):
     id: str | None = None
+    # Set when re-importing exported simulations; new simulations use "now".
+    created_at: str | None = None
     runs: list[SimulationRunCreate]
 
+    @model_validator(mode="after")
+    def _check_recompute_inputs(self) -> "SimulationCreate":
+        if self.storage_mode == "recompute":
+            if self.seed is None:
+                raise ValueError("recompute storage requires a seed")
+            has_seasons = any(run.seasons for run in self.runs)
+            if not has_seasons and self.checksum is None:
+                raise ValueError("recompute storage requires seasons or a checksum")
+        return self
+
 
 class SimulationUpdate(SchemaBase):
     name: str | None = Field(default=None, min_length=1)
 
 
+class SimulationExtendRequest(SchemaBase):
+    additional_replications: int = Field(ge=1, le=10_000)
+
+
 class SimulationExecuteRequest(SchemaBase):
     name: str | None = Field(default=None, min_length=1)
     run_mode: RunMode = "single"
@@ -214,17 +514,102 @@ class SimulationExecuteRequest(SchemaBase):
     num_replications: int = Field(ge=1)
     probabilities: RainfallProbabilities
     seed: int | None = None
+    storage_mode: StorageMode = "full"
+
+
+class ProbabilityGrid(SchemaBase):
+    # Percent values; normal takes the remainder and sums above 100 are skipped.
+    low: list[int] = Field(min_length=1)
+    high: list[int] = Field(min_length=1)
+
+
+# One study job is one simulation and one NDJSON line (about 50 MB and 10 s at
+# this size), and the unit that shards and workers split the study into.
+MAX_STUDY_JOB_SEASONS = 1_000_000
+
+
+class StudySpec(SchemaBase):
+    """Offline study: every combination of the listed settings is one simulation."""
+
+    name: str = Field(default="Study", min_length=1)
+    scenario_ids: list[int] = Field(min_length=1)
+    # Explicit points and/or a grid; neither means each scenario's preset.
+    probabilities: list[RainfallProbabilities] | None = None
+    probability_grid: ProbabilityGrid | None = None
+    num_seasons: list[int] = Field(min_length=1)
+    num_replications: int = Field(ge=1)
+    seeds: list[int] = Field(min_length=1)
+    storage_mode: StorageMode = "full"
+
+    @model_validator(mode="after")
+    def _check_settings(self) -> "StudySpec":
+        if any(not 1 <= scenario_id <= 5 for scenario_id in self.scenario_ids):
+            raise ValueError("scenario ids must be between 1 and 5")
+        if any(num_seasons < 1 for num_seasons in self.num_seasons):
+            raise ValueError("num_seasons must be at least 1")
+        if self.num_replications * max(self.num_seasons) > MAX_STUDY_JOB_SEASONS:
+            raise ValueError(
+                f"a job may hold at most {MAX_STUDY_JOB_SEASONS} seasons "
+                "(num_replications x num_seasons); add seeds instead, each seed "
+                "is a separate job that shards and merges"
+            )
+        return self
 
 
 class SimulationSummary(SimulationBase):
     id: str
     created_at: str
+    version: int = 1
 
 
 class SimulationRead(SimulationSummary):
     runs: list[SimulationRunRead]
 
 
+class SimulationImportError(SchemaBase):
+    line: int = Field(ge=1)
+    id: str | None = None
+    error: str
+
+
+class SimulationImportReport(SchemaBase):
+    imported: int = Field(ge=0)
+    skipped: int = Field(ge=0)
+    failed: int = Field(ge=0)
+    errors: list[SimulationImportError]
+
+
+class EndpointQueryStats(SchemaBase):
+    endpoint: str
+    requests: int = Field(ge=0)
+    statements: int = Field(ge=0)
+    max_statements: int = Field(ge=0)
+    total_ms: float = Field(ge=0)
+    slow_statements: int = Field(ge=0)
+
+
+class SlowQuery(SchemaBase):
+    endpoint: str
+    statement: str
+    duration_ms: float = Field(ge=0)
+    plan: list[str]
+    full_scan: bool
+
+
+class QueryLogResponse(SchemaBase):
+    slow_threshold_ms: float | None
+    endpoints: list[EndpointQueryStats]
+    slow_queries: list[SlowQuery]
+
+
+class DeletionJobRead(SchemaBase):
+    id: str
+    status: Literal["pending", "running", "vacuuming", "completed", "failed"]
+    total: int = Field(ge=0)
+    deleted: int = Field(ge=0)
+    error: str | None = None
+
+
 class SimulationListResponse(SchemaBase):
     items: list[SimulationSummary]
     total: int
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+
+from .schemas import to_camel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - MessagePack output is optional
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.rice-yield.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+_MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/*": JSON_MEDIA_TYPE,
+    "*/*": JSON_MEDIA_TYPE,
+}
+
+
+@lru_cache(maxsize=256)
+def _camel_key(key: str) -> str:
+    return to_camel(key)
+
+
+def camelize(value: Any) -> Any:
+    """Rename snake_case keys to the camelCase aliases used by ``SchemaBase``."""
+    if isinstance(value, dict):
+        return {_camel_key(key): camelize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and type(value[0]) is dict:
+            keys = tuple(value[0])
+            if all(
+                type(item) is dict and tuple(item) == keys and _is_flat_record(item)
+                for item in value
+            ):
+                # Rows share one flat shape, so the key mapping is resolved once
+                # and the list is reused as-is when no key needs renaming.
+                renamed = tuple(_camel_key(key) for key in keys)
+                if renamed == keys:
+                    return value
+                return [dict(zip(renamed, item.values())) for item in value]
+        if not any(isinstance(item, (dict, list)) for item in value):
+            # Columns of a columnar payload hold scalars only.
+            return value
+        return [camelize(item) for item in value]
+    return value
+
+
+def _is_flat_record(record: dict[str, Any]) -> bool:
+    for item in record.values():
+        if isinstance(item, (dict, list)):
+            return False
+    return True
+
+
+def dump_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def supported_media_types() -> tuple[str, ...]:
+    if msgpack is None:
+        return (JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE)
+    return (JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, MSGPACK_MEDIA_TYPE)
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """Pick the response media type for an ``Accept`` header.
+
+    The highest ``q`` value wins, ties go to the order in the header, and
+    anything we cannot produce falls back to plain JSON rather than a 406.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    supported = supported_media_types()
+    candidates: list[tuple[float, int, str]] = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        media_type = _MEDIA_TYPE_ALIASES.get(media_type, media_type)
+        if quality > 0 and media_type in supported:
+            candidates.append((-quality, position, media_type))
+    if not candidates:
+        return JSON_MEDIA_TYPE
+    return min(candidates)[2]
+
+
+def to_columns(records: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Turn a list of same-shaped records into parallel arrays keyed by field."""
+    if not records:
+        return {}
+    return {key: [record[key] for record in records] for key in records[0]}
+
+
+def encode(content: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    content = camelize(content)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.packb(content)
+    return dump_json(content)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One Server-Sent Events message with a JSON ``data`` line."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + encode(data) + b"\n\n"
+
+
+def trusted_response(
+    content: Any,
+    media_type: str = JSON_MEDIA_TYPE,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Encode trusted engine output in a negotiated media type."""
+    return Response(encode(content, media_type), media_type=media_type, headers=headers)
+
+
+class TrustedJSONResponse(Response):
+    """JSON response for engine output that already matches the response schema.
+
+    Returning this from an endpoint skips the ``response_model`` validation pass;
+    the model is still declared on the route for the OpenAPI docs.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
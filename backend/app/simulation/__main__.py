@@ -0,0 +1,101 @@
+"""Offline study runner.
+
+Run from the repository root::
+
+    python -m backend.app.simulation run study.json --output study.ndjson --workers 8
+    python -m backend.app.simulation run study.json --shard 0/4 --output part-0.ndjson.gz
+    python -m backend.app.simulation merge study.json part-*.ndjson.gz --output study.ndjson --load
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+from .. import crud
+from ..db import SessionLocal
+from . import study
+
+
+def _load(path: str, batch_size: int) -> dict[str, object]:
+    db = SessionLocal()
+    try:
+        with study.open_input(path) as handle:
+            return crud.import_simulations(db, handle, batch_size)
+    finally:
+        db.close()
+
+
+def _run(args: argparse.Namespace) -> int:
+    spec = study.load_spec(args.spec)
+    with study.open_output(args.output) as output:
+        jobs = study.run_study(
+            spec,
+            output,
+            shard=study.parse_shard(args.shard),
+            workers=args.workers,
+            compact=args.compact,
+        )
+    report: dict[str, object] = {"jobs": jobs, "output": args.output}
+    if args.load:
+        report["import"] = _load(args.output, args.batch_size)
+    print(json.dumps(report, indent=2))
+    return 1 if args.load and report["import"]["failed"] else 0
+
+
+def _merge(args: argparse.Namespace) -> int:
+    spec = study.load_spec(args.spec)
+    with study.open_output(args.output) as output:
+        report = study.merge_outputs(spec, args.inputs, output)
+    if args.load:
+        report["import"] = _load(args.output, args.batch_size)
+    print(json.dumps(report, indent=2))
+    failed = args.load and report["import"]["failed"]
+    return 1 if report["missing"] or failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.simulation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a study spec (or one shard of it)")
+    run_parser.add_argument("spec", help="study spec JSON file")
+    run_parser.add_argument("--output", required=True, help="NDJSON file (.gz to compress)")
+    run_parser.add_argument("--shard", default="0/1", help="K/N: run every N-th job from K")
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    run_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="store recompute simulations: checksums instead of seasons",
+    )
+
+    merge_parser = commands.add_parser("merge", help="combine shard outputs in job order")
+    merge_parser.add_argument("spec", help="study spec JSON file")
+    merge_parser.add_argument("inputs", nargs="+", help="shard output files")
+    merge_parser.add_argument("--output", required=True, help="NDJSON file (.gz to compress)")
+
+    for command in (run_parser, merge_parser):
+        command.add_argument(
+            "--load", action="store_true", help="import the output into the database"
+        )
+        command.add_argument("--batch-size", type=int, default=500)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "run":
+            return _run(args)
+        if args.command == "merge":
+            return _merge(args)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
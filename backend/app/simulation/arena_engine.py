@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 import math
+import time
 from dataclasses import dataclass
-from typing import Callable, Literal
+from typing import Callable, Iterator, Literal
 from uuid import uuid4
 
-from .presets import load_presets
+from .bootstrap import bootstrap_compare
+from .cancellation import CancellationToken
+from .categorical import CategoricalSampler, normalize_probabilities
+from .chart import ChartAccumulator
+from .historical import block_bootstrap, classify, open_series
+from .presets import registry
+from .risk import RiskAccumulator
+from .rng import LegacyLcg32, Rng, RngKind, keyed_rng
+from .stats import RunningStats, mean_confidence_interval
 
 RainfallLevel = Literal["low", "normal", "high"]
+Sampling = Literal["iid", "stratified"]
 
 LOW_YIELD_THRESHOLD = 2.0
 
@@ -30,23 +40,8 @@ def _round(value: float, digits: int) -> float:
     return round(value + 1e-12, digits)
 
 
-def _hash_seed(seed: str) -> int:
-    value = 2166136261
-    for char in seed:
-        value ^= ord(char)
-        value = (value * 16777619) & 0xFFFFFFFF
-    return value or 0xA5A5A5A5
-
-
 def _make_rng(seed: str) -> Callable[[], float]:
-    state = _hash_seed(seed)
-
-    def _next() -> float:
-        nonlocal state
-        state = (1664525 * state + 1013904223) & 0xFFFFFFFF
-        return state / 2**32
-
-    return _next
+    return LegacyLcg32(seed).random
 
 
 def _derive_seed(base_seed: str, *parts: str) -> str:
@@ -61,13 +56,6 @@ def _generate_seed(seed: str | None) -> str:
     return uuid4().hex
 
 
-def _normalize_probabilities(probabilities: dict[str, float]) -> dict[str, float]:
-    total = sum(probabilities.values())
-    if total <= 0:
-        raise ValueError("probabilities must sum to a positive value")
-    return {key: value / total for key, value in probabilities.items()}
-
-
 def generate_random_probabilities(seed: str) -> dict[str, float]:
     rng = _make_rng(seed)
     values = [rng() + 1e-9, rng() + 1e-9, rng() + 1e-9]
@@ -82,7 +70,29 @@ def generate_random_probabilities(seed: str) -> dict[str, float]:
 def sample_rainfall(
     probabilities: dict[str, float], rng: Callable[[], float]
 ) -> RainfallLevel:
-    roll = rng()
+    return rainfall_for_roll(probabilities, rng())
+
+
+def category_sampler(
+    categories: list[dict[str, object]], sampling: Sampling = "iid"
+) -> tuple[CategoricalSampler, dict[str, float]]:
+    """Sampler and yield by name for ``{name, probability, yield}`` categories.
+
+    Stratified draws keep the monotone cutoff mapping so strata stay contiguous
+    in each category; iid draws use the alias table.
+    """
+    names = [str(category["name"]) for category in categories]
+    if len(set(names)) != len(names):
+        raise ValueError("category names must be unique")
+    sampler = CategoricalSampler(
+        names,
+        [float(category["probability"]) for category in categories],
+        method="cutoffs" if sampling == "stratified" else "alias",
+    )
+    return sampler, {str(c["name"]): float(c["yield"]) for c in categories}
+
+
+def rainfall_for_roll(probabilities: dict[str, float], roll: float) -> RainfallLevel:
     low_cutoff = probabilities["low"]
     normal_cutoff = low_cutoff + probabilities["normal"]
     if roll < low_cutoff:
@@ -92,6 +102,25 @@ def sample_rainfall(
     return "high"
 
 
+def stratified_uniforms(rng: Rng, replications: int, seasons: int) -> list[list[float]]:
+    """Latin hypercube rainfall draws, indexed ``[replication][season]``.
+
+    For every season the replications' draws fall one per stratum
+    ``[k / replications, (k + 1) / replications)``, in an order shuffled by
+    ``rng``. Each draw is still uniform on its own, but the share of low or
+    high seasons across replications varies far less than with iid draws.
+    """
+    draws = [[0.0] * seasons for _ in range(replications)]
+    for season in range(seasons):
+        order = list(range(replications))
+        for i in range(replications - 1, 0, -1):
+            j = int(rng.random() * (i + 1))
+            order[i], order[j] = order[j], order[i]
+        for replication, stratum in enumerate(order):
+            draws[replication][season] = (stratum + rng.random()) / replications
+    return draws
+
+
 def compute_yield(
     rainfall: RainfallLevel,
     rng: Callable[[], float],
@@ -133,6 +162,41 @@ def compute_stats(values: list[float]) -> dict[str, object]:
     }
 
 
+def _running_stats(stats: RunningStats, low_yield_count: int) -> dict[str, object]:
+    """``compute_stats`` output for values summarised by ``stats``."""
+    if not stats.count:
+        return compute_stats([])
+    return {
+        "mean_yield": _round(stats.mean, 2),
+        "sd_yield": _round(math.sqrt(stats.variance), 2),
+        "min_yield": _round(stats.minimum, 2),
+        "max_yield": _round(stats.maximum, 2),
+        "low_yield_count": low_yield_count,
+        "low_yield_rate": _round(low_yield_count / stats.count, 4),
+    }
+
+
+def _confidence_interval(replication_means: list[float]) -> dict[str, float] | None:
+    interval = mean_confidence_interval(replication_means)
+    if interval is None:
+        return None
+    low, high = interval
+    return {"level": 0.95, "low": _round(low, 4), "high": _round(high, 4)}
+
+
+def _deadline(time_budget_ms: int | None) -> float | None:
+    if time_budget_ms is None:
+        return None
+    return time.monotonic() + time_budget_ms / 1000
+
+
+def _final(events: Iterator[tuple[str, dict[str, object]]]) -> dict[str, object]:
+    data: dict[str, object] = {}
+    for _event, data in events:
+        pass
+    return data
+
+
 def run_one_replication(
     *,
     seasons: int,
@@ -141,13 +205,39 @@ def run_one_replication(
     replication: int,
     include_rows: bool = False,
     rules: YieldRule = DEFAULT_YIELD_RULES,
+    rainfall_draws: list[float] | None = None,
+    sampler: CategoricalSampler | None = None,
+    category_yields: dict[str, float] | None = None,
+    rainfall_levels: list[str] | None = None,
 ) -> tuple[dict[str, object], list[dict[str, object]], list[float]]:
+    """Simulate one replication; ``rainfall_draws`` replaces the rng for rainfall.
+
+    ``sampler`` maps draws to rainfall in place of ``probabilities``, and
+    ``category_yields`` replaces the yield rules with a fixed yield per category.
+    ``rainfall_levels`` gives the season rainfall outright.
+    """
     yields: list[float] = []
     rows: list[dict[str, object]] = []
+    if rainfall_levels is not None:
+        rainfalls = rainfall_levels
+    elif rainfall_draws is not None:
+        if sampler is None:
+            sampler = CategoricalSampler.rainfall(probabilities)
+        rainfalls = sampler.sample_many(rainfall_draws)
+    else:
+        rainfalls = None
 
     for season_index in range(seasons):
-        rainfall = sample_rainfall(probabilities, rng)
-        yield_amount = compute_yield(rainfall, rng, rules)
+        if rainfalls is not None:
+            rainfall = rainfalls[season_index]
+        elif sampler is not None:
+            rainfall = sampler.sample(rng())
+        else:
+            rainfall = sample_rainfall(probabilities, rng)
+        if category_yields is not None:
+            yield_amount = category_yields[rainfall]
+        else:
+            yield_amount = compute_yield(rainfall, rng, rules)
         yields.append(yield_amount)
         if include_rows:
             rows.append(
@@ -162,7 +252,7 @@ def run_one_replication(
     return compute_stats(yields), rows, yields
 
 
-def run_simulation(
+def iter_run_simulation(
     *,
     seasons: int,
     replications: int,
@@ -171,27 +261,138 @@ def run_simulation(
     scenario_key: str,
     include_rows: bool = False,
     rules: YieldRule = DEFAULT_YIELD_RULES,
-) -> dict[str, object]:
+    running: bool = False,
+    cancel: CancellationToken | None = None,
+    deadline: float | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    categories: list[dict[str, object]] | None = None,
+    risk: dict[str, object] | None = None,
+    historical: dict[str, object] | None = None,
+    chart: dict[str, object] | None = None,
+    sampler: CategoricalSampler | None = None,
+) -> Iterator[tuple[str, dict[str, object]]]:
+    """``run_simulation`` one replication at a time.
+
+    Yields a ``replication`` event after each replication, then one ``result``
+    event with what ``run_simulation`` returns. With ``running`` the replication
+    events also carry the overall stats of the replications so far. ``cancel``
+    is checked before every replication. Once the monotonic ``deadline`` has
+    passed no further replication is started (at least one always runs), and
+    the result covers the completed ones. ``stratified`` sampling draws rainfall
+    from ``stratified_uniforms`` instead of each replication's rng. Replication
+    ``i`` uses the ``rng_kind`` stream ``seed|scenario|i``. ``categories``
+    (``{name, probability, yield}``) replaces ``probabilities`` and the yield
+    rules with any number of rainfall classes. ``risk`` (``{level,
+    consecutive_low_seasons}``) adds a ``risk`` section from ``RiskAccumulator``.
+    ``historical`` (``{series, block_length, low_below, high_above}``) takes
+    each replication's rainfall from a block bootstrap of a recorded series.
+    ``chart`` (``{histogram_bins}``) adds per-season bands and a yield histogram
+    built from the same replications. ``sampler`` is a rainfall sampler already
+    compiled for ``probabilities``, such as a preset's from the preset table.
+    """
     resolved_seed = _generate_seed(seed)
-    probabilities = _normalize_probabilities(probabilities)
+    series = None
+    if historical is not None:
+        if sampling == "stratified":
+            raise ValueError("stratified sampling does not apply to historical rainfall")
+        series = open_series(str(historical["series"]))
+        sampler, category_yields = None, None
+    elif categories is not None:
+        sampler, category_yields = category_sampler(categories, sampling)
+    elif sampler is not None:
+        category_yields = None
+    else:
+        probabilities = normalize_probabilities(probabilities)
+        sampler, category_yields = CategoricalSampler.rainfall(probabilities), None
     replication_results: list[dict[str, object]] = []
     overall_values: list[float] = []
     rows: list[dict[str, object]] = []
+    replication_means: list[float] = []
+    summary = RunningStats()
+    low_yield_count = 0
+    accumulator = (
+        RiskAccumulator(
+            level=float(risk["level"]),
+            consecutive_low_seasons=int(risk["consecutive_low_seasons"]),
+            low_threshold=LOW_YIELD_THRESHOLD,
+        )
+        if risk is not None
+        else None
+    )
+    charts = (
+        ChartAccumulator(
+            seasons=seasons, histogram_bins=int(chart["histogram_bins"])
+        )
+        if chart is not None
+        else None
+    )
+    strata = (
+        stratified_uniforms(
+            keyed_rng(rng_kind, resolved_seed, scenario_key, "stratified"),
+            replications,
+            seasons,
+        )
+        if sampling == "stratified"
+        else None
+    )
+    # The default yield rules (and category yields) draw nothing, so every
+    # rainfall draw of a replication can be generated up front in one bulk call.
+    bulk_draws = rules is DEFAULT_YIELD_RULES or category_yields is not None
 
     for idx in range(replications):
-        rng = _make_rng(_derive_seed(resolved_seed, scenario_key, str(idx + 1)))
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        if deadline is not None and idx and time.monotonic() >= deadline:
+            break
+        generator = keyed_rng(rng_kind, resolved_seed, scenario_key, str(idx + 1))
+        rainfall_levels = None
+        if series is not None:
+            rainfall_levels = classify(
+                block_bootstrap(
+                    series.values, seasons, int(historical["block_length"]), generator
+                ),
+                float(historical["low_below"]),
+                float(historical["high_above"]),
+            )
+            rainfall_draws = None
+        elif strata is not None:
+            rainfall_draws = strata[idx]
+        elif bulk_draws:
+            rainfall_draws = generator.fill(seasons)
+        else:
+            rainfall_draws = None
         stats, rep_rows, rep_values = run_one_replication(
             seasons=seasons,
             probabilities=probabilities,
-            rng=rng,
+            rng=generator.random,
             replication=idx + 1,
             include_rows=include_rows,
             rules=rules,
+            rainfall_draws=rainfall_draws,
+            sampler=sampler,
+            category_yields=category_yields,
+            rainfall_levels=rainfall_levels,
         )
-        replication_results.append({"replication": idx + 1, **stats})
+        replication_result = {"replication": idx + 1, **stats}
+        replication_results.append(replication_result)
+        replication_means.append(sum(rep_values) / len(rep_values) if rep_values else 0.0)
         overall_values.extend(rep_values)
+        if accumulator is not None:
+            accumulator.add_replication(rep_values)
+        if charts is not None:
+            charts.add_replication(rep_values)
         if include_rows:
             rows.extend(rep_rows)
+        event: dict[str, object] = {
+            "seed": resolved_seed,
+            "replication_result": replication_result,
+        }
+        if running:
+            summary = summary.merge(RunningStats.from_values(rep_values))
+            low_yield_count += int(stats["low_yield_count"])
+            event["overall"] = _running_stats(summary, low_yield_count)
+        yield "replication", event
 
     overall = compute_stats(overall_values)
 
@@ -199,56 +400,258 @@ def run_simulation(
         "seed": resolved_seed,
         "overall": overall,
         "replication_results": replication_results,
+        "completed_replications": len(replication_results),
+        "mean_yield_ci": _confidence_interval(replication_means),
+        "replication_means": replication_means,
+        "risk": accumulator.result() if accumulator is not None else None,
+        "chart": charts.result() if charts is not None else None,
     }
     if include_rows:
         result["rows"] = rows
-    return result
+    yield "result", result
 
 
-def simulate(
+def run_simulation(
     *,
-    scenario: str,
     seasons: int,
     replications: int,
     probabilities: dict[str, float],
     seed: str | None,
+    scenario_key: str,
     include_rows: bool = False,
+    rules: YieldRule = DEFAULT_YIELD_RULES,
+    cancel: CancellationToken | None = None,
+    deadline: float | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    categories: list[dict[str, object]] | None = None,
+    risk: dict[str, object] | None = None,
+    historical: dict[str, object] | None = None,
+    chart: dict[str, object] | None = None,
+    sampler: CategoricalSampler | None = None,
 ) -> dict[str, object]:
-    result = run_simulation(
+    return _final(
+        iter_run_simulation(
+            seasons=seasons,
+            replications=replications,
+            probabilities=probabilities,
+            seed=seed,
+            scenario_key=scenario_key,
+            include_rows=include_rows,
+            rules=rules,
+            cancel=cancel,
+            deadline=deadline,
+            sampling=sampling,
+            rng_kind=rng_kind,
+            categories=categories,
+            risk=risk,
+            historical=historical,
+            chart=chart,
+            sampler=sampler,
+        )
+    )
+
+
+def iter_simulate(
+    *,
+    scenario: str,
+    seasons: int,
+    replications: int,
+    probabilities: dict[str, float] | None,
+    seed: str | None,
+    include_rows: bool = False,
+    time_budget_ms: int | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    categories: list[dict[str, object]] | None = None,
+    risk: dict[str, object] | None = None,
+    historical: dict[str, object] | None = None,
+    chart: dict[str, object] | None = None,
+    progress: bool = True,
+    cancel: CancellationToken | None = None,
+) -> Iterator[tuple[str, dict[str, object]]]:
+    """``simulate`` as events: ``progress`` after each replication, then ``result``.
+
+    Progress events carry the replication's stats and the running overall stats;
+    the ``result`` event is exactly what ``simulate`` returns. With
+    ``time_budget_ms`` only the replications started within the budget are run.
+    With ``categories`` or ``historical`` the result echoes them and
+    ``probabilities`` is None.
+    """
+    events = iter_run_simulation(
         seasons=seasons,
         replications=replications,
         probabilities=probabilities,
         seed=seed,
         scenario_key=scenario,
         include_rows=include_rows,
+        running=progress,
+        cancel=cancel,
+        deadline=_deadline(time_budget_ms),
+        sampling=sampling,
+        rng_kind=rng_kind,
+        categories=categories,
+        risk=risk,
+        historical=historical,
+        chart=chart,
     )
-    return {
-        "seasons": seasons,
-        "replications": replications,
-        "probabilities": probabilities,
-        "seed": result["seed"],
-        "overall": result["overall"],
-        "replication_results": result["replication_results"],
-        "rows": result.get("rows"),
-    }
+    for event, data in events:
+        if event == "replication":
+            if progress:
+                yield "progress", {
+                    "completed": data["replication_result"]["replication"],
+                    "replications": replications,
+                    **data,
+                }
+            continue
+        yield "result", {
+            "seasons": seasons,
+            "replications": replications,
+            "probabilities": (
+                probabilities if categories is None and historical is None else None
+            ),
+            "categories": categories,
+            "historical": historical,
+            "seed": data["seed"],
+            "sampling": sampling,
+            "rng": rng_kind,
+            "overall": data["overall"],
+            "replication_results": data["replication_results"],
+            "completed_replications": data["completed_replications"],
+            "mean_yield_ci": data["mean_yield_ci"],
+            "risk": data["risk"],
+            "chart": data["chart"],
+            "rows": data.get("rows"),
+        }
 
 
-def compare(
+def simulate(
     *,
+    scenario: str,
     seasons: int,
     replications: int,
+    probabilities: dict[str, float] | None,
     seed: str | None,
+    include_rows: bool = False,
+    time_budget_ms: int | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    categories: list[dict[str, object]] | None = None,
+    risk: dict[str, object] | None = None,
+    historical: dict[str, object] | None = None,
+    chart: dict[str, object] | None = None,
+    cancel: CancellationToken | None = None,
 ) -> dict[str, object]:
+    return _final(
+        iter_simulate(
+            scenario=scenario,
+            seasons=seasons,
+            replications=replications,
+            probabilities=probabilities,
+            seed=seed,
+            include_rows=include_rows,
+            time_budget_ms=time_budget_ms,
+            sampling=sampling,
+            rng_kind=rng_kind,
+            categories=categories,
+            risk=risk,
+            historical=historical,
+            chart=chart,
+            progress=False,
+            cancel=cancel,
+        )
+    )
+
+
+def _batch_key(request: dict[str, object]) -> tuple[object, ...] | None:
+    seed = request.get("seed")
+    if not isinstance(seed, str) or not seed.strip():
+        return None
+    probabilities = request.get("probabilities") or {}
+    return (
+        request.get("scenario"),
+        request.get("seasons"),
+        request.get("replications"),
+        tuple(sorted(dict(probabilities).items())),
+        seed.strip(),
+        bool(request.get("include_rows")),
+        request.get("time_budget_ms"),
+        request.get("sampling", "iid"),
+        request.get("rng_kind", "legacy"),
+        tuple(
+            (category["name"], category["probability"], category["yield"])
+            for category in request.get("categories") or ()
+        ),
+        tuple(sorted(dict(request.get("risk") or {}).items())),
+        tuple(sorted(dict(request.get("historical") or {}).items())),
+        tuple(sorted(dict(request.get("chart") or {}).items())),
+    )
+
+
+def simulate_batch(
+    requests: list[dict[str, object]], cancel: CancellationToken | None = None
+) -> list[dict[str, object]]:
+    """Run ``simulate`` for each request in order and report one outcome per request.
+
+    Seeded requests with identical parameters are computed once. A request that
+    fails is reported as an error outcome without failing the rest of the batch.
+    """
+    outcomes: list[dict[str, object]] = []
+    computed: dict[tuple[object, ...], dict[str, object]] = {}
+
+    for request in requests:
+        key = _batch_key(request)
+        try:
+            if key is not None and key in computed:
+                result = computed[key]
+            else:
+                result = simulate(**request, cancel=cancel)
+                if key is not None:
+                    computed[key] = result
+        except ValueError as exc:
+            outcomes.append({"status": "error", "result": None, "error": str(exc)})
+            continue
+        outcomes.append({"status": "ok", "result": result, "error": None})
+
+    return outcomes
+
+
+def iter_compare(
+    *,
+    seasons: int,
+    replications: int,
+    seed: str | None,
+    time_budget_ms: int | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    risk: dict[str, object] | None = None,
+    bootstrap: dict[str, object] | None = None,
+    cancel: CancellationToken | None = None,
+) -> Iterator[tuple[str, dict[str, object]]]:
+    """``compare`` as events: a ``scenario`` event per preset as soon as it is
+    done, then ``result`` with exactly what ``compare`` returns.
+
+    A ``time_budget_ms`` is shared out evenly: preset ``i`` of ``n`` must finish
+    by ``start + budget * (i + 1) / n``, so time left over by a fast preset goes
+    to the next one. ``bootstrap`` (``{resamples, level}``) adds bootstrap
+    intervals over the replication mean yields to the result.
+    """
     resolved_seed = _generate_seed(seed)
     scenarios: list[dict[str, object]] = []
+    table = registry.table()
+    presets = table.presets
+    started = time.monotonic()
+    replication_means: dict[str, list[float]] = {}
 
-    for preset in load_presets():
+    for position, preset in enumerate(presets):
         key = str(preset.get("key"))
         probabilities = dict(preset.get("probabilities", {}))
+        sampler = table.samplers.get(key)
         if key == "random":
             probabilities = generate_random_probabilities(
                 _derive_seed(resolved_seed, "random-probabilities")
             )
+            sampler = None
 
         result = run_simulation(
             seasons=seasons,
@@ -257,18 +660,71 @@ def compare(
             seed=resolved_seed,
             scenario_key=key,
             include_rows=False,
+            cancel=cancel,
+            deadline=(
+                started + time_budget_ms / 1000 * (position + 1) / len(presets)
+                if time_budget_ms is not None
+                else None
+            ),
+            sampling=sampling,
+            rng_kind=rng_kind,
+            risk=risk,
+            sampler=sampler,
         )
-        scenarios.append(
-            {
-                "scenario": key,
-                "probabilities": probabilities,
-                "overall": result["overall"],
-            }
-        )
+        scenario = {
+            "scenario": key,
+            "probabilities": probabilities,
+            "overall": result["overall"],
+            "completed_replications": result["completed_replications"],
+            "mean_yield_ci": result["mean_yield_ci"],
+            "risk": result["risk"],
+        }
+        scenarios.append(scenario)
+        replication_means[key] = result["replication_means"]
+        yield "scenario", {"seed": resolved_seed, **scenario}
 
-    return {
+    yield "result", {
         "seasons": seasons,
         "replications": replications,
         "seed": resolved_seed,
+        "sampling": sampling,
+        "rng": rng_kind,
         "scenarios": scenarios,
+        "bootstrap": (
+            bootstrap_compare(
+                replication_means,
+                resamples=int(bootstrap["resamples"]),
+                level=float(bootstrap["level"]),
+                seed=resolved_seed,
+            )
+            if bootstrap is not None
+            else None
+        ),
     }
+
+
+def compare(
+    *,
+    seasons: int,
+    replications: int,
+    seed: str | None,
+    time_budget_ms: int | None = None,
+    sampling: Sampling = "iid",
+    rng_kind: RngKind = "legacy",
+    risk: dict[str, object] | None = None,
+    bootstrap: dict[str, object] | None = None,
+    cancel: CancellationToken | None = None,
+) -> dict[str, object]:
+    return _final(
+        iter_compare(
+            seasons=seasons,
+            replications=replications,
+            seed=seed,
+            time_budget_ms=time_budget_ms,
+            sampling=sampling,
+            rng_kind=rng_kind,
+            risk=risk,
+            bootstrap=bootstrap,
+            cancel=cancel,
+        )
+    )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+from itertools import combinations
+
+
+def _resampled_means(
+    values: list[float], resamples: int, rng: random.Random
+) -> list[float]:
+    count = len(values)
+    # choices() picks in one comprehension and sum() runs in C, about twice as
+    # fast as indexing in an explicit loop.
+    choices = rng.choices
+    return [sum(choices(values, k=count)) / count for _ in range(resamples)]
+
+
+def _percentile_interval(values: list[float], level: float) -> tuple[float, float]:
+    ordered = sorted(values)
+    tail = (1.0 - level) / 2
+    last = len(ordered) - 1
+    return ordered[round(tail * last)], ordered[round((1.0 - tail) * last)]
+
+
+def _round(value: float) -> float:
+    return round(value + 1e-12, 4)
+
+
+def bootstrap_compare(
+    replication_means: dict[str, list[float]],
+    *,
+    resamples: int,
+    level: float,
+    seed: str,
+) -> dict[str, object]:
+    """Percentile bootstrap of each scenario's mean yield and of pairwise differences.
+
+    Replications are resampled with replacement within each scenario; a
+    difference uses the two scenarios' resamples pairwise, since their
+    replications are independent. The resampling stream is seeded from
+    ``seed``, so the intervals are reproducible with the comparison itself.
+    """
+    rng = random.Random(f"{seed}|bootstrap")
+    distributions = {
+        scenario: _resampled_means(values, resamples, rng)
+        for scenario, values in replication_means.items()
+        if values
+    }
+
+    scenarios = []
+    for scenario, means in distributions.items():
+        values = replication_means[scenario]
+        low, high = _percentile_interval(means, level)
+        scenarios.append(
+            {
+                "scenario": scenario,
+                "mean_yield": _round(sum(values) / len(values)),
+                "low": _round(low),
+                "high": _round(high),
+            }
+        )
+
+    differences = []
+    for first, second in combinations(distributions, 2):
+        values_a = replication_means[first]
+        values_b = replication_means[second]
+        low, high = _percentile_interval(
+            [a - b for a, b in zip(distributions[first], distributions[second])], level
+        )
+        differences.append(
+            {
+                "scenario_a": first,
+                "scenario_b": second,
+                "difference": _round(
+                    sum(values_a) / len(values_a) - sum(values_b) / len(values_b)
+                ),
+                "low": _round(low),
+                "high": _round(high),
+                "significant": low > 0 or high < 0,
+            }
+        )
+
+    return {
+        "resamples": resamples,
+        "level": level,
+        "scenarios": scenarios,
+        "differences": differences,
+    }
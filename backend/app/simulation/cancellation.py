@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """Raised by the engines when their cancellation token has been tripped."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"simulation cancelled ({reason})")
+        self.reason = reason
+
+
+class CancellationToken:
+    """Shared flag the engines check between replications.
+
+    The token is tripped explicitly with ``cancel`` (e.g. when the client
+    disconnects) or implicitly once ``timeout`` seconds have passed. Checking
+    it is cheap, so loops can do so once per replication or run.
+    """
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self._event = threading.Event()
+        self._reason = "cancelled"
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+            return True
+        return False
+
+    @property
+    def reason(self) -> str | None:
+        return self._reason if self.cancelled else None
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise Cancelled(self._reason)
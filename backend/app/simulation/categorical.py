@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Literal, Sequence
+
+SamplerMethod = Literal["alias", "cutoffs"]
+
+
+def normalize_probabilities(probabilities: dict[str, float]) -> dict[str, float]:
+    total = sum(probabilities.values())
+    if total <= 0:
+        raise ValueError("probabilities must sum to a positive value")
+    return {key: value / total for key, value in probabilities.items()}
+
+
+class CategoricalSampler:
+    """Maps uniform draws in ``[0, 1)`` to category labels.
+
+    Built once per probability vector. ``cutoffs`` inverts the cumulative
+    distribution with a binary search; it is monotone in the draw (which
+    stratified sampling relies on) and for ``low``/``normal``/``high`` gives
+    exactly the chained comparisons the engines have always used. ``alias``
+    uses Walker's alias table, so a draw costs the same whatever the number of
+    categories.
+    """
+
+    __slots__ = ("labels", "method", "cutoffs", "_accept", "_alias")
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        probabilities: Sequence[float],
+        method: SamplerMethod = "cutoffs",
+    ) -> None:
+        if len(labels) != len(probabilities) or not labels:
+            raise ValueError("labels and probabilities must be non-empty and aligned")
+        total = sum(probabilities)
+        if total <= 0:
+            raise ValueError("probabilities must sum to a positive value")
+        self.labels = tuple(labels)
+        self.method = method
+
+        cutoffs: list[float] = []
+        running = 0.0
+        for probability in probabilities[:-1]:
+            running += probability / total
+            cutoffs.append(running)
+        self.cutoffs = tuple(cutoffs)
+
+        self._accept, self._alias = _alias_table([p / total for p in probabilities])
+
+    @classmethod
+    def rainfall(cls, probabilities: dict[str, float]) -> CategoricalSampler:
+        """Three-level rainfall sampler for normalised ``probabilities``."""
+        low = probabilities["low"]
+        sampler = cls(
+            ("low", "normal", "high"),
+            (low, probabilities["normal"], probabilities["high"]),
+        )
+        # Same sums as the original comparisons, so the boundaries match bit for bit.
+        sampler.cutoffs = (low, low + probabilities["normal"])
+        return sampler
+
+    def sample(self, draw: float) -> str:
+        if self.method == "alias":
+            scaled = draw * len(self.labels)
+            column = min(int(scaled), len(self.labels) - 1)
+            if scaled - column < self._accept[column]:
+                return self.labels[column]
+            return self.labels[self._alias[column]]
+        return self.labels[bisect_right(self.cutoffs, draw)]
+
+    def sample_many(self, draws: Sequence[float]) -> list[str]:
+        if self.method == "alias":
+            return [self.sample(draw) for draw in draws]
+        labels = self.labels
+        cutoffs = self.cutoffs
+        return [labels[bisect_right(cutoffs, draw)] for draw in draws]
+
+
+def _alias_table(probabilities: list[float]) -> tuple[tuple[float, ...], tuple[int, ...]]:
+    """Vose's construction of Walker's alias table."""
+    count = len(probabilities)
+    scaled = [probability * count for probability in probabilities]
+    accept = [1.0] * count
+    alias = list(range(count))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        low = small.pop()
+        high = large.pop()
+        accept[low] = scaled[low]
+        alias[low] = high
+        scaled[high] = scaled[high] + scaled[low] - 1.0
+        (small if scaled[high] < 1.0 else large).append(high)
+    # Whatever is left is 1 up to rounding error.
+    for index in small + large:
+        accept[index] = 1.0
+    return tuple(accept), tuple(alias)
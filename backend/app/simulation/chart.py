@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Sequence
+
+
+class ChartAccumulator:
+    """Chart-sized summaries of season yields, fed one replication at a time.
+
+    Keeps a running sum, minimum and maximum per season and a count per
+    distinct yield (yields take few distinct values), so the result is the same
+    size however many replications ran.
+    """
+
+    __slots__ = ("bins", "replications", "totals", "minimums", "maximums", "values")
+
+    def __init__(self, *, seasons: int, histogram_bins: int) -> None:
+        if histogram_bins < 1:
+            raise ValueError("histogram_bins must be at least 1")
+        self.bins = histogram_bins
+        self.replications = 0
+        self.totals = [0.0] * seasons
+        self.minimums = [math.inf] * seasons
+        self.maximums = [-math.inf] * seasons
+        self.values: Counter[float] = Counter()
+
+    def add_replication(self, yields: Sequence[float]) -> None:
+        self.replications += 1
+        totals, minimums, maximums = self.totals, self.minimums, self.maximums
+        for season, value in enumerate(yields):
+            totals[season] += value
+            if value < minimums[season]:
+                minimums[season] = value
+            if value > maximums[season]:
+                maximums[season] = value
+        self.values.update(yields)
+
+    def result(self) -> dict[str, object] | None:
+        if not self.replications:
+            return None
+        bands = [
+            {
+                "season": season + 1,
+                "mean_yield": _round(total / self.replications, 2),
+                "min_yield": _round(minimum, 2),
+                "max_yield": _round(maximum, 2),
+            }
+            for season, (total, minimum, maximum) in enumerate(
+                zip(self.totals, self.minimums, self.maximums)
+            )
+        ]
+        return {"seasons": bands, "histogram": self._histogram()}
+
+    def _histogram(self) -> list[dict[str, object]]:
+        low = min(self.values)
+        high = max(self.values)
+        if low == high:
+            return [{"low": low, "high": high, "count": sum(self.values.values())}]
+        width = (high - low) / self.bins
+        counts = [0] * self.bins
+        for value, count in self.values.items():
+            counts[min(int((value - low) / width), self.bins - 1)] += count
+        return [
+            {
+                "low": _round(low + index * width, 4),
+                "high": _round(low + (index + 1) * width, 4),
+                "count": count,
+            }
+            for index, count in enumerate(counts)
+        ]
+
+
+def _round(value: float, digits: int) -> float:
+    return round(value + 1e-12, digits)
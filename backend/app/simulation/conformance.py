@@ -0,0 +1,279 @@
+"""Conformance checks for alternative simulation backends.
+
+A backend bundles replacements for ``arena_engine.simulate``,
+``arena_engine.compare`` and ``engine.build_simulation_payload``; any of them
+may be left out. Two checks keep seeded results from drifting:
+
+- ``golden_digests`` hashes the RNG streams and the seeded parts of the
+  reference results for a fixed matrix of cases, to be compared with
+  ``conformance.json`` (regenerate it with
+  ``python -m backend.benchmarks.conformance --update`` only for an intended
+  change of outputs);
+- ``differential`` runs a registered backend on the same cases and compares
+  its full results with the reference engine's, timing both.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .. import schemas
+from . import arena_engine
+from .engine import build_simulation_payload
+from .rng import LegacyLcg31, LegacyLcg32, Pcg32
+
+GOLDEN_PATH = Path(__file__).with_name("conformance.json")
+RNG_DRAWS = 1000
+
+
+@dataclass(frozen=True)
+class Backend:
+    simulate: Callable[..., dict[str, object]] | None = None
+    compare: Callable[..., dict[str, object]] | None = None
+    build_payload: (
+        Callable[[schemas.SimulationExecuteRequest], schemas.SimulationCreate] | None
+    ) = None
+
+
+REFERENCE = "reference"
+BACKENDS: dict[str, Backend] = {}
+
+
+def register_backend(name: str, backend: Backend) -> None:
+    BACKENDS[name] = backend
+
+
+def _final_event(events: Iterator[tuple[str, dict[str, object]]]) -> dict[str, object]:
+    data: dict[str, object] = {}
+    for _event, data in events:
+        pass
+    return data
+
+
+register_backend(
+    REFERENCE,
+    Backend(
+        simulate=arena_engine.simulate,
+        compare=arena_engine.compare,
+        build_payload=build_simulation_payload,
+    ),
+)
+# The streamed and batched endpoints must produce the reference results too.
+register_backend(
+    "streaming",
+    Backend(
+        simulate=lambda **kwargs: _final_event(
+            arena_engine.iter_simulate(**kwargs, progress=True)
+        ),
+        compare=lambda **kwargs: _final_event(arena_engine.iter_compare(**kwargs)),
+    ),
+)
+register_backend(
+    "batch",
+    Backend(
+        simulate=lambda **kwargs: arena_engine.simulate_batch([kwargs])[0]["result"]
+    ),
+)
+
+
+_PROBABILITIES = {"low": 0.2, "normal": 0.5, "high": 0.3}
+_CATEGORIES = [
+    {"name": "very_dry", "probability": 0.1, "yield": 1.0},
+    {"name": "dry", "probability": 0.2, "yield": 2.0},
+    {"name": "normal", "probability": 0.4, "yield": 4.0},
+    {"name": "wet", "probability": 0.2, "yield": 3.5},
+    {"name": "flood", "probability": 0.1, "yield": 1.5},
+]
+
+SIMULATE_CASES: dict[str, dict[str, Any]] = {
+    **{
+        f"simulate/custom/{seed}": {
+            "scenario": "custom",
+            "seasons": 12,
+            "replications": 7,
+            "probabilities": _PROBABILITIES,
+            "seed": seed,
+            "include_rows": True,
+        }
+        for seed in ("a", "seed-123", "golden")
+    },
+    "simulate/drought/large": {
+        "scenario": "drought",
+        "seasons": 50,
+        "replications": 100,
+        "probabilities": {"low": 0.6, "normal": 0.3, "high": 0.1},
+        "seed": "large",
+    },
+    "simulate/stratified": {
+        "scenario": "flood",
+        "seasons": 8,
+        "replications": 40,
+        "probabilities": {"low": 0.1, "normal": 0.3, "high": 0.6},
+        "seed": "strata",
+        "include_rows": True,
+        "sampling": "stratified",
+        "chart": {"histogram_bins": 8},
+    },
+    "simulate/pcg32": {
+        "scenario": "custom",
+        "seasons": 10,
+        "replications": 10,
+        "probabilities": _PROBABILITIES,
+        "seed": "pcg",
+        "include_rows": True,
+        "rng_kind": "pcg32",
+    },
+    "simulate/categories": {
+        "scenario": "custom",
+        "seasons": 10,
+        "replications": 20,
+        "probabilities": None,
+        "categories": _CATEGORIES,
+        "seed": "bins",
+        "include_rows": True,
+        "risk": {"level": 0.9, "consecutive_low_seasons": 2},
+    },
+}
+
+COMPARE_CASES: dict[str, dict[str, Any]] = {
+    **{
+        f"compare/{seed}": {"seasons": 6, "replications": 4, "seed": seed}
+        for seed in ("a", "seed-123", "golden")
+    },
+    "compare/stratified-pcg32": {
+        "seasons": 10,
+        "replications": 25,
+        "seed": "mixed",
+        "sampling": "stratified",
+        "rng_kind": "pcg32",
+    },
+}
+
+PAYLOAD_CASES: dict[str, dict[str, Any]] = {
+    f"payload/{mode}/{storage}": {
+        "run_mode": mode,
+        "scenario_id": 2,
+        "num_seasons": 9,
+        "num_replications": 5,
+        "probabilities": {"low": 30, "normal": 50, "high": 20},
+        "seed": 77,
+        "storage_mode": storage,
+    }
+    for mode in ("single", "all_scenarios")
+    for storage in ("full", "recompute")
+}
+
+
+def _digest(value: object) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def rng_digests() -> dict[str, str]:
+    generators = {
+        "rng/legacy31/1": LegacyLcg31(1),
+        "rng/legacy31/12345": LegacyLcg31(12345),
+        "rng/legacy32/a": LegacyLcg32("a"),
+        "rng/legacy32/seed-123|custom|1": LegacyLcg32("seed-123|custom|1"),
+        "rng/pcg32/42-54": Pcg32(42, 54),
+        "rng/pcg32/key": Pcg32.from_key("seed", "custom", "1"),
+    }
+    return {
+        name: _digest([repr(draw) for draw in generator.fill(RNG_DRAWS)])
+        for name, generator in generators.items()
+    }
+
+
+def _seeded_simulate(result: dict[str, object]) -> object:
+    return [result["overall"], result["replication_results"], result.get("rows")]
+
+
+def _seeded_compare(result: dict[str, object]) -> object:
+    return [
+        [scenario["scenario"], scenario["probabilities"], scenario["overall"]]
+        for scenario in result["scenarios"]
+    ]
+
+
+def _seeded_payload(payload: schemas.SimulationCreate) -> object:
+    return [
+        payload.checksum,
+        [
+            [run.run_index, [(s.rainfall, s.yield_amount) for s in run.seasons]]
+            for run in payload.runs
+        ],
+        payload.average_yield,
+        payload.yield_variability,
+        payload.low_yield_percent,
+    ]
+
+
+def golden_digests() -> dict[str, str]:
+    """Digests of the RNG streams and the reference engine's seeded results."""
+    reference = BACKENDS[REFERENCE]
+    digests = rng_digests()
+    for name, kwargs in SIMULATE_CASES.items():
+        digests[name] = _digest(_seeded_simulate(reference.simulate(**kwargs)))
+    for name, kwargs in COMPARE_CASES.items():
+        digests[name] = _digest(_seeded_compare(reference.compare(**kwargs)))
+    for name, kwargs in PAYLOAD_CASES.items():
+        request = schemas.SimulationExecuteRequest.model_validate(kwargs)
+        digests[name] = _digest(_seeded_payload(reference.build_payload(request)))
+    return digests
+
+
+def load_golden(path: Path = GOLDEN_PATH) -> dict[str, str]:
+    return json.loads(path.read_text())
+
+
+def write_golden(path: Path = GOLDEN_PATH) -> dict[str, str]:
+    digests = golden_digests()
+    path.write_text(json.dumps(digests, indent=2, sort_keys=True) + "\n")
+    return digests
+
+
+def _timed(func: Callable[[], object]) -> tuple[object, float]:
+    started = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - started
+
+
+def _calls(backend: Backend) -> Iterator[tuple[str, Callable[[Backend], object]]]:
+    if backend.simulate is not None:
+        for case, kwargs in SIMULATE_CASES.items():
+            yield case, lambda b, k=kwargs: b.simulate(**k)
+    if backend.compare is not None:
+        for case, kwargs in COMPARE_CASES.items():
+            yield case, lambda b, k=kwargs: b.compare(**k)
+    if backend.build_payload is not None:
+        for case, kwargs in PAYLOAD_CASES.items():
+            request = schemas.SimulationExecuteRequest.model_validate(kwargs)
+            yield case, lambda b, r=request: b.build_payload(r).model_dump()
+
+
+def differential(name: str) -> list[dict[str, object]]:
+    """Run backend ``name`` and the reference on every case it implements.
+
+    Returns one ``{case, match, reference_seconds, backend_seconds}`` entry per
+    case; ``match`` means the complete results are equal.
+    """
+    backend = BACKENDS[name]
+    reference = BACKENDS[REFERENCE]
+    report = []
+    for case, call in _calls(backend):
+        expected, reference_seconds = _timed(lambda: call(reference))
+        actual, backend_seconds = _timed(lambda: call(backend))
+        report.append(
+            {
+                "case": case,
+                "match": actual == expected,
+                "reference_seconds": reference_seconds,
+                "backend_seconds": backend_seconds,
+            }
+        )
+    return report
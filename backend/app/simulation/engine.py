@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import time
 from typing import Callable, Iterable
 
 from .. import schemas
+from .cancellation import CancellationToken
 from .presets import list_presets_for_api
-
-SCENARIOS: list[dict[str, object]] = list_presets_for_api()
+from .rng import LegacyLcg31, Rng
+from .stats import RunningStats
 
 YIELD_BY_RAINFALL: dict[str, float] = {
     "low": 2.0,
@@ -16,20 +18,14 @@ YIELD_BY_RAINFALL: dict[str, float] = {
 
 
 def _seeded_random(seed: int) -> Callable[[], float]:
-    state = seed & 0x7FFFFFFF
-
-    def _next() -> float:
-        nonlocal state
-        state = (state * 1103515245 + 12345) & 0x7FFFFFFF
-        return state / 0x7FFFFFFF
+    # Kept for callers of the old closure API; runs use LegacyLcg31 directly.
+    return LegacyLcg31(seed).random
 
-    return _next
 
-
-def _determine_rainfall(
-    probabilities: schemas.RainfallProbabilities, random_fn: Callable[[], float]
+def _rainfall_for_draw(
+    probabilities: schemas.RainfallProbabilities, draw: float
 ) -> schemas.RainfallLevel:
-    roll = random_fn() * 100
+    roll = draw * 100
     if roll < probabilities.low:
         return "low"
     if roll < probabilities.low + probabilities.normal:
@@ -38,14 +34,16 @@ def _determine_rainfall(
 
 
 def _calculate_variability(yields: Iterable[float]) -> schemas.YieldVariability:
-    values = list(yields)
-    if not values:
+    return _variability_from_stats(RunningStats.from_values(yields))
+
+
+def _variability_from_stats(stats: RunningStats) -> schemas.YieldVariability:
+    if not stats.count:
         return "low"
-    mean = sum(values) / len(values)
+    mean = stats.mean
     if mean <= 0:
         return "low"
-    variance = sum((value - mean) ** 2 for value in values) / len(values)
-    cv = (variance ** 0.5 / mean) * 100
+    cv = (stats.variance ** 0.5 / mean) * 100
     if cv < 15:
         return "low"
     if cv < 30:
@@ -57,18 +55,15 @@ def _round(value: float, digits: int) -> float:
     return round(value + 1e-12, digits)
 
 
-def _run_single_simulation(
-    *,
-    run_index: int,
-    scenario_id: int,
+def _simulate_seasons(
     num_seasons: int,
     probabilities: schemas.RainfallProbabilities,
-    random_fn: Callable[[], float],
-) -> dict[str, object]:
+    rng: Rng,
+) -> list[dict[str, object]]:
     seasons: list[dict[str, object]] = []
 
-    for season_index in range(num_seasons):
-        rainfall = _determine_rainfall(probabilities, random_fn)
+    for season_index, draw in enumerate(rng.fill(num_seasons)):
+        rainfall = _rainfall_for_draw(probabilities, draw)
         seasons.append(
             {
                 "season_index": season_index,
@@ -77,6 +72,19 @@ def _run_single_simulation(
             }
         )
 
+    return seasons
+
+
+def _run_single_simulation(
+    *,
+    run_index: int,
+    scenario_id: int,
+    num_seasons: int,
+    probabilities: schemas.RainfallProbabilities,
+    rng: Rng,
+) -> dict[str, object]:
+    seasons = _simulate_seasons(num_seasons, probabilities, rng)
+
     yields = [season["yield_amount"] for season in seasons]
     average_yield = sum(yields) / len(yields)
     min_yield = min(yields)
@@ -109,7 +117,12 @@ def _aggregate_runs(runs: list[dict[str, object]]) -> dict[str, object]:
             if season["rainfall"] == "low":
                 low_season_count += 1
 
-    if not all_yields:
+    return aggregate_stats(RunningStats.from_values(all_yields), low_season_count)
+
+
+def aggregate_stats(stats: RunningStats, low_season_count: int) -> dict[str, object]:
+    """Simulation-level aggregates from the season yield summary."""
+    if not stats.count:
         return {
             "average_yield": 0.0,
             "min_yield": 0.0,
@@ -118,20 +131,103 @@ def _aggregate_runs(runs: list[dict[str, object]]) -> dict[str, object]:
             "low_yield_percent": 0.0,
         }
 
-    average_yield = sum(all_yields) / len(all_yields)
-    min_yield = min(all_yields)
-    max_yield = max(all_yields)
-    low_yield_percent = (low_season_count / len(all_yields)) * 100
+    low_yield_percent = (low_season_count / stats.count) * 100
 
     return {
-        "average_yield": _round(average_yield, 2),
-        "min_yield": min_yield,
-        "max_yield": max_yield,
-        "yield_variability": _calculate_variability(all_yields),
+        "average_yield": _round(stats.mean, 2),
+        "min_yield": stats.minimum,
+        "max_yield": stats.maximum,
+        "yield_variability": _variability_from_stats(stats),
         "low_yield_percent": _round(low_yield_percent, 1),
     }
 
 
+CHECKSUM_PREFIX = "v2:"
+_CHECKSUM_MODULUS = 1 << 256
+
+
+def run_checksum(run_index: int, seasons: Iterable[tuple[int, str, float]]) -> int:
+    """Hash of one run's ``(season_index, rainfall, yield)`` tuples."""
+    digest = hashlib.sha256(f"v2:{run_index}".encode())
+    for season_index, rainfall, yield_amount in seasons:
+        digest.update(f"\n{season_index}:{rainfall}:{float(yield_amount)!r}".encode())
+    return int.from_bytes(digest.digest(), "big")
+
+
+def combine_run_checksums(run_checksums: Iterable[int], base: str | None = None) -> str:
+    """Combine per-run hashes into a simulation checksum.
+
+    The per-run hashes are added modulo 2**256, so runs appended later are
+    folded into an existing ``base`` checksum without rereading earlier runs.
+    """
+    total = int(base[len(CHECKSUM_PREFIX):], 16) if base else 0
+    for value in run_checksums:
+        total = (total + value) % _CHECKSUM_MODULUS
+    return f"{CHECKSUM_PREFIX}{total:064x}"
+
+
+def season_checksum(
+    runs: Iterable[tuple[int, Iterable[tuple[int, str, float]]]],
+) -> str:
+    """Legacy (v1) hash of ``(run_index, [(season_index, rainfall, yield), ...])`` pairs.
+
+    Still used to verify simulations stored before per-run checksums.
+    """
+    digest = hashlib.sha256(b"v1")
+    for run_index, seasons in runs:
+        for season_index, rainfall, yield_amount in seasons:
+            digest.update(
+                f"\n{run_index}:{season_index}:{rainfall}:{float(yield_amount)!r}".encode()
+            )
+    return digest.hexdigest()
+
+
+def regenerate_run_seasons(
+    *,
+    seed: int,
+    run_index: int,
+    num_seasons: int,
+    probabilities: schemas.RainfallProbabilities,
+) -> list[dict[str, object]]:
+    """Recompute the seasons of a stored run from its seed.
+
+    ``build_simulation_payload`` seeds run ``idx`` with ``seed + idx`` in both
+    run modes, so a run only needs the simulation seed and its own settings.
+    """
+    return _simulate_seasons(num_seasons, probabilities, LegacyLcg31(seed + run_index))
+
+
+def build_runs(
+    *,
+    seed: int,
+    start_index: int,
+    count: int,
+    scenario_id: int,
+    num_seasons: int,
+    probabilities: schemas.RainfallProbabilities,
+    cancel: CancellationToken | None = None,
+) -> list[dict[str, object]]:
+    """Runs ``start_index`` .. ``start_index + count - 1`` of a single-scenario simulation.
+
+    Each run only depends on ``seed + run_index``, so a stored simulation can be
+    extended with more replications without recomputing the earlier ones.
+    """
+    runs: list[dict[str, object]] = []
+    for idx in range(start_index, start_index + count):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        runs.append(
+            _run_single_simulation(
+                run_index=idx,
+                scenario_id=scenario_id,
+                num_seasons=num_seasons,
+                probabilities=probabilities,
+                rng=LegacyLcg31(seed + idx),
+            )
+        )
+    return runs
+
+
 def _ensure_name(name: str | None) -> str:
     if not name:
         return "Simulation"
@@ -141,6 +237,7 @@ def _ensure_name(name: str | None) -> str:
 
 def build_simulation_payload(
     request: schemas.SimulationExecuteRequest,
+    cancel: CancellationToken | None = None,
 ) -> schemas.SimulationCreate:
     seed_value = request.seed
     if seed_value is None:
@@ -149,41 +246,51 @@ def build_simulation_payload(
     runs: list[dict[str, object]] = []
 
     if request.run_mode == "all_scenarios":
-        for idx, scenario in enumerate(SCENARIOS):
+        for idx, scenario in enumerate(list_presets_for_api()):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
             probabilities = schemas.RainfallProbabilities.model_validate(
                 scenario["default_probabilities"]
             )
-            random_fn = _seeded_random(seed_value + idx)
             runs.append(
                 _run_single_simulation(
                     run_index=idx,
                     scenario_id=int(scenario["id"]),
                     num_seasons=request.num_seasons,
                     probabilities=probabilities,
-                    random_fn=random_fn,
+                    rng=LegacyLcg31(seed_value + idx),
                 )
             )
         run_count = len(runs)
     else:
-        probabilities = request.probabilities
-        for idx in range(request.num_replications):
-            random_fn = _seeded_random(seed_value + idx)
-            runs.append(
-                _run_single_simulation(
-                    run_index=idx,
-                    scenario_id=request.scenario_id,
-                    num_seasons=request.num_seasons,
-                    probabilities=probabilities,
-                    random_fn=random_fn,
-                )
-            )
+        runs = build_runs(
+            seed=seed_value,
+            start_index=0,
+            count=request.num_replications,
+            scenario_id=request.scenario_id,
+            num_seasons=request.num_seasons,
+            probabilities=request.probabilities,
+            cancel=cancel,
+        )
         run_count = request.num_replications
 
     aggregated = _aggregate_runs(runs)
+    checksum = combine_run_checksums(
+        run_checksum(
+            int(run["run_index"]),
+            (
+                (season["season_index"], season["rainfall"], season["yield_amount"])
+                for season in run["seasons"]
+            ),
+        )
+        for run in runs
+    )
 
     return schemas.SimulationCreate(
         name=_ensure_name(request.name),
         run_mode=request.run_mode,
+        storage_mode=request.storage_mode,
+        checksum=checksum,
         num_seasons=request.num_seasons,
         num_replications=run_count,
         seed=seed_value,
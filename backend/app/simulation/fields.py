@@ -0,0 +1,338 @@
+"""Many fields simulated together under a shared regional rainfall shock.
+
+Rainfall on a plot is a Gaussian copula: the plot's latent rainfall is
+``sqrt(rho) * Z + sqrt(1 - rho) * e`` with a regional shock ``Z`` per
+replication and season and independent plot noise ``e``; its standard normal
+quantile picks the plot's category through the field's cumulative cutoffs, so
+categories are ordered from driest to wettest. Given ``Z`` the plots are
+independent with known category probabilities, so a season is drawn for all
+fields at once rather than field by field:
+
+- single-plot fields are held as columns with one entry per field. A plot lies
+  above category boundary ``j`` when its uniform draw is at least its
+  conditional probability of falling below it, and that comparison runs over a
+  whole column in a few C-level ``map`` passes (``math.erfc`` for the normal
+  CDF), so a boundary costs no Python bytecode per field;
+- a field of several identical plots draws the number of plots in each
+  category as one multinomial, so a season of a 10,000-plot field costs a
+  handful of draws.
+
+Yields are fixed per category, so per-field stats follow from the category
+counts alone.
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import compress, repeat
+from operator import add, le, sub
+from statistics import NormalDist
+
+from .arena_engine import (
+    LOW_YIELD_THRESHOLD,
+    _generate_seed,
+    _running_stats,
+    category_sampler,
+)
+from .cancellation import CancellationToken
+from .engine import YIELD_BY_RAINFALL
+from .rng import Rng, RngKind, keyed_rng
+from .stats import RunningStats
+
+_NORMAL = NormalDist()
+_SQRT2 = math.sqrt(2.0)
+
+
+def _inv_cdf(p: float) -> float:
+    if p <= 0.0:
+        return -math.inf
+    if p >= 1.0:
+        return math.inf
+    return _NORMAL.inv_cdf(p)
+
+
+def _open_unit(draw: float) -> float:
+    # Generators may return exactly 0.0; the normal quantile needs (0, 1).
+    return draw if draw > 0.0 else 2.0**-33
+
+
+def binomial(n: int, p: float, rng: Rng) -> int:
+    """Binomial draw: waiting-time inversion for small means, BTRS otherwise.
+
+    BTRS is the transformed rejection sampler of Hörmann (1993); its expected
+    cost does not depend on ``n``.
+    """
+    if n <= 0 or p <= 0.0:
+        return 0
+    if p >= 1.0:
+        return n
+    if p > 0.5:
+        return n - binomial(n, 1.0 - p, rng)
+
+    if n * p < 10.0:
+        log_q = math.log(1.0 - p)
+        count = trials = 0
+        while True:
+            trials += math.floor(math.log(1.0 - rng.random()) / log_q) + 1
+            if trials > n:
+                return count
+            count += 1
+
+    spq = math.sqrt(n * p * (1.0 - p))
+    b = 1.15 + 2.53 * spq
+    a = -0.0873 + 0.0248 * b + 0.01 * p
+    c = n * p + 0.5
+    v_r = 0.92 - 4.2 / b
+    alpha = (2.83 + 5.1 / b) * spq
+    lpq = math.log(p / (1.0 - p))
+    m = math.floor((n + 1) * p)
+    h = math.lgamma(m + 1) + math.lgamma(n - m + 1)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        k = math.floor((2.0 * a / us + b) * u + c) if us > 0.0 else -1
+        if k < 0 or k > n:
+            continue
+        if us >= 0.07 and v <= v_r:
+            return k
+        if v <= 0.0:
+            continue
+        v = math.log(v * alpha / (a / (us * us) + b))
+        if v <= h - math.lgamma(k + 1) - math.lgamma(n - k + 1) + (k - m) * lpq:
+            return k
+
+
+def multinomial(n: int, probabilities: list[float], rng: Rng) -> list[int]:
+    """Category counts of ``n`` trials, as a chain of conditional binomials."""
+    counts = [0] * len(probabilities)
+    remaining = n
+    mass = 1.0
+    for index, probability in enumerate(probabilities[:-1]):
+        if remaining <= 0:
+            break
+        share = probability / mass if mass > 0.0 else 0.0
+        counts[index] = binomial(remaining, min(max(share, 0.0), 1.0), rng)
+        remaining -= counts[index]
+        mass -= probability
+    counts[-1] += remaining
+    return counts
+
+
+def _field_categories(field: dict[str, object]) -> list[dict[str, object]]:
+    if field.get("categories") is not None:
+        return list(field["categories"])
+    probabilities = dict(field["probabilities"])
+    yields = dict(field.get("yields") or YIELD_BY_RAINFALL)
+    return [
+        {"name": level, "probability": probabilities[level], "yield": yields[level]}
+        for level in ("low", "normal", "high")
+    ]
+
+
+class _Field:
+    __slots__ = ("name", "plots", "names", "yields", "z_cutoffs", "counts")
+
+    def __init__(self, field: dict[str, object]) -> None:
+        categories = _field_categories(field)
+        sampler, yield_by_name = category_sampler(categories)
+        self.name = str(field["name"])
+        self.plots = int(field.get("plots", 1))
+        self.names = list(sampler.labels)
+        self.yields = [yield_by_name[name] for name in self.names]
+        self.z_cutoffs = [_inv_cdf(cutoff) for cutoff in sampler.cutoffs]
+        self.counts = [0] * len(self.names)
+
+    def conditional_probabilities(
+        self, loading: float, scale: float, shock: float
+    ) -> list[float]:
+        """Category probabilities of one plot given the regional ``shock``."""
+        if scale == 0.0:
+            # Perfect correlation: every plot falls where the shock does.
+            below = [1.0 if shock < z else 0.0 for z in self.z_cutoffs]
+        else:
+            below = [
+                _NORMAL.cdf((z - loading * shock) / scale) for z in self.z_cutoffs
+            ]
+        below.append(1.0)
+        previous = 0.0
+        probabilities = []
+        for value in below:
+            probabilities.append(max(value - previous, 0.0))
+            previous = max(previous, value)
+        return probabilities
+
+    def stats(self) -> tuple[RunningStats, int]:
+        return _stats_from_counts(self.counts, self.yields)
+
+
+class _Columns:
+    """Single-plot fields with the same number of categories, drawn together.
+
+    ``boundaries[j]`` holds every field's ``j``-th cutoff divided by
+    ``scale * sqrt(2)``, so with ``shift = loading * Z / (scale * sqrt(2))`` the
+    conditional probability below it is ``erfc(shift - boundary) / 2``.
+    ``above[j]`` counts each field's seasons above that boundary so far.
+    """
+
+    __slots__ = ("fields", "boundaries", "steps", "base", "above")
+
+    def __init__(self, fields: list[_Field], scale: float) -> None:
+        unit = 1.0 / (scale * _SQRT2) if scale > 0.0 else 1.0
+        width = len(fields[0].z_cutoffs)
+        self.fields = fields
+        self.boundaries = [
+            [field.z_cutoffs[j] * unit for field in fields] for j in range(width)
+        ]
+        # Yield gained by crossing each boundary, so a season's total is the
+        # driest yields plus the steps of the boundaries crossed.
+        self.steps = [
+            [field.yields[j + 1] - field.yields[j] for field in fields]
+            for j in range(width)
+        ]
+        self.base = sum(field.yields[0] for field in fields)
+        self.above = [[0] * len(fields) for _ in range(width)]
+
+    def draw(self, rng: Rng, shock: float, loading: float, scale: float) -> float:
+        """Draw one season of every field; returns the sum of their yields."""
+        total = self.base
+        if scale == 0.0:
+            # Perfect correlation: every plot falls where the shock does.
+            crossings = [
+                list(map(le, column, repeat(shock))) for column in self.boundaries
+            ]
+        else:
+            shift = loading * shock / (scale * _SQRT2)
+            doubled = [draw + draw for draw in rng.fill(len(self.fields))]
+            crossings = [
+                list(map(le, map(math.erfc, map(sub, repeat(shift), column)), doubled))
+                for column in self.boundaries
+            ]
+        for j, crossed in enumerate(crossings):
+            self.above[j] = list(map(add, self.above[j], crossed))
+            total += sum(compress(self.steps[j], crossed))
+        return total
+
+    def finish(self, draws: int) -> None:
+        """Turn the boundary counts of ``draws`` seasons into category counts."""
+        for index, field in enumerate(self.fields):
+            at_least = [draws, *(above[index] for above in self.above), 0]
+            field.counts = [
+                at_least[k] - at_least[k + 1] for k in range(len(field.names))
+            ]
+
+
+def _columns(states: list[_Field], scale: float) -> list[_Columns]:
+    by_width: dict[int, list[_Field]] = {}
+    for state in states:
+        if state.plots == 1:
+            by_width.setdefault(len(state.z_cutoffs), []).append(state)
+    return [_Columns(group, scale) for group in by_width.values()]
+
+
+def _stats_from_counts(
+    counts: list[int], yields: list[float]
+) -> tuple[RunningStats, int]:
+    present = [(count, value) for count, value in zip(counts, yields) if count]
+    total_count = sum(count for count, _value in present)
+    if not total_count:
+        return RunningStats(), 0
+    total = sum(count * value for count, value in present)
+    mean = total / total_count
+    stats = RunningStats(
+        count=total_count,
+        total=total,
+        m2=sum(count * (value - mean) ** 2 for count, value in present),
+        minimum=min(value for _count, value in present),
+        maximum=max(value for _count, value in present),
+    )
+    low = sum(count for count, value in present if value <= LOW_YIELD_THRESHOLD)
+    return stats, low
+
+
+def simulate_fields(
+    *,
+    fields: list[dict[str, object]],
+    seasons: int,
+    replications: int,
+    correlation: float = 0.0,
+    seed: str | None = None,
+    rng_kind: RngKind = "legacy",
+    cancel: CancellationToken | None = None,
+) -> dict[str, object]:
+    """Simulate ``fields`` (``{name, plots, probabilities | categories, yields?}``).
+
+    ``correlation`` is the latent rainfall correlation between any two plots.
+    Returns per-field stats over all of the field's plot-seasons, ``pooled``
+    stats over every plot-season, and ``regional`` stats of the cooperative's
+    mean yield per replication and season, which is where the correlation shows.
+    ``field_seasons`` counts fields and ``plot_seasons`` plots, per season and
+    replication.
+    Replication ``i`` uses the ``rng_kind`` stream ``seed|fields|i``.
+    """
+    if not 0.0 <= correlation <= 1.0:
+        raise ValueError("correlation must be between 0 and 1")
+    resolved_seed = _generate_seed(seed)
+    states = [_Field(field) for field in fields]
+    loading = math.sqrt(correlation)
+    scale = math.sqrt(1.0 - correlation)
+    total_plots = sum(state.plots for state in states)
+    columns = _columns(states, scale)
+    grouped = [state for state in states if state.plots > 1]
+    regional_means: list[float] = []
+
+    for replication in range(1, replications + 1):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        rng = keyed_rng(rng_kind, resolved_seed, "fields", str(replication))
+        for _season in range(seasons):
+            shock = _NORMAL.inv_cdf(_open_unit(rng.random()))
+            season_total = 0.0
+            for group in columns:
+                season_total += group.draw(rng, shock, loading, scale)
+            for state in grouped:
+                counts = multinomial(
+                    state.plots,
+                    state.conditional_probabilities(loading, scale, shock),
+                    rng,
+                )
+                for index, count in enumerate(counts):
+                    state.counts[index] += count
+                    season_total += count * state.yields[index]
+            regional_means.append(season_total / total_plots)
+    for group in columns:
+        group.finish(seasons * replications)
+
+    pooled = RunningStats()
+    pooled_low = 0
+    field_results: list[dict[str, object]] = []
+    for state in states:
+        stats, low = state.stats()
+        pooled = pooled.merge(stats)
+        pooled_low += low
+        field_results.append(
+            {
+                "name": state.name,
+                "plots": state.plots,
+                "overall": _running_stats(stats, low),
+                "rainfall_counts": [
+                    {"name": name, "count": count}
+                    for name, count in zip(state.names, state.counts)
+                ],
+            }
+        )
+
+    regional = RunningStats.from_values(regional_means)
+    regional_low = sum(1 for value in regional_means if value <= LOW_YIELD_THRESHOLD)
+    return {
+        "seasons": seasons,
+        "replications": replications,
+        "seed": resolved_seed,
+        "correlation": correlation,
+        "rng": rng_kind,
+        "field_seasons": len(states) * seasons * replications,
+        "plot_seasons": total_plots * seasons * replications,
+        "fields": field_results,
+        "pooled": _running_stats(pooled, pooled_low),
+        "regional": _running_stats(regional, regional_low),
+    }
@@ -0,0 +1,154 @@
+"""Historical rainfall series, memory-mapped and resampled by block bootstrap.
+
+A series named ``station`` is read from ``RAINFALL_DATA_DIR`` (default
+``backend/data/rainfall``): either ``station.f64``, raw native-endian float64
+values in season order, or ``station.csv`` with the rainfall in the last
+column. A CSV is converted once, streaming, to a ``station.f64`` sidecar that
+is rebuilt when the CSV changes. The binary file is memory-mapped, so a
+resample only pages in the blocks it reads and archives larger than RAM work.
+"""
+
+from __future__ import annotations
+
+import csv
+import mmap
+import os
+import re
+import tempfile
+import threading
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+from .rng import Rng
+
+# backend/data/rainfall, next to the default database; not imported from db so
+# the engines stay free of the database layer.
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "rainfall"
+SERIES_NAME_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]*$"
+_SERIES_NAME = re.compile(SERIES_NAME_PATTERN)
+_CSV_CHUNK = 65536
+_conversion_locks: dict[Path, threading.Lock] = {}
+_conversion_locks_guard = threading.Lock()
+
+
+class HistoricalDataError(ValueError):
+    """A rainfall series is missing or unreadable."""
+
+
+def data_dir() -> Path:
+    return Path(os.getenv("RAINFALL_DATA_DIR") or DEFAULT_DATA_DIR)
+
+
+class RainfallSeries:
+    """Float64 values of a series file, mapped read-only."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if not size or size % 8:
+                raise HistoricalDataError(f"{path.name} is not a float64 series")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.values = memoryview(self._map).cast("d")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+@lru_cache(maxsize=8)
+def _open_mapped(path: str, _mtime_ns: int, _size: int) -> RainfallSeries:
+    # Keyed on mtime and size so a replaced file is mapped afresh.
+    return RainfallSeries(Path(path))
+
+
+def _conversion_lock(target: Path) -> threading.Lock:
+    with _conversion_locks_guard:
+        return _conversion_locks.setdefault(target, threading.Lock())
+
+
+def _convert_csv(source: Path, target: Path) -> None:
+    # Each conversion writes its own temporary file and renames it into place,
+    # so a concurrent conversion (in another process too) never sees a partial
+    # or interleaved sidecar.
+    fd, partial_name = tempfile.mkstemp(
+        dir=target.parent, prefix=f".{target.name}.", suffix=".partial"
+    )
+    partial = Path(partial_name)
+    count = 0
+    try:
+        with source.open(newline="") as handle, os.fdopen(fd, "wb") as out:
+            chunk = array("d")
+            for row in csv.reader(handle):
+                if not row:
+                    continue
+                try:
+                    chunk.append(float(row[-1]))
+                except ValueError:
+                    continue  # header or comment line
+                if len(chunk) >= _CSV_CHUNK:
+                    count += len(chunk)
+                    chunk.tofile(out)
+                    chunk = array("d")
+            count += len(chunk)
+            chunk.tofile(out)
+        if not count:
+            raise HistoricalDataError(f"{source.name} has no numeric rainfall values")
+        os.replace(partial, target)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def _is_stale(source: Path, binary: Path) -> bool:
+    return source.is_file() and (
+        not binary.is_file() or binary.stat().st_mtime_ns < source.stat().st_mtime_ns
+    )
+
+
+def open_series(name: str) -> RainfallSeries:
+    """Map the series ``name`` from the data directory, converting a CSV first."""
+    if not _SERIES_NAME.match(name):
+        raise HistoricalDataError(f"invalid series name: {name!r}")
+    directory = data_dir()
+    binary = directory / f"{name}.f64"
+    source = directory / f"{name}.csv"
+    try:
+        if _is_stale(source, binary):
+            # Concurrent first requests for a series convert it once; the
+            # others wait here and find the sidecar up to date.
+            with _conversion_lock(binary):
+                if _is_stale(source, binary):
+                    _convert_csv(source, binary)
+        stat = binary.stat()
+    except FileNotFoundError:
+        raise HistoricalDataError(f"rainfall series not found: {name}") from None
+    except OSError as exc:
+        raise HistoricalDataError(f"cannot read rainfall series {name}: {exc}") from exc
+    return _open_mapped(str(binary), stat.st_mtime_ns, stat.st_size)
+
+
+def block_bootstrap(
+    values: Sequence[float], length: int, block_length: int, rng: Rng
+) -> list[float]:
+    """``length`` values made of random contiguous blocks of ``values``.
+
+    Blocks keep the season-to-season dependence of the record; each starts at
+    a uniformly drawn position (moving block bootstrap).
+    """
+    count = len(values)
+    block = min(block_length, count)
+    starts = count - block + 1
+    out: list[float] = []
+    while len(out) < length:
+        start = int(rng.random() * starts)
+        out.extend(values[start : start + block])
+    del out[length:]
+    return out
+
+
+def classify(values: list[float], low_below: float, high_above: float) -> list[str]:
+    """Rainfall levels: below ``low_below`` is low, from ``high_above`` up is high."""
+    return [
+        "low" if value < low_below else "high" if value >= high_above else "normal"
+        for value in values
+    ]
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from functools import lru_cache
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
+from .categorical import CategoricalSampler, normalize_probabilities
+
+logger = logging.getLogger(__name__)
 
 PRESETS_PATH = (
     Path(__file__).resolve().parents[3]
@@ -13,21 +21,7 @@ PRESETS_PATH = (
     / "scenario-presets.json"
 )
 
-
-@lru_cache(maxsize=1)
-def load_presets() -> list[dict[str, object]]:
-    with PRESETS_PATH.open("r", encoding="utf-8-sig") as handle:
-        data = json.load(handle)
-    if not isinstance(data, list):
-        raise ValueError("scenario presets must be a list")
-    return data
-
-
-def get_preset_by_key(key: str) -> dict[str, object]:
-    for preset in load_presets():
-        if preset.get("key") == key:
-            return preset
-    raise KeyError(f"Unknown scenario key: {key}")
+PRESET_CHECK_INTERVAL = float(os.getenv("PRESET_CHECK_INTERVAL", "2.0"))
 
 
 def probabilities_to_percent(probabilities: dict[str, float]) -> dict[str, int]:
@@ -41,23 +35,135 @@ def probabilities_to_percent(probabilities: dict[str, float]) -> dict[str, int]:
     }
 
 
-def list_presets_for_api() -> list[dict[str, object]]:
-    scenarios: list[dict[str, object]] = []
-    for preset in load_presets():
+@dataclass(frozen=True)
+class PresetTable:
+    """Presets from one version of the file plus everything derived from them."""
+
+    presets: tuple[dict[str, object], ...]
+    by_key: dict[str, dict[str, object]]
+    by_id: dict[int, dict[str, object]]
+    samplers: dict[str, CategoricalSampler]
+    api: tuple[dict[str, object], ...]
+    digest: str
+    mtime_ns: int
+
+
+def compile_presets(raw: bytes, mtime_ns: int = 0) -> PresetTable:
+    data = json.loads(raw.decode("utf-8-sig"))
+    if not isinstance(data, list):
+        raise ValueError("scenario presets must be a list")
+
+    by_key: dict[str, dict[str, object]] = {}
+    by_id: dict[int, dict[str, object]] = {}
+    samplers: dict[str, CategoricalSampler] = {}
+    api: list[dict[str, object]] = []
+    for preset in data:
+        key = preset.get("key")
+        if key:
+            by_key.setdefault(str(key), preset)
+        if preset.get("id") is not None:
+            by_id.setdefault(int(preset["id"]), preset)
         probs = preset.get("probabilities")
         if not isinstance(probs, dict):
             continue
-        scenarios.append(
+        if key:
+            samplers[str(key)] = CategoricalSampler.rainfall(
+                normalize_probabilities(dict(probs))
+            )
+        api.append(
             {
                 "id": preset.get("id"),
-                "key": preset.get("key"),
+                "key": key,
                 "name": preset.get("name"),
                 "description": preset.get("description"),
                 "default_probabilities": probabilities_to_percent(probs),
             }
         )
-    return scenarios
+
+    return PresetTable(
+        presets=tuple(data),
+        by_key=by_key,
+        by_id=by_id,
+        samplers=samplers,
+        api=tuple(api),
+        digest=hashlib.sha256(raw).hexdigest(),
+        mtime_ns=mtime_ns,
+    )
+
+
+class PresetRegistry:
+    """Current preset table, reloaded when the presets file changes.
+
+    The file's mtime is checked at most every ``check_interval`` seconds. A new
+    table is compiled off to the side and swapped in with one assignment, then
+    subscribers are told so they can drop anything derived from the old one.
+    """
+
+    def __init__(self, path: Path, check_interval: float = PRESET_CHECK_INTERVAL) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._table: PresetTable | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[PresetTable], None]] = []
+
+    def subscribe(self, callback: Callable[[PresetTable], None]) -> None:
+        self._subscribers.append(callback)
+
+    def table(self) -> PresetTable:
+        table = self._table
+        if table is None:
+            return self.reload()
+        if self.check_interval >= 0 and time.monotonic() - self._checked_at >= self.check_interval:
+            self._checked_at = time.monotonic()
+            try:
+                changed = self.path.stat().st_mtime_ns != table.mtime_ns
+            except OSError:
+                changed = False
+            if changed:
+                try:
+                    return self.reload()
+                except (OSError, ValueError):
+                    logger.exception("keeping previous presets; reload of %s failed", self.path)
+        return table
+
+    def reload(self) -> PresetTable:
+        with self._lock:
+            mtime_ns = self.path.stat().st_mtime_ns
+            table = compile_presets(self.path.read_bytes(), mtime_ns)
+            previous = self._table
+            self._table = table
+            self._checked_at = time.monotonic()
+        if previous is not None and previous.digest != table.digest:
+            for callback in self._subscribers:
+                callback(table)
+        return table
+
+
+registry = PresetRegistry(PRESETS_PATH)
+
+
+def load_presets() -> list[dict[str, object]]:
+    return list(registry.table().presets)
+
+
+def get_preset_by_key(key: str) -> dict[str, object]:
+    try:
+        return registry.table().by_key[key]
+    except KeyError:
+        raise KeyError(f"Unknown scenario key: {key}") from None
+
+
+def get_preset_by_id(scenario_id: int) -> dict[str, object]:
+    try:
+        return registry.table().by_id[scenario_id]
+    except KeyError:
+        raise KeyError(f"Unknown scenario id: {scenario_id}") from None
+
+
+def list_presets_for_api() -> list[dict[str, object]]:
+    return list(registry.table().api)
 
 
 def preset_keys() -> Iterable[str]:
-    return [str(preset.get("key")) for preset in load_presets() if preset.get("key")]
+    return list(registry.table().by_key)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+
+class RiskAccumulator:
+    """Tail risk of cumulative yield, fed one replication at a time.
+
+    Only the cumulative yield of each replication and a count of replications
+    with a long enough run of low seasons are kept, never the season yields.
+    ``value_at_risk`` is the cumulative yield that the worst ``1 - level`` share
+    of replications fall to or below, and ``conditional_value_at_risk`` is the
+    mean cumulative yield of that tail (both in yield units, lower is worse).
+    """
+
+    __slots__ = ("level", "consecutive", "low_threshold", "totals", "streak_hits")
+
+    def __init__(
+        self, *, level: float, consecutive_low_seasons: int, low_threshold: float
+    ) -> None:
+        if not 0.0 < level < 1.0:
+            raise ValueError("risk level must be between 0 and 1")
+        if consecutive_low_seasons < 1:
+            raise ValueError("consecutive_low_seasons must be at least 1")
+        self.level = level
+        self.consecutive = consecutive_low_seasons
+        self.low_threshold = low_threshold
+        self.totals: list[float] = []
+        self.streak_hits = 0
+
+    def add_replication(self, yields: Iterable[float]) -> None:
+        total = 0.0
+        streak = longest = 0
+        threshold = self.low_threshold
+        for value in yields:
+            total += value
+            if value <= threshold:
+                streak += 1
+                if streak > longest:
+                    longest = streak
+            else:
+                streak = 0
+        self.totals.append(total)
+        if longest >= self.consecutive:
+            self.streak_hits += 1
+
+    def result(self) -> dict[str, object] | None:
+        count = len(self.totals)
+        if not count:
+            return None
+        tail_size = max(1, math.ceil((1.0 - self.level) * count - 1e-9))
+        tail = sorted(self.totals)[:tail_size]
+        return {
+            "level": self.level,
+            "cumulative_yield_mean": _round(sum(self.totals) / count),
+            "value_at_risk": _round(tail[-1]),
+            "conditional_value_at_risk": _round(sum(tail) / len(tail)),
+            "consecutive_low_seasons": self.consecutive,
+            "consecutive_low_probability": round(self.streak_hits / count, 4),
+        }
+
+
+def _round(value: float) -> float:
+    return round(value + 1e-12, 2)
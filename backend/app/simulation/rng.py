@@ -0,0 +1,138 @@
+"""Random number generators shared by both engines.
+
+Generators are small state objects with ``random()`` for one draw and
+``fill(n)`` for ``n`` draws in one call (the loop runs on local variables, which
+is several times cheaper than ``n`` method calls). ``LegacyLcg31`` and
+``LegacyLcg32`` reproduce the generators ``engine.py`` and ``arena_engine.py``
+have always used, so seeded outputs do not change. ``Pcg32`` is a modern
+alternative whose independent streams are derived cheaply from a key such as
+``(seed, scenario, replication)``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Literal, Protocol
+
+RngKind = Literal["legacy", "pcg32"]
+
+_MASK32 = 0xFFFFFFFF
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class Rng(Protocol):
+    def random(self) -> float: ...
+
+    def fill(self, n: int) -> list[float]: ...
+
+
+def fnv1a_32(text: str) -> int:
+    """32-bit FNV-1a over code points; never returns 0."""
+    value = 2166136261
+    for char in text:
+        value ^= ord(char)
+        value = (value * 16777619) & _MASK32
+    return value or 0xA5A5A5A5
+
+
+class LegacyLcg31:
+    """31-bit glibc-style LCG of ``engine.py``, seeded with an integer.
+
+    Draws are ``state / (2**31 - 1)`` and so lie in ``(0, 1]``.
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int) -> None:
+        self.state = seed & 0x7FFFFFFF
+
+    def random(self) -> float:
+        self.state = (self.state * 1103515245 + 12345) & 0x7FFFFFFF
+        return self.state / 0x7FFFFFFF
+
+    def fill(self, n: int) -> list[float]:
+        state = self.state
+        out = [0.0] * n
+        for i in range(n):
+            state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+            out[i] = state / 0x7FFFFFFF
+        self.state = state
+        return out
+
+
+class LegacyLcg32:
+    """32-bit Numerical Recipes LCG of ``arena_engine.py``, seeded with a string."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed: str) -> None:
+        self.state = fnv1a_32(seed)
+
+    def random(self) -> float:
+        self.state = (1664525 * self.state + 1013904223) & _MASK32
+        return self.state / 2**32
+
+    def fill(self, n: int) -> list[float]:
+        state = self.state
+        out = [0.0] * n
+        for i in range(n):
+            state = (1664525 * state + 1013904223) & _MASK32
+            out[i] = state / 4294967296
+        self.state = state
+        return out
+
+
+_PCG_MULTIPLIER = 6364136223846793005
+
+
+class Pcg32:
+    """PCG32 (XSH RR) with 64-bit state and a selectable stream."""
+
+    __slots__ = ("state", "increment")
+
+    def __init__(self, seed: int, stream: int = 0) -> None:
+        self.increment = ((stream << 1) | 1) & _MASK64
+        self.state = 0
+        self._next()
+        self.state = (self.state + seed) & _MASK64
+        self._next()
+
+    @classmethod
+    def from_key(cls, *parts: object) -> Pcg32:
+        """Generator for the stream named by ``parts``, e.g. ``(seed, scenario, 3)``."""
+        digest = hashlib.blake2b(
+            "|".join(str(part) for part in parts).encode("utf-8"), digest_size=16
+        ).digest()
+        return cls(int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little"))
+
+    def _next(self) -> int:
+        old = self.state
+        self.state = (old * _PCG_MULTIPLIER + self.increment) & _MASK64
+        shifted = (((old >> 18) ^ old) >> 27) & _MASK32
+        rotation = old >> 59
+        return ((shifted >> rotation) | (shifted << (-rotation & 31))) & _MASK32
+
+    def random(self) -> float:
+        return self._next() / 2**32
+
+    def fill(self, n: int) -> list[float]:
+        state = self.state
+        increment = self.increment
+        out = [0.0] * n
+        for i in range(n):
+            old = state
+            state = (old * _PCG_MULTIPLIER + increment) & _MASK64
+            shifted = (((old >> 18) ^ old) >> 27) & _MASK32
+            rotation = old >> 59
+            out[i] = (
+                ((shifted >> rotation) | (shifted << (-rotation & 31))) & _MASK32
+            ) / 4294967296
+        self.state = state
+        return out
+
+
+def keyed_rng(kind: RngKind, seed: str, *parts: str) -> Rng:
+    """Arena-engine generator for the stream ``seed|part|...``."""
+    if kind == "pcg32":
+        return Pcg32.from_key(seed, *parts)
+    return LegacyLcg32("|".join([seed, *parts]) if parts else seed)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class RunningStats:
+    """Count, sum, sum of squared deviations and range of a set of values.
+
+    Two summaries merge into the summary of the combined values (Chan et al.),
+    so results computed in pieces can be combined without the raw values.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    @classmethod
+    def from_values(cls, values: Iterable[float]) -> RunningStats:
+        data = [float(value) for value in values]
+        if not data:
+            return cls()
+        total = sum(data)
+        mean = total / len(data)
+        return cls(
+            count=len(data),
+            total=total,
+            m2=sum((value - mean) ** 2 for value in data),
+            minimum=min(data),
+            maximum=max(data),
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def merge(self, other: RunningStats) -> RunningStats:
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return RunningStats(
+            count=count,
+            total=self.total + other.total,
+            m2=self.m2 + other.m2 + delta * delta * self.count * other.count / count,
+            minimum=min(self.minimum, other.minimum),
+            maximum=max(self.maximum, other.maximum),
+        )
+
+
+# Two-sided 95% Student t quantiles by degrees of freedom; the normal quantile
+# is close enough beyond the table.
+_T_975 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+_Z_975 = 1.959963984540054
+
+
+def _t_975(df: int) -> float:
+    """97.5% quantile of Student's t with ``df`` degrees of freedom.
+
+    Tabulated up to 30; beyond that the Cornish-Fisher expansion around the
+    normal quantile is accurate to better than 1e-4.
+    """
+    if df <= len(_T_975):
+        return _T_975[df - 1]
+    z = _Z_975
+    return (
+        z
+        + (z**3 + z) / (4 * df)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3)
+    )
+
+
+def mean_confidence_interval(values: Iterable[float]) -> tuple[float, float] | None:
+    """95% t interval for the mean of independent ``values``; None below two values."""
+    stats = RunningStats.from_values(values)
+    if stats.count < 2:
+        return None
+    df = stats.count - 1
+    quantile = _t_975(df)
+    half_width = quantile * math.sqrt(stats.m2 / df / stats.count)
+    return stats.mean - half_width, stats.mean + half_width
@@ -0,0 +1,263 @@
+"""Offline studies: many stored-simulation runs without the web stack.
+
+A ``StudySpec`` expands into jobs, one per combination of scenario,
+probabilities, season count and seed, numbered in a fixed order. Each job is a
+``build_simulation_payload`` call whose ``SimulationCreate`` is written as one
+NDJSON line, the format ``crud.import_simulations`` (and ``cli import``)
+loads. Job ids are derived from the spec and the job number, so shards can be
+run on separate machines, re-run after a crash, and merged or imported in any
+order without duplicates.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import uuid
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from .. import schemas
+from .engine import aggregate_stats, build_runs, combine_run_checksums, run_checksum
+from .presets import get_preset_by_id, probabilities_to_percent
+from .stats import RunningStats
+
+# Runs simulated and serialised at a time; only their JSON is kept.
+RUN_CHUNK = 1000
+
+
+@dataclass(frozen=True)
+class StudyJob:
+    index: int
+    id: str
+    request: schemas.SimulationExecuteRequest
+
+
+def load_spec(path: str | Path) -> schemas.StudySpec:
+    return schemas.StudySpec.model_validate_json(Path(path).read_bytes())
+
+
+def _spec_digest(spec: schemas.StudySpec) -> str:
+    canonical = json.dumps(spec.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _probability_points(
+    spec: schemas.StudySpec, scenario_id: int
+) -> list[schemas.RainfallProbabilities]:
+    points = list(spec.probabilities or [])
+    if spec.probability_grid is not None:
+        for low, high in itertools.product(
+            spec.probability_grid.low, spec.probability_grid.high
+        ):
+            if 0 <= low and 0 <= high and low + high <= 100:
+                points.append(
+                    schemas.RainfallProbabilities(
+                        low=low, normal=100 - low - high, high=high
+                    )
+                )
+    if points:
+        return points
+    preset = get_preset_by_id(scenario_id)
+    return [
+        schemas.RainfallProbabilities.model_validate(
+            probabilities_to_percent(preset["probabilities"])
+        )
+    ]
+
+
+def iter_jobs(spec: schemas.StudySpec) -> Iterator[StudyJob]:
+    digest = _spec_digest(spec)
+    index = 0
+    for scenario_id in spec.scenario_ids:
+        for probabilities in _probability_points(spec, scenario_id):
+            for num_seasons in spec.num_seasons:
+                for seed in spec.seeds:
+                    mix = "/".join(
+                        str(value)
+                        for value in (
+                            probabilities.low,
+                            probabilities.normal,
+                            probabilities.high,
+                        )
+                    )
+                    yield StudyJob(
+                        index=index,
+                        id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"study:{digest}:{index}")),
+                        request=schemas.SimulationExecuteRequest(
+                            name=(
+                                f"{spec.name} #{index}: scenario {scenario_id}, "
+                                f"{mix}, {num_seasons} seasons, seed {seed}"
+                            ),
+                            scenario_id=scenario_id,
+                            num_seasons=num_seasons,
+                            num_replications=spec.num_replications,
+                            probabilities=probabilities,
+                            seed=seed,
+                            storage_mode=spec.storage_mode,
+                        ),
+                    )
+                    index += 1
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``"K/N"`` (shard ``K`` of ``N``, counting from 0)."""
+    try:
+        shard, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like K/N, got {value!r}") from None
+    if count < 1 or not 0 <= shard < count:
+        raise ValueError(f"shard {value!r} is out of range")
+    return shard, count
+
+
+def run_job(job: StudyJob, compact: bool = False) -> bytes:
+    """One NDJSON line for ``job``, the ``build_simulation_payload`` result.
+
+    Runs are simulated ``RUN_CHUNK`` at a time and kept only as JSON (plus the
+    season yields for the aggregates), so memory follows the size of the line
+    rather than of a model per season. ``compact`` stores the simulation as
+    ``recompute``: each run's seasons are dropped as soon as its checksum is
+    taken, and the import verifies them by regenerating them from the seed.
+    """
+    request = job.request
+    yields = array("d")
+    low_seasons = 0
+    checksums: list[int] = []
+    runs: list[bytes] = []
+    for start in range(0, request.num_replications, RUN_CHUNK):
+        for run in build_runs(
+            seed=request.seed,
+            start_index=start,
+            count=min(RUN_CHUNK, request.num_replications - start),
+            scenario_id=request.scenario_id,
+            num_seasons=request.num_seasons,
+            probabilities=request.probabilities,
+        ):
+            seasons = run["seasons"]
+            yields.extend(season["yield_amount"] for season in seasons)
+            low_seasons += sum(1 for season in seasons if season["rainfall"] == "low")
+            checksums.append(
+                run_checksum(
+                    run["run_index"],
+                    (
+                        (season["season_index"], season["rainfall"], season["yield_amount"])
+                        for season in seasons
+                    ),
+                )
+            )
+            if compact:
+                run["seasons"] = []
+            runs.append(
+                schemas.SimulationRunCreate.model_validate(run).model_dump_json(by_alias=True)
+            )
+
+    aggregated = aggregate_stats(RunningStats.from_values(yields), low_seasons)
+    header = schemas.SimulationCreate(
+        id=job.id,
+        name=request.name,
+        run_mode="single",
+        storage_mode="recompute" if compact else request.storage_mode,
+        checksum=combine_run_checksums(checksums),
+        num_seasons=request.num_seasons,
+        num_replications=request.num_replications,
+        seed=request.seed,
+        average_yield=float(aggregated["average_yield"]),
+        min_yield=float(aggregated["min_yield"]),
+        max_yield=float(aggregated["max_yield"]),
+        yield_variability=aggregated["yield_variability"],
+        low_yield_percent=float(aggregated["low_yield_percent"]),
+        runs=[],
+    ).model_dump_json(by_alias=True)
+    # ``runs`` is the model's last field, so the runs are spliced in as JSON.
+    prefix = header.removesuffix('"runs":[]}')
+    return f'{prefix}"runs":[{",".join(runs)}]}}\n'.encode("utf-8")
+
+
+def _run_job(args: tuple[StudyJob, bool]) -> bytes:
+    return run_job(*args)
+
+
+def open_output(path: str | Path) -> IO[bytes]:
+    """Binary writer; ``.gz`` paths are gzip-compressed."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "wb")
+    return open(path, "wb")
+
+
+def open_input(path: str | Path) -> IO[bytes]:
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def run_study(
+    spec: schemas.StudySpec,
+    output: IO[bytes],
+    *,
+    shard: tuple[int, int] = (0, 1),
+    workers: int = 1,
+    compact: bool = False,
+) -> int:
+    """Write the shard's jobs to ``output`` in job order; returns the job count."""
+    index, count = shard
+    jobs = [(job, compact) for job in iter_jobs(spec) if job.index % count == index]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lines: Iterable[bytes] = pool.map(_run_job, jobs, chunksize=4)
+            for line in lines:
+                output.write(line)
+    else:
+        for job in jobs:
+            output.write(_run_job(job))
+    return len(jobs)
+
+
+def _indexed_lines(
+    path: str | Path, expected: dict[str, int], report: dict[str, object]
+) -> Iterator[tuple[int, bytes]]:
+    previous = -1
+    with open_input(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            index = expected.get(json.loads(line).get("id"))
+            if index is None:
+                report["unknown"] += 1
+                continue
+            if index < previous:
+                raise ValueError(f"{path} is not in job order")
+            previous = index
+            yield index, line if line.endswith(b"\n") else line + b"\n"
+
+
+def merge_outputs(
+    spec: schemas.StudySpec, inputs: Iterable[str | Path], output: IO[bytes]
+) -> dict[str, object]:
+    """Merge shard files (each in job order, as ``run_study`` writes them).
+
+    The files are streamed through a heap merge, so memory does not grow with
+    the study; a job present in several files is written once. Reports the job
+    count written and the job indexes no input produced.
+    """
+    expected = {job.id: job.index for job in iter_jobs(spec)}
+    report: dict[str, object] = {"written": 0, "missing": [], "unknown": 0}
+    streams = [_indexed_lines(path, expected, report) for path in inputs]
+    seen: set[int] = set()
+    last = -1
+    for index, line in heapq.merge(*streams, key=itemgetter(0)):
+        if index == last:
+            continue
+        last = index
+        seen.add(index)
+        output.write(line)
+    report["written"] = len(seen)
+    report["missing"] = sorted(set(expected.values()) - seen)
+    return report
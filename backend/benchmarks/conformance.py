@@ -0,0 +1,62 @@
+"""Check every registered backend against the reference engine and time them.
+
+Compares the reference engine with the golden digests in
+``backend/app/simulation/conformance.json``, then runs each registered backend
+on the same cases. Exits non-zero on any mismatch.
+
+Run from the repository root::
+
+    python -m backend.benchmarks.conformance
+    python -m backend.benchmarks.conformance --update   # after an intended change
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from backend.app.simulation import conformance
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--update", action="store_true", help="rewrite the golden digests"
+    )
+    parser.add_argument(
+        "--backend", action="append", help="backend to check (default: all)"
+    )
+    args = parser.parse_args()
+
+    if args.update:
+        digests = conformance.write_golden()
+        print(f"wrote {len(digests)} digests to {conformance.GOLDEN_PATH}")
+        return 0
+
+    failures = 0
+    golden = conformance.load_golden()
+    current = conformance.golden_digests()
+    drifted = sorted(
+        case for case in golden.keys() | current.keys()
+        if golden.get(case) != current.get(case)
+    )
+    print(f"golden: {len(golden) - len(drifted)}/{len(golden)} digests match")
+    for case in drifted:
+        print(f"  drifted: {case}")
+    failures += len(drifted)
+
+    print(f"{'backend':<12} {'case':<34} {'match':<5} {'reference':>10} {'backend':>10}")
+    for name in args.backend or sorted(conformance.BACKENDS):
+        if name == conformance.REFERENCE:
+            continue
+        for entry in conformance.differential(name):
+            failures += not entry["match"]
+            print(
+                f"{name:<12} {entry['case']:<34} {'ok' if entry['match'] else 'FAIL':<5} "
+                f"{entry['reference_seconds'] * 1000:>8.1f}ms "
+                f"{entry['backend_seconds'] * 1000:>8.1f}ms"
+            )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Spread of the low-yield rate estimate with iid and stratified sampling.
+
+Runs the same simulation under many seeds and reports the standard deviation
+of ``overall.low_yield_rate`` around the preset's true low probability. A
+smaller spread means fewer replications for the same precision.
+
+Run from the repository root::
+
+    python -m backend.benchmarks.sampling
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+
+from backend.app.simulation import arena_engine
+
+
+def _rmse(
+    sampling: str,
+    probabilities: dict[str, float],
+    seasons: int,
+    replications: int,
+    seeds: int,
+) -> float:
+    errors = []
+    for index in range(seeds):
+        result = arena_engine.simulate(
+            scenario="drought",
+            seasons=seasons,
+            replications=replications,
+            probabilities=probabilities,
+            seed=f"benchmark-{index}",
+            sampling=sampling,
+        )
+        errors.append(result["overall"]["low_yield_rate"] - probabilities["low"])
+    return math.sqrt(sum(error * error for error in errors) / len(errors))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--replications", type=int, nargs="+", default=[10, 25, 50, 100])
+    parser.add_argument("--seeds", type=int, default=200)
+    parser.add_argument("--low", type=float, default=0.13)
+    args = parser.parse_args()
+
+    rest = (1 - args.low) / 2
+    probabilities = {"low": args.low, "normal": rest, "high": rest}
+    print(f"{'replications':>12}  {'iid rmse':>9}  {'stratified rmse':>15}  {'ratio':>6}")
+    for replications in args.replications:
+        iid = _rmse("iid", probabilities, args.seasons, replications, args.seeds)
+        stratified = _rmse(
+            "stratified", probabilities, args.seasons, replications, args.seeds
+        )
+        ratio = f"{iid / stratified:>5.1f}x" if stratified else "exact"
+        print(f"{replications:>12}  {iid:>9.5f}  {stratified:>15.5f}  {ratio:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Serialization cost of ``/api/simulate`` responses with large row payloads.
+
+Compares the previous path (``model_validate`` in the endpoint followed by
+FastAPI's ``response_model`` validation and serialization) with the trusted
+path used by ``TrustedJSONResponse``.
+
+Run from the repository root::
+
+    python -m backend.benchmarks.serialization
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from backend.app import schemas
+from backend.app.serialization import TrustedJSONResponse
+from backend.app.simulation import arena_engine
+
+
+def _validated_bytes(result: dict[str, object]) -> bytes:
+    model = schemas.SimulateResponse.model_validate(result)
+    # FastAPI dumps the returned model, validates it against response_model
+    # and serializes the validated copy.
+    revalidated = schemas.SimulateResponse.model_validate(
+        model.model_dump(by_alias=True)
+    )
+    content = revalidated.model_dump(mode="json", by_alias=True)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _trusted_bytes(result: dict[str, object]) -> bytes:
+    return TrustedJSONResponse(result).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=50)
+    parser.add_argument("--replications", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'validated ms':>13}  {'trusted ms':>11}  {'speed-up':>8}")
+    for replications in args.replications:
+        result = arena_engine.simulate(
+            scenario="custom",
+            seasons=args.seasons,
+            replications=replications,
+            probabilities={"low": 0.2, "normal": 0.5, "high": 0.3},
+            seed="benchmark",
+            include_rows=True,
+        )
+        assert json.loads(_validated_bytes(result)) == json.loads(_trusted_bytes(result))
+
+        validated = min(
+            timeit.repeat(lambda: _validated_bytes(result), number=1, repeat=args.repeat)
+        )
+        trusted = min(
+            timeit.repeat(lambda: _trusted_bytes(result), number=1, repeat=args.repeat)
+        )
+        rows = args.seasons * replications
+        print(
+            f"{rows:>8}  {validated * 1000:>13.2f}  {trusted * 1000:>11.2f}"
+            f"  {validated / trusted:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ CREATE TABLE IF NOT EXISTS simulations (
   name TEXT NOT NULL,
   created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
   run_mode TEXT NOT NULL DEFAULT 'single' CHECK (run_mode IN ('single','all_scenarios')),
+  storage_mode TEXT NOT NULL DEFAULT 'full' CHECK (storage_mode IN ('full','recompute')),
+  checksum TEXT,
+  version INTEGER NOT NULL DEFAULT 1,
   num_seasons INTEGER NOT NULL CHECK (num_seasons > 0),
   num_replications INTEGER NOT NULL CHECK (num_replications > 0),
   seed INTEGER,
@@ -12,7 +15,10 @@ CREATE TABLE IF NOT EXISTS simulations (
   min_yield REAL NOT NULL CHECK (min_yield >= 0),
   max_yield REAL NOT NULL CHECK (max_yield >= 0),
   yield_variability TEXT NOT NULL CHECK (yield_variability IN ('low','medium','high')),
-  low_yield_percent REAL NOT NULL CHECK (low_yield_percent >= 0 AND low_yield_percent <= 100)
+  low_yield_percent REAL NOT NULL CHECK (low_yield_percent >= 0 AND low_yield_percent <= 100),
+  yield_sum REAL,
+  yield_m2 REAL,
+  low_season_count INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS simulation_runs (
@@ -1,7 +1,14 @@
+import asyncio
+import json
 import os
+import sqlite3
+import time
 from pathlib import Path
 
+import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
 
 DB_PATH = Path(__file__).resolve().parents[1] / "data" / "test_rice_yield_test.db"
 
@@ -13,6 +20,13 @@ os.environ.setdefault("CORS_ORIGINS", "http://localhost")
 
 from backend.app import main as app_main  # noqa: E402
 from backend.app import db as app_db  # noqa: E402
+from backend.app import crud, http_cache, models, query_log, schemas  # noqa: E402
+from backend.app.simulation import arena_engine  # noqa: E402
+from backend.app.simulation.engine import build_runs  # noqa: E402
+from backend.app.simulation.cancellation import (  # noqa: E402
+    CancellationToken,
+    Cancelled,
+)
 
 client = TestClient(app_main.app)
 
@@ -75,7 +89,7 @@ def setup_function() -> None:
 
 
 def teardown_module() -> None:
-    app_db.engine.dispose()
+    app_db.get_engine().dispose()
     if DB_PATH.exists():
         DB_PATH.unlink()
 
@@ -123,6 +137,290 @@ def test_clear_all_simulations() -> None:
     assert list_resp.json()["total"] == 0
 
 
+def test_recompute_storage_regenerates_seasons() -> None:
+    full_resp = client.post("/api/simulations/run", json=_run_payload())
+    recompute_resp = client.post(
+        "/api/simulations/run",
+        json={**_run_payload(), "storageMode": "recompute"},
+    )
+    assert recompute_resp.status_code == 201
+    recompute_id = recompute_resp.json()["id"]
+    assert recompute_resp.json()["storageMode"] == "recompute"
+
+    with app_db.SessionLocal() as db:
+        stored_seasons = db.scalar(
+            select(func.count())
+            .select_from(models.SeasonResult)
+            .join(models.SimulationRun)
+            .where(models.SimulationRun.simulation_id == recompute_id)
+        )
+    assert stored_seasons == 0
+
+    full = client.get(f"/api/simulations/{full_resp.json()['id']}").json()
+    recompute = client.get(f"/api/simulations/{recompute_id}").json()
+    assert recompute["checksum"] == full["checksum"]
+    full_seasons = [
+        (season["seasonIndex"], season["rainfall"], season["yield"])
+        for season in full["runs"][0]["seasons"]
+    ]
+    recompute_seasons = [
+        (season["seasonIndex"], season["rainfall"], season["yield"])
+        for season in recompute["runs"][0]["seasons"]
+    ]
+    assert recompute_seasons == full_seasons
+
+    with app_db.SessionLocal() as db:
+        db.get(models.Simulation, recompute_id).checksum = "tampered"
+        db.commit()
+    assert client.get(f"/api/simulations/{recompute_id}").status_code == 500
+
+
+def test_extending_replications_matches_a_full_run(monkeypatch) -> None:
+    summary_fields = (
+        "numReplications",
+        "averageYield",
+        "minYield",
+        "maxYield",
+        "yieldVariability",
+        "lowYieldPercent",
+        "checksum",
+    )
+    base = {**_run_payload(), "numSeasons": 6, "numReplications": 2}
+    expected = client.post(
+        "/api/simulations/run", json={**base, "numReplications": 5}
+    ).json()
+
+    for storage_mode in ("full", "recompute"):
+        created = client.post(
+            "/api/simulations/run", json={**base, "storageMode": storage_mode}
+        ).json()
+        extended = client.post(
+            f"/api/simulations/{created['id']}/replications",
+            json={"additionalReplications": 3},
+        )
+        assert extended.status_code == 200
+        assert extended.json()["version"] == 2
+        for field in summary_fields:
+            assert extended.json()[field] == expected[field], field
+
+        stored = client.get(f"/api/simulations/{created['id']}").json()
+        assert [run["runIndex"] for run in stored["runs"]] == [0, 1, 2, 3, 4]
+        assert [
+            [(season["rainfall"], season["yield"]) for season in run["seasons"]]
+            for run in stored["runs"]
+        ] == [
+            [(season["rainfall"], season["yield"]) for season in run["seasons"]]
+            for run in expected["runs"]
+        ]
+
+    # Rows stored before the running statistics existed are rebuilt once.
+    legacy = client.post("/api/simulations/run", json=base).json()
+    with app_db.SessionLocal() as db:
+        db.get(models.Simulation, legacy["id"]).yield_sum = None
+        db.commit()
+    extended = client.post(
+        f"/api/simulations/{legacy['id']}/replications",
+        json={"additionalReplications": 3},
+    ).json()
+    for field in summary_fields:
+        assert extended[field] == expected[field], field
+
+    all_scenarios = client.post(
+        "/api/simulations/run", json={**base, "runMode": "all_scenarios"}
+    ).json()
+    conflict = client.post(
+        f"/api/simulations/{all_scenarios['id']}/replications",
+        json={"additionalReplications": 1},
+    )
+    assert conflict.status_code == 409
+    missing = client.post(
+        "/api/simulations/missing/replications", json={"additionalReplications": 1}
+    )
+    assert missing.status_code == 404
+    too_many = client.post(
+        f"/api/simulations/{created['id']}/replications",
+        json={"additionalReplications": 10_001},
+    )
+    assert too_many.status_code == 422
+
+    # Another extension inserts the next run while this one is simulating.
+    raced = client.post("/api/simulations/run", json=base).json()
+
+    def build_runs_racing(**kwargs):
+        runs = build_runs(**kwargs)
+        with app_db.SessionLocal() as db:
+            run = db.scalars(
+                select(models.SimulationRun).where(
+                    models.SimulationRun.simulation_id == raced["id"]
+                )
+            ).first()
+            db.add(
+                models.SimulationRun(
+                    simulation_id=raced["id"],
+                    run_index=kwargs["start_index"],
+                    scenario_id=run.scenario_id,
+                    prob_low=run.prob_low,
+                    prob_normal=run.prob_normal,
+                    prob_high=run.prob_high,
+                    average_yield=run.average_yield,
+                    min_yield=run.min_yield,
+                    max_yield=run.max_yield,
+                    yield_variability=run.yield_variability,
+                    low_yield_percent=run.low_yield_percent,
+                )
+            )
+            db.commit()
+        return runs
+
+    monkeypatch.setattr(crud, "build_runs", build_runs_racing)
+    raced_extend = client.post(
+        f"/api/simulations/{raced['id']}/replications",
+        json={"additionalReplications": 1},
+    )
+    assert raced_extend.status_code == 409
+    assert "concurrently" in raced_extend.json()["detail"]
+    stored = client.get(f"/api/simulations/{raced['id']}").json()
+    assert stored["version"] == raced["version"]
+
+
+def test_filtered_delete_only_removes_matching_simulations() -> None:
+    client.post("/api/simulations", json=_create_payload("keep", "Keep", 1, 2.0))
+    client.post("/api/simulations", json=_create_payload("drop", "Drop", 2, 4.0))
+
+    resp = client.delete("/api/simulations?scenario_id=2&chunk_size=1")
+    assert resp.status_code == 204
+
+    remaining = client.get("/api/simulations?limit=10&offset=0").json()
+    assert [item["id"] for item in remaining["items"]] == ["keep"]
+
+
+def test_background_deletion_job_reports_progress() -> None:
+    for index in range(3):
+        client.post(
+            "/api/simulations",
+            json=_create_payload(f"job-{index}", "Job", 1, 3.0),
+        )
+
+    start_resp = client.post("/api/simulations/delete-jobs?chunk_size=1")
+    assert start_resp.status_code == 202
+    job = start_resp.json()
+    assert job["total"] == 3
+
+    job_resp = client.get(f"/api/simulations/delete-jobs/{job['id']}")
+    assert job_resp.status_code == 200
+    assert job_resp.json()["status"] == "completed"
+    assert job_resp.json()["deleted"] == 3
+    assert client.get("/api/simulations").json()["total"] == 0
+    # Job state is stored in the database, where every worker process sees it.
+    with app_db.SessionLocal() as db:
+        stored = db.get(models.DeletionJob, job["id"])
+        assert (stored.status, stored.deleted) == ("completed", 3)
+
+
+def test_existing_database_can_be_converted_to_incremental_vacuum(
+    tmp_path: Path, caplog
+) -> None:
+    path = tmp_path / "old.db"
+    sqlite3.connect(path).executescript(
+        "CREATE TABLE t (x BLOB); INSERT INTO t VALUES (zeroblob(100000)); DELETE FROM t;"
+    )
+    engine = create_engine(f"sqlite+pysqlite:///{path.as_posix()}")
+    try:
+        assert app_db.auto_vacuum_mode(engine) == 0
+        with caplog.at_level("WARNING", logger="backend.app.db"):
+            assert app_db.incremental_vacuum(engine) == 0
+        assert "enable-incremental-vacuum" in caplog.text
+
+        assert app_db.enable_incremental_vacuum(engine)
+        assert app_db.auto_vacuum_mode(engine) == app_db.AUTO_VACUUM_INCREMENTAL
+        assert not app_db.enable_incremental_vacuum(engine)
+    finally:
+        engine.dispose()
+
+
+def test_export_streams_ndjson_and_csv() -> None:
+    client.post("/api/simulations", json=_create_payload("export-a", "A", 1, 2.0))
+    client.post("/api/simulations", json=_create_payload("export-b", "B", 2, 4.0))
+    client.post(
+        "/api/simulations/run",
+        json={**_run_payload(), "storageMode": "recompute"},
+    )
+
+    ndjson_resp = client.get("/api/simulations/export?format=ndjson")
+    assert ndjson_resp.status_code == 200
+    assert ndjson_resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in ndjson_resp.text.splitlines()]
+    assert len(records) == 3
+    recompute = next(item for item in records if item["storageMode"] == "recompute")
+    assert len(recompute["runs"][0]["seasons"]) == 3
+    exported = next(item for item in records if item["id"] == "export-b")
+    assert exported["createdAt"]
+    assert exported["runs"][0]["seasons"] == [
+        {"seasonIndex": 0, "rainfall": "normal", "yield": 4.0}
+    ]
+
+    csv_resp = client.get("/api/simulations/export?format=csv&scenario_id=2")
+    assert csv_resp.status_code == 200
+    lines = csv_resp.text.splitlines()
+    assert lines[0].startswith("simulation_id,")
+    assert len(lines) == 2
+    assert lines[1].startswith("export-b,")
+
+
+def test_import_ndjson_reports_per_record_errors() -> None:
+    client.post("/api/simulations", json=_create_payload("existing", "Old", 1, 2.0))
+    lines = [
+        json.dumps(_create_payload("import-a", "A", 1, 3.0)),
+        json.dumps(_create_payload("existing", "Duplicate", 1, 2.0)),
+        "{not json",
+        json.dumps(_create_payload("import-b", "B", 2, 4.0)),
+    ]
+    resp = client.post(
+        "/api/simulations/import?batch_size=2",
+        content="\n".join(lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["imported"] == 2
+    assert report["skipped"] == 1
+    assert report["failed"] == 1
+    assert [(error["line"], error["id"]) for error in report["errors"]] == [
+        (2, "existing"),
+        (3, None),
+    ]
+    assert client.get("/api/simulations").json()["total"] == 3
+
+
+def test_export_then_import_round_trip() -> None:
+    client.post("/api/simulations/run", json=_run_payload())
+    client.post(
+        "/api/simulations/run",
+        json={**_run_payload(), "storageMode": "recompute"},
+    )
+    exported = client.get("/api/simulations/export").text
+    originals = {
+        item["id"]: client.get(f"/api/simulations/{item['id']}").json()
+        for item in client.get("/api/simulations").json()["items"]
+    }
+
+    client.delete("/api/simulations")
+    report = client.post("/api/simulations/import", content=exported).json()
+    assert report["imported"] == 2
+
+    for simulation_id, original in originals.items():
+        restored = client.get(f"/api/simulations/{simulation_id}").json()
+        assert restored["createdAt"] == original["createdAt"]
+        assert restored["storageMode"] == original["storageMode"]
+        assert [
+            [(s["seasonIndex"], s["rainfall"], s["yield"]) for s in run["seasons"]]
+            for run in restored["runs"]
+        ] == [
+            [(s["seasonIndex"], s["rainfall"], s["yield"]) for s in run["seasons"]]
+            for run in original["runs"]
+        ]
+
+
 def test_filters_and_sorting_for_simulations() -> None:
     create_a = client.post(
         "/api/simulations",
@@ -181,6 +479,85 @@ def test_list_scenarios_and_yield_mapping() -> None:
     assert {"low", "normal", "high"} <= set(mapping.keys())
 
 
+def test_scenarios_support_conditional_get() -> None:
+    first = client.get("/api/scenarios")
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    cached = client.get("/api/scenarios", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    mapping = client.get("/api/yield-by-rainfall")
+    cached_mapping = client.get(
+        "/api/yield-by-rainfall",
+        headers={"If-None-Match": f"W/{mapping.headers['etag']}"},
+    )
+    assert cached_mapping.status_code == 304
+
+
+def test_etag_matches_either_content_coding() -> None:
+    etag = http_cache.make_etag("scenarios", "digest")
+    gzipped = http_cache.coded_etag(etag, "gzip")
+    assert gzipped != etag and gzipped.endswith('-gzip"')
+
+    def request(if_none_match: str) -> Request:
+        return Request(
+            {"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]}
+        )
+
+    assert http_cache.etag_matches(request(etag), etag)
+    assert http_cache.etag_matches(request(gzipped), etag)
+    assert http_cache.etag_matches(request(f'"other", W/{gzipped}'), etag)
+    assert http_cache.etag_matches(request("*"), etag)
+    assert not http_cache.etag_matches(request('"other"'), etag)
+    assert not http_cache.etag_matches(request(""), etag)
+
+
+def test_simulation_etag_changes_after_rename() -> None:
+    simulation_id = client.post("/api/simulations/run", json=_run_payload()).json()["id"]
+
+    first = client.get(f"/api/simulations/{simulation_id}")
+    etag = first.headers["etag"]
+    cached = client.get(
+        f"/api/simulations/{simulation_id}", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+    client.patch(f"/api/simulations/{simulation_id}", json={"name": "Renamed"})
+    refreshed = client.get(
+        f"/api/simulations/{simulation_id}", headers={"If-None-Match": etag}
+    )
+    assert refreshed.status_code == 200
+    assert refreshed.json()["name"] == "Renamed"
+    assert refreshed.headers["etag"] != etag
+
+    missing = client.get("/api/simulations/missing", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+
+def test_simulation_etag_changes_when_recreated_under_the_same_id() -> None:
+    created = client.post(
+        "/api/simulations", json=_create_payload("etag-reused", "Original", 1, 4.0)
+    )
+    assert created.status_code == 201
+    etag = client.get("/api/simulations/etag-reused").headers["etag"]
+
+    client.delete("/api/simulations/etag-reused")
+    recreated = client.post(
+        "/api/simulations", json=_create_payload("etag-reused", "Replaced", 1, 2.0)
+    )
+    assert recreated.json()["version"] == created.json()["version"]
+
+    refreshed = client.get(
+        "/api/simulations/etag-reused", headers={"If-None-Match": etag}
+    )
+    assert refreshed.status_code == 200
+    assert refreshed.json()["name"] == "Replaced"
+    assert refreshed.headers["etag"] != etag
+
+
 def test_simulate_endpoint() -> None:
     payload = {
         "scenario": "custom",
@@ -200,6 +577,136 @@ def test_simulate_endpoint() -> None:
     assert len(data.get("rows", [])) == 8
 
 
+def test_simulate_response_matches_validated_schema() -> None:
+    probabilities = {"low": 0.2, "normal": 0.5, "high": 0.3}
+    resp = client.post(
+        "/api/simulate",
+        json={
+            "scenario": "custom",
+            "seasons": 6,
+            "replications": 3,
+            "probabilities": probabilities,
+            "seed": "trusted-seed",
+            "includeRows": True,
+        },
+    )
+    assert resp.status_code == 200
+
+    result = arena_engine.simulate(
+        scenario="custom",
+        seasons=6,
+        replications=3,
+        probabilities=probabilities,
+        seed="trusted-seed",
+        include_rows=True,
+    )
+    expected = schemas.SimulateResponse.model_validate(result).model_dump(
+        mode="json", by_alias=True
+    )
+    assert resp.json() == expected
+
+
+def test_simulate_negotiates_columnar_rows_and_gzip() -> None:
+    payload = {
+        "scenario": "custom",
+        "seasons": 20,
+        "replications": 10,
+        "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+        "seed": "columnar-seed",
+        "includeRows": True,
+    }
+    rows = client.post("/api/simulate", json=payload).json()["rows"]
+    resp = client.post(
+        "/api/simulate",
+        json=payload,
+        headers={
+            "Accept": "application/vnd.rice-yield.columnar+json",
+            "Accept-Encoding": "gzip",
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/vnd.rice-yield.columnar+json")
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept" in resp.headers["vary"]
+    columns = resp.json()["rows"]
+    assert list(columns) == list(rows[0])
+    assert [dict(zip(columns, values)) for values in zip(*columns.values())] == rows
+
+
+def test_simulation_columnar_read_has_its_own_etag() -> None:
+    simulation_id = client.post("/api/simulations/run", json=_run_payload()).json()["id"]
+    plain = client.get(f"/api/simulations/{simulation_id}")
+    columnar = client.get(
+        f"/api/simulations/{simulation_id}",
+        headers={"Accept": "application/vnd.rice-yield.columnar+json"},
+    )
+    assert columnar.status_code == 200
+    assert columnar.headers["etag"] != plain.headers["etag"]
+
+    seasons = plain.json()["runs"][0]["seasons"]
+    columns = columnar.json()["runs"][0]["seasons"]
+    assert columns["seasonIndex"] == [season["seasonIndex"] for season in seasons]
+    assert columns["yield"] == [season["yield"] for season in seasons]
+
+    cached = client.get(
+        f"/api/simulations/{simulation_id}",
+        headers={
+            "Accept": "application/vnd.rice-yield.columnar+json",
+            "If-None-Match": plain.headers["etag"],
+        },
+    )
+    assert cached.status_code == 200
+
+
+def test_compressed_simulation_read_has_its_own_etag() -> None:
+    # Enough seasons to pass the gzip size threshold.
+    payload = {**_run_payload(), "numSeasons": 40}
+    simulation_id = client.post("/api/simulations/run", json=payload).json()["id"]
+    url = f"/api/simulations/{simulation_id}"
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == identity.json()
+
+    etag = identity.headers["etag"]
+    assert gzipped.headers["etag"] == http_cache.coded_etag(etag, "gzip")
+    for resp in (identity, gzipped):
+        assert "Accept-Encoding" in resp.headers["vary"]
+        assert "Accept" in resp.headers["vary"]
+
+    # Either tag revalidates, and the 304 carries the tag the client holds.
+    for held, encoding in ((etag, "identity"), (gzipped.headers["etag"], "gzip")):
+        cached = client.get(
+            url, headers={"If-None-Match": held, "Accept-Encoding": encoding}
+        )
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == held
+        assert "Accept-Encoding" in cached.headers["vary"]
+
+
+def test_simulate_batch_reports_per_item_errors() -> None:
+    valid = {
+        "scenario": "custom",
+        "seasons": 3,
+        "replications": 2,
+        "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+        "seed": "batch-seed",
+    }
+    invalid = {**valid, "probabilities": {"low": 0.2, "normal": 0.2, "high": 0.2}}
+    resp = client.post("/api/simulate/batch", json={"items": [valid, invalid, valid]})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert [item["status"] for item in results] == ["ok", "error", "ok"]
+    assert "probabilities" in results[1]["error"]
+    assert results[0]["result"] == results[2]["result"]
+
+    single = client.post("/api/simulate", json=valid).json()
+    assert results[0]["result"] == single
+
+
 def test_compare_endpoint() -> None:
     resp = client.post(
         "/api/compare",
@@ -212,6 +719,165 @@ def test_compare_endpoint() -> None:
     assert len(data["scenarios"]) == 5
 
 
+def _sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_endpoints_end_with_the_regular_result() -> None:
+    compare_payload = {"seasons": 4, "replications": 3, "seed": "stream-seed"}
+    resp = client.post("/api/compare/stream", json=compare_payload)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(resp.text)
+    assert [name for name, _ in events] == ["scenario"] * 5 + ["result"]
+    assert events[-1][1] == client.post("/api/compare", json=compare_payload).json()
+    assert events[0][1]["overall"] == events[-1][1]["scenarios"][0]["overall"]
+
+    simulate_payload = {
+        "scenario": "custom",
+        "seasons": 5,
+        "replications": 4,
+        "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+        "seed": "stream-seed",
+    }
+    events = _sse_events(client.post("/api/simulate/stream", json=simulate_payload).text)
+    assert [name for name, _ in events] == ["progress"] * 4 + ["result"]
+    assert [data["completed"] for _, data in events[:-1]] == [1, 2, 3, 4]
+    result = events[-1][1]
+    assert result == client.post("/api/simulate", json=simulate_payload).json()
+    assert events[-2][1]["overall"] == result["overall"]
+    assert [data["replicationResult"] for _, data in events[:-1]] == result[
+        "replicationResults"
+    ]
+
+
+def test_simulation_deadline_cancels_engine_work(monkeypatch) -> None:
+    monkeypatch.setattr(app_main, "SIMULATION_TIMEOUT", 1e-9)
+    simulate = client.post(
+        "/api/simulate",
+        json={
+            "scenario": "custom",
+            "seasons": 5,
+            "replications": 5,
+            "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+        },
+    )
+    assert simulate.status_code == 503
+    assert "deadline" in simulate.json()["detail"]
+
+    batch = client.post(
+        "/api/simulate/batch",
+        json={
+            "items": [
+                {
+                    "scenario": "custom",
+                    "seasons": 5,
+                    "replications": 5,
+                    "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+                }
+            ]
+        },
+    )
+    assert batch.status_code == 503
+    assert "deadline" in batch.json()["detail"]
+
+    run = client.post("/api/simulations/run", json=_run_payload())
+    assert run.status_code == 503
+    assert client.get("/api/simulations").json()["total"] == 0
+
+    events = _sse_events(
+        client.post("/api/compare/stream", json={"seasons": 3, "replications": 2}).text
+    )
+    assert [name for name, _ in events] == ["error"]
+
+
+def test_disconnect_trips_the_cancellation_token() -> None:
+    async def receive() -> dict[str, str]:
+        return {"type": "http.disconnect"}
+
+    async def watch() -> CancellationToken:
+        token = CancellationToken()
+        request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+        await asyncio.wait_for(app_main._cancel_on_disconnect(request, token), 1)
+        return token
+
+    token = asyncio.run(watch())
+    assert token.cancelled
+    assert token.reason == "client disconnected"
+    with pytest.raises(Cancelled):
+        arena_engine.compare(seasons=3, replications=2, seed="x", cancel=token)
+
+
+_DISCONNECT_SIMULATE = {
+    "scenario": "drought",
+    "seasons": 3,
+    "replications": 2,
+    "probabilities": {"low": 0.6, "normal": 0.3, "high": 0.1},
+}
+
+
+@pytest.mark.parametrize(
+    ("path", "engine_function", "body"),
+    [
+        (
+            "/api/simulate",
+            "simulate",
+            _DISCONNECT_SIMULATE,
+        ),
+        (
+            "/api/simulate/batch",
+            "simulate_batch",
+            {"items": [_DISCONNECT_SIMULATE]},
+        ),
+    ],
+)
+def test_client_disconnect_cancels_endpoint_work(
+    monkeypatch, path: str, engine_function: str, body: dict[str, object]
+) -> None:
+    def wait_for_cancel(*_args, cancel: CancellationToken, **_kwargs):
+        for _ in range(200):
+            cancel.raise_if_cancelled()
+            time.sleep(0.01)
+        raise AssertionError("the endpoint did not cancel on disconnect")
+
+    monkeypatch.setattr(arena_engine, engine_function, wait_for_cancel)
+    messages = [
+        {"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}
+    ]
+    sent: list[dict[str, object]] = []
+
+    async def receive() -> dict[str, object]:
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message: dict[str, object]) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+        "app": app_main.app,
+    }
+    asyncio.run(app_main.app(scope, receive, send))
+
+    assert sent[0]["status"] == 503
+    body_bytes = b"".join(m.get("body", b"") for m in sent[1:])
+    assert "client disconnected" in json.loads(body_bytes)["detail"]
+
+
 def test_simulate_rejects_invalid_probabilities() -> None:
     resp = client.post(
         "/api/simulate",
@@ -223,3 +889,202 @@ def test_simulate_rejects_invalid_probabilities() -> None:
         },
     )
     assert resp.status_code == 422
+
+
+def test_simulate_accepts_rainfall_categories() -> None:
+    body = {
+        "scenario": "custom",
+        "seasons": 4,
+        "replications": 2,
+        "seed": "bins",
+        "includeRows": True,
+        "categories": [
+            {"name": "dry", "probability": 0.3, "yield": 2.0},
+            {"name": "moist", "probability": 0.3, "yield": 3.5},
+            {"name": "wet", "probability": 0.4, "yield": 4.0},
+        ],
+    }
+    resp = client.post("/api/simulate", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["probabilities"] is None
+    assert data["categories"] == body["categories"]
+    assert {row["rainfall"] for row in data["rows"]} <= {"dry", "moist", "wet"}
+
+    both = {**body, "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3}}
+    assert client.post("/api/simulate", json=both).status_code == 422
+    unbalanced = {**body, "categories": body["categories"][:2]}
+    assert client.post("/api/simulate", json=unbalanced).status_code == 422
+
+
+def test_simulate_fields_endpoint() -> None:
+    body = {
+        "seasons": 3,
+        "replications": 2,
+        "correlation": 0.5,
+        "seed": "coop",
+        "fields": [
+            {
+                "name": "a",
+                "plots": 100,
+                "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+                "yields": {"low": 1.0, "normal": 4.0, "high": 3.0},
+            },
+            {
+                "name": "b",
+                "categories": [
+                    {"name": "dry", "probability": 0.4, "yield": 2.0},
+                    {"name": "wet", "probability": 0.6, "yield": 5.0},
+                ],
+            },
+        ],
+    }
+    resp = client.post("/api/simulate/fields", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["fieldSeasons"] == 2 * 3 * 2
+    assert data["plotSeasons"] == 101 * 3 * 2
+    assert [field["name"] for field in data["fields"]] == ["a", "b"]
+    assert data["fields"][1]["rainfallCounts"][0]["name"] == "dry"
+    assert data["regional"]["lowYieldRate"] <= 1
+
+    duplicate = {**body, "fields": [body["fields"][0], body["fields"][0]]}
+    assert client.post("/api/simulate/fields", json=duplicate).status_code == 422
+
+    # The largest shapes are rejected up front instead of timing out; fields
+    # of several plots count as more work than single plots.
+    single_plots = [
+        {"name": f"plot-{index}", "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3}}
+        for index in range(10_000)
+    ]
+    admitted = schemas.FieldsSimulateRequest.model_validate(
+        {"seasons": 50, "replications": 66, "fields": single_plots}
+    )
+    assert len(admitted.fields) == 10_000
+    too_large = {
+        **body,
+        "seasons": 50,
+        "replications": 100,
+        "fields": [
+            {**body["fields"][0], "name": f"field-{index}"} for index in range(1000)
+        ],
+    }
+    rejected = client.post("/api/simulate/fields", json=too_large)
+    assert rejected.status_code == 422
+    assert "fields x categories" in json.dumps(rejected.json())
+
+
+def test_compare_risk_section() -> None:
+    resp = client.post(
+        "/api/compare",
+        json={"seasons": 5, "replications": 4, "seed": "risk", "risk": {"level": 0.75}},
+    )
+    assert resp.status_code == 200
+    risk = resp.json()["scenarios"][0]["risk"]
+    assert risk["level"] == 0.75
+    assert risk["consecutiveLowSeasons"] == 3
+    assert risk["conditionalValueAtRisk"] <= risk["valueAtRisk"]
+
+
+def test_compare_bootstrap_section() -> None:
+    body = {
+        "seasons": 5,
+        "replications": 6,
+        "seed": "boot",
+        "bootstrap": {"resamples": 200},
+    }
+    resp = client.post("/api/compare", json=body)
+    assert resp.status_code == 200
+    bootstrap = resp.json()["bootstrap"]
+    assert bootstrap["resamples"] == 200
+    assert {"scenarioA", "scenarioB", "significant"} <= set(bootstrap["differences"][0])
+
+
+def test_simulate_historical_requires_a_known_series(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("RAINFALL_DATA_DIR", str(tmp_path))
+    (tmp_path / "station.csv").write_text("rain\n120\n480\n910\n300\n")
+    body = {
+        "scenario": "custom",
+        "seasons": 4,
+        "replications": 2,
+        "seed": "hist",
+        "historical": {"series": "station", "lowBelow": 200, "highAbove": 900},
+    }
+    resp = client.post("/api/simulate", json=body)
+    assert resp.status_code == 200
+    assert resp.json()["historical"]["blockLength"] == 3
+
+    missing = {**body, "historical": {**body["historical"], "series": "nowhere"}}
+    assert client.post("/api/simulate", json=missing).status_code == 422
+    assert client.post("/api/simulate/stream", json=missing).status_code == 422
+
+
+def test_simulate_chart_section() -> None:
+    resp = client.post(
+        "/api/simulate",
+        json={
+            "scenario": "custom",
+            "seasons": 5,
+            "replications": 3,
+            "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+            "seed": "chart",
+            "chart": {"histogramBins": 5},
+        },
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["rows"] is None
+    assert [band["season"] for band in data["chart"]["seasons"]] == [1, 2, 3, 4, 5]
+    assert {"meanYield", "minYield", "maxYield"} <= set(data["chart"]["seasons"][0])
+    assert sum(entry["count"] for entry in data["chart"]["histogram"]) == 15
+
+
+def test_query_log_counts_statements_per_endpoint_and_captures_plans() -> None:
+    assert client.get("/api/debug/queries").status_code == 404
+
+    client.post("/api/simulations/execute", json=_run_payload())
+    engine = app_db.get_engine()
+    query_log.install(engine, 0)
+    try:
+        assert client.delete("/api/debug/queries").status_code == 204
+        assert client.get("/api/simulations", params={"limit": 5}).status_code == 200
+        assert client.get("/api/simulations", params={"limit": 5}).status_code == 200
+
+        response = client.get("/api/debug/queries")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["slowThresholdMs"] == 0
+        listing = next(
+            entry for entry in body["endpoints"] if entry["endpoint"] == "GET /api/simulations"
+        )
+        assert listing["requests"] == 2
+        assert listing["statements"] >= 2
+        assert listing["slowStatements"] == listing["statements"]
+        slow = [q for q in body["slowQueries"] if q["endpoint"] == "GET /api/simulations"]
+        assert slow and all(q["plan"] for q in slow)
+        assert any(q["statement"].lstrip().upper().startswith("SELECT") for q in slow)
+    finally:
+        query_log.uninstall(engine)
+        query_log.reset()
+    assert client.get("/api/debug/queries").status_code == 404
+
+
+def test_query_log_timing_survives_failing_statements() -> None:
+    engine = create_engine("sqlite+pysqlite://")
+    query_log.install(engine, 0)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(Exception):
+                connection.exec_driver_sql("SELECT * FROM missing_table")
+            time.sleep(0.2)
+            query_log.reset()
+            connection.exec_driver_sql("SELECT 1").all()
+            leftovers = [key for key in connection.info if key.startswith("query_log")]
+        (entry,) = query_log.snapshot()["slow_queries"]
+        assert entry["statement"] == "SELECT 1"
+        assert entry["duration_ms"] < 100
+        assert leftovers == []
+    finally:
+        query_log.uninstall(engine)
+        query_log.reset()
+        engine.dispose()
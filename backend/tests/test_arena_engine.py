@@ -2,6 +2,9 @@ import pytest
 
 from backend.app import schemas
 from backend.app.simulation import arena_engine
+from backend.app.simulation.categorical import CategoricalSampler
+from backend.app.simulation.risk import RiskAccumulator
+from backend.app.simulation.stats import mean_confidence_interval
 
 
 def test_probability_sum_validation() -> None:
@@ -55,3 +58,262 @@ def test_replication_aggregation_correctness() -> None:
     for rep in replication_results:
         assert rep["mean_yield"] == 4.0
         assert rep["sd_yield"] == 0.0
+
+
+class _StepClock:
+    """Monotonic clock that advances 10 ms every time it is read."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        self.now += 0.01
+        return self.now
+
+
+@pytest.mark.parametrize(
+    ("count", "t_quantile"),
+    # Student's t 97.5% quantiles for df = 30, 31, 60 and 99.
+    [(31, 2.0423), (32, 2.0395), (61, 2.0003), (100, 1.9842)],
+)
+def test_mean_confidence_interval_uses_the_t_quantile(count, t_quantile) -> None:
+    values = [float(index % 2) for index in range(count)]
+    mean = sum(values) / count
+    std_error = (sum((v - mean) ** 2 for v in values) / (count - 1) / count) ** 0.5
+    low, high = mean_confidence_interval(values)
+    assert (high - low) / 2 / std_error == pytest.approx(t_quantile, abs=5e-4)
+
+
+def test_time_budget_returns_completed_prefix(monkeypatch) -> None:
+    kwargs = {
+        "scenario": "custom",
+        "seasons": 10,
+        "replications": 20,
+        "probabilities": {"low": 0.3, "normal": 0.4, "high": 0.3},
+        "seed": "budget-seed",
+    }
+    full = arena_engine.simulate(**kwargs)
+    assert full["completed_replications"] == 20
+    low, high = full["mean_yield_ci"]["low"], full["mean_yield_ci"]["high"]
+    assert low <= full["overall"]["mean_yield"] <= high
+
+    monkeypatch.setattr(arena_engine, "time", _StepClock())
+    partial = arena_engine.simulate(**kwargs, time_budget_ms=45)
+
+    completed = partial["completed_replications"]
+    assert 1 <= completed < 20
+    assert partial["replications"] == 20
+    assert partial["replication_results"] == full["replication_results"][:completed]
+    if completed >= 2:
+        partial_width = partial["mean_yield_ci"]["high"] - partial["mean_yield_ci"]["low"]
+        assert partial_width > high - low
+
+
+def test_stratified_sampling_balances_rainfall_across_replications() -> None:
+    kwargs = {
+        "scenario": "drought",
+        "seasons": 8,
+        "replications": 40,
+        "probabilities": {"low": 0.15, "normal": 0.35, "high": 0.5},
+        "seed": "strata",
+        "include_rows": True,
+    }
+    stratified = arena_engine.simulate(**kwargs, sampling="stratified")
+    assert stratified["sampling"] == "stratified"
+    assert stratified == arena_engine.simulate(**kwargs, sampling="stratified")
+
+    # Each season's draws cover the strata once, so the number of low seasons
+    # across replications is within one of replications * p(low).
+    for season in range(1, 9):
+        lows = sum(
+            1
+            for row in stratified["rows"]
+            if row["season"] == season and row["rainfall"] == "low"
+        )
+        assert abs(lows - 40 * 0.15) <= 1
+
+    batch = arena_engine.simulate_batch([{**kwargs, "sampling": "stratified"}, kwargs])
+    assert batch[0]["result"] == stratified
+    assert batch[1]["result"] == arena_engine.simulate(**kwargs)
+
+
+def test_pcg32_rng_is_seeded_and_independent_of_legacy() -> None:
+    kwargs = {
+        "scenario": "custom",
+        "seasons": 6,
+        "replications": 4,
+        "probabilities": {"low": 0.3, "normal": 0.4, "high": 0.3},
+        "seed": "pcg",
+        "include_rows": True,
+    }
+    pcg = arena_engine.simulate(**kwargs, rng_kind="pcg32")
+    assert pcg["rng"] == "pcg32"
+    assert pcg == arena_engine.simulate(**kwargs, rng_kind="pcg32")
+    assert pcg["rows"] != arena_engine.simulate(**kwargs)["rows"]
+
+
+def test_categorical_sampler_matches_legacy_cutoffs_and_alias_weights() -> None:
+    probabilities = {"low": 0.2, "normal": 0.5, "high": 0.3}
+    sampler = CategoricalSampler.rainfall(probabilities)
+    draws = [i / 1000 for i in range(1000)] + [0.2, 0.7, 0.999999]
+    assert sampler.sample_many(draws) == [
+        arena_engine.rainfall_for_roll(probabilities, draw) for draw in draws
+    ]
+
+    weights = [0.05, 0.1, 0.2, 0.3, 0.2, 0.1, 0.05]
+    alias = CategoricalSampler([str(i) for i in range(7)], weights, method="alias")
+    grid = 70000
+    counts = {label: 0 for label in alias.labels}
+    for i in range(grid):
+        counts[alias.sample((i + 0.5) / grid)] += 1
+    # A uniform grid of draws lands in each category in proportion to its weight.
+    for label, weight in zip(alias.labels, weights):
+        assert counts[label] == pytest.approx(weight * grid, abs=2)
+
+
+def test_simulate_with_rainfall_categories() -> None:
+    categories = [
+        {"name": "very_dry", "probability": 0.1, "yield": 1.0},
+        {"name": "dry", "probability": 0.2, "yield": 2.0},
+        {"name": "normal", "probability": 0.4, "yield": 4.0},
+        {"name": "wet", "probability": 0.2, "yield": 3.5},
+        {"name": "flood", "probability": 0.1, "yield": 1.5},
+    ]
+    kwargs = {
+        "scenario": "custom",
+        "seasons": 10,
+        "replications": 30,
+        "probabilities": None,
+        "seed": "bins",
+        "include_rows": True,
+        "categories": categories,
+    }
+    result = arena_engine.simulate(**kwargs)
+    assert result["probabilities"] is None
+    assert result["categories"] == categories
+    assert result == arena_engine.simulate(**kwargs)
+
+    yield_by_name = {category["name"]: category["yield"] for category in categories}
+    assert {row["rainfall"] for row in result["rows"]} == set(yield_by_name)
+    assert all(row["yield"] == yield_by_name[row["rainfall"]] for row in result["rows"])
+    low_rows = sum(1 for row in result["rows"] if row["yield"] <= 2.0)
+    assert result["overall"]["low_yield_count"] == low_rows
+
+    stratified = arena_engine.simulate(**kwargs, sampling="stratified")
+    for season in range(1, 11):
+        floods = sum(
+            1
+            for row in stratified["rows"]
+            if row["season"] == season and row["rainfall"] == "flood"
+        )
+        assert abs(floods - 30 * 0.1) <= 1
+
+    with pytest.raises(ValueError):
+        arena_engine.simulate(**{**kwargs, "categories": categories + categories[:1]})
+
+
+def test_risk_accumulator_tail_and_streaks() -> None:
+    accumulator = RiskAccumulator(level=0.8, consecutive_low_seasons=2, low_threshold=2.0)
+    for yields in (
+        [2.0, 2.0, 4.0],
+        [4.0, 2.0, 4.0],
+        [3.0, 3.0, 3.0],
+        [2.0, 4.0, 2.0],
+        [4.0, 4.0, 4.0],
+    ):
+        accumulator.add_replication(iter(yields))
+    risk = accumulator.result()
+    # Totals 8, 10, 9, 8, 12: the worst 20% is one replication.
+    assert risk["value_at_risk"] == 8.0
+    assert risk["conditional_value_at_risk"] == 8.0
+    assert risk["cumulative_yield_mean"] == 9.4
+    assert risk["consecutive_low_probability"] == 0.2
+
+
+def test_simulate_and_compare_risk_sections_are_opt_in() -> None:
+    kwargs = {
+        "scenario": "drought",
+        "seasons": 12,
+        "replications": 40,
+        "probabilities": {"low": 0.4, "normal": 0.4, "high": 0.2},
+        "seed": "risk",
+    }
+    plain = arena_engine.simulate(**kwargs)
+    assert plain["risk"] is None
+    risky = arena_engine.simulate(
+        **kwargs, risk={"level": 0.9, "consecutive_low_seasons": 3}
+    )
+    assert risky["overall"] == plain["overall"]
+    risk = risky["risk"]
+    assert risk["conditional_value_at_risk"] <= risk["value_at_risk"]
+    assert risk["value_at_risk"] <= risk["cumulative_yield_mean"]
+    assert risk["cumulative_yield_mean"] == pytest.approx(
+        plain["overall"]["mean_yield"] * 12, abs=0.1
+    )
+    assert 0 < risk["consecutive_low_probability"] < 1
+
+    compared = arena_engine.compare(
+        seasons=6,
+        replications=5,
+        seed="risk",
+        risk={"level": 0.95, "consecutive_low_seasons": 2},
+    )
+    assert all(scenario["risk"]["level"] == 0.95 for scenario in compared["scenarios"])
+
+
+def test_compare_bootstrap_is_seeded_and_flags_differences() -> None:
+    options = {"resamples": 400, "level": 0.9}
+    result = arena_engine.compare(
+        seasons=15, replications=30, seed="boot", bootstrap=options
+    )
+    plain = arena_engine.compare(seasons=15, replications=30, seed="boot")
+    assert plain["bootstrap"] is None
+    assert result == arena_engine.compare(
+        seasons=15, replications=30, seed="boot", bootstrap=options
+    )
+
+    bootstrap = result["bootstrap"]
+    keys = [scenario["scenario"] for scenario in result["scenarios"]]
+    assert [entry["scenario"] for entry in bootstrap["scenarios"]] == keys
+    assert len(bootstrap["differences"]) == len(keys) * (len(keys) - 1) // 2
+    for entry in bootstrap["scenarios"]:
+        assert entry["low"] <= entry["mean_yield"] <= entry["high"]
+    for entry in bootstrap["differences"]:
+        assert entry["low"] <= entry["high"]
+        assert entry["significant"] == (entry["low"] > 0 or entry["high"] < 0)
+    drought_vs_normal = next(
+        entry
+        for entry in bootstrap["differences"]
+        if (entry["scenario_a"], entry["scenario_b"]) == ("drought", "normal_rainfall")
+    )
+    assert drought_vs_normal["significant"]
+
+
+def test_chart_bands_and_histogram_match_the_rows() -> None:
+    kwargs = {
+        "scenario": "custom",
+        "seasons": 6,
+        "replications": 15,
+        "probabilities": {"low": 0.3, "normal": 0.4, "high": 0.3},
+        "seed": "chart",
+        "include_rows": True,
+    }
+    result = arena_engine.simulate(**kwargs, chart={"histogram_bins": 4})
+    assert arena_engine.simulate(**kwargs)["chart"] is None
+    chart = result["chart"]
+
+    for band in chart["seasons"]:
+        values = [
+            row["yield"] for row in result["rows"] if row["season"] == band["season"]
+        ]
+        assert band["mean_yield"] == round(sum(values) / len(values) + 1e-12, 2)
+        assert band["min_yield"] == min(values)
+        assert band["max_yield"] == max(values)
+
+    histogram = chart["histogram"]
+    assert len(histogram) == 4
+    assert histogram[0]["low"] == result["overall"]["min_yield"]
+    assert histogram[-1]["high"] == result["overall"]["max_yield"]
+    assert sum(entry["count"] for entry in histogram) == 6 * 15
+    low_rows = sum(1 for row in result["rows"] if row["yield"] == 2.0)
+    assert histogram[0]["count"] == low_rows
@@ -0,0 +1,20 @@
+import pytest
+
+from backend.app.simulation import conformance
+
+
+def test_reference_engine_matches_golden_digests() -> None:
+    golden = conformance.load_golden()
+    current = conformance.golden_digests()
+    assert current.keys() == golden.keys()
+    drifted = sorted(case for case in golden if golden[case] != current[case])
+    assert drifted == []
+
+
+@pytest.mark.parametrize(
+    "name", sorted(set(conformance.BACKENDS) - {conformance.REFERENCE})
+)
+def test_registered_backends_reproduce_the_reference(name: str) -> None:
+    report = conformance.differential(name)
+    assert report
+    assert [entry["case"] for entry in report if not entry["match"]] == []
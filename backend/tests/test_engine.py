@@ -1,5 +1,6 @@
 from backend.app.schemas import RainfallProbabilities, SimulationExecuteRequest
 from backend.app.simulation.engine import build_simulation_payload
+from backend.app.simulation.stats import RunningStats
 
 
 def test_build_simulation_payload_is_deterministic():
@@ -35,3 +36,40 @@ def test_all_scenarios_generates_five_runs():
 
     assert len(payload.runs) == 5
     assert payload.num_replications == 5
+
+
+def test_running_stats_merge_matches_single_pass():
+    values = [2.0, 4.0, 3.0, 4.0, 2.0, 2.5, 3.5]
+    merged = RunningStats.from_values(values[:3]).merge(RunningStats.from_values(values[3:]))
+    whole = RunningStats.from_values(values)
+
+    assert merged.count == whole.count
+    assert merged.total == whole.total
+    assert abs(merged.m2 - whole.m2) < 1e-9
+    assert (merged.minimum, merged.maximum) == (whole.minimum, whole.maximum)
+    assert RunningStats().merge(whole) == whole
+
+
+def test_rng_kernels_match_legacy_closures_and_bulk_fill():
+    from backend.app.simulation.arena_engine import _make_rng
+    from backend.app.simulation.engine import _seeded_random
+    from backend.app.simulation.rng import LegacyLcg31, LegacyLcg32, Pcg32
+
+    # Reference closures as they were written before the shared kernel.
+    def glibc(seed):
+        state = seed & 0x7FFFFFFF
+        for _ in range(50):
+            state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+            yield state / 0x7FFFFFFF
+
+    legacy31 = _seeded_random(12345)
+    assert [legacy31() for _ in range(50)] == list(glibc(12345))
+    assert LegacyLcg31(12345).fill(50) == list(glibc(12345))
+
+    scalar = _make_rng("seed|custom|1")
+    assert LegacyLcg32("seed|custom|1").fill(20) == [scalar() for _ in range(20)]
+
+    # Reference output of pcg32-global-demo (seed 42, sequence 54).
+    first = [0xA15C02B7, 0x7B47F409, 0xBA1D3330, 0x83D2F293, 0xBFA4784B, 0xCBED606E]
+    assert Pcg32(42, 54).fill(6) == [value / 2**32 for value in first]
+    assert Pcg32.from_key("s", "a", 1).fill(4) != Pcg32.from_key("s", "a", 2).fill(4)
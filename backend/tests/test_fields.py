@@ -0,0 +1,99 @@
+import pytest
+
+from backend.app.simulation.fields import binomial, multinomial, simulate_fields
+from backend.app.simulation.rng import Pcg32
+
+FIELDS = [
+    {
+        "name": "north",
+        "plots": 2000,
+        "probabilities": {"low": 0.2, "normal": 0.5, "high": 0.3},
+    },
+    {
+        "name": "river",
+        "plots": 500,
+        "categories": [
+            {"name": "dry", "probability": 0.3, "yield": 1.5},
+            {"name": "fair", "probability": 0.5, "yield": 3.0},
+            {"name": "wet", "probability": 0.2, "yield": 4.5},
+        ],
+    },
+]
+
+
+def test_binomial_and_multinomial_moments() -> None:
+    rng = Pcg32(11, 5)
+    for n, p in [(8, 0.25), (400, 0.3), (400, 0.8)]:
+        draws = [binomial(n, p, rng) for _ in range(4000)]
+        assert all(0 <= draw <= n for draw in draws)
+        assert sum(draws) / len(draws) == pytest.approx(n * p, rel=0.02)
+
+    counts = multinomial(10_000, [0.2, 0.5, 0.3], rng)
+    assert sum(counts) == 10_000
+    assert counts[1] == pytest.approx(5000, abs=250)
+
+
+def test_simulate_fields_counts_every_plot_season() -> None:
+    result = simulate_fields(
+        fields=FIELDS, seasons=6, replications=5, correlation=0.3, seed="coop"
+    )
+    assert result == simulate_fields(
+        fields=FIELDS, seasons=6, replications=5, correlation=0.3, seed="coop"
+    )
+    assert result["field_seasons"] == 2 * 6 * 5
+    assert result["plot_seasons"] == 2500 * 6 * 5
+
+    north, river = result["fields"]
+    assert [entry["name"] for entry in river["rainfall_counts"]] == ["dry", "fair", "wet"]
+    assert sum(entry["count"] for entry in north["rainfall_counts"]) == 2000 * 30
+    assert river["overall"]["low_yield_count"] == river["rainfall_counts"][0]["count"]
+    assert result["pooled"]["low_yield_count"] == (
+        north["overall"]["low_yield_count"] + river["overall"]["low_yield_count"]
+    )
+    assert result["pooled"]["min_yield"] == 1.5
+    assert result["pooled"]["max_yield"] == 4.5
+
+
+def test_correlation_widens_regional_spread() -> None:
+    kwargs = {"fields": FIELDS[:1], "seasons": 20, "replications": 10, "seed": "rho"}
+    independent = simulate_fields(**kwargs, correlation=0.0)
+    correlated = simulate_fields(**kwargs, correlation=0.8)
+    locked = simulate_fields(**kwargs, correlation=1.0)
+
+    assert independent["regional"]["sd_yield"] < correlated["regional"]["sd_yield"]
+    # With perfect correlation every plot shares the season's rainfall.
+    assert locked["regional"]["min_yield"] == 2.0
+    assert locked["regional"]["low_yield_count"] > 0
+    assert locked["fields"][0]["rainfall_counts"][0]["count"] % 2000 == 0
+
+
+@pytest.mark.parametrize("correlation", [0.0, 0.6, 1.0])
+def test_single_plot_columns_match_one_multinomial_field(correlation: float) -> None:
+    probabilities = {"low": 0.2, "normal": 0.5, "high": 0.3}
+    kwargs = {"seasons": 20, "replications": 20, "correlation": correlation}
+    columns = simulate_fields(
+        fields=[
+            {"name": f"plot-{index}", "probabilities": probabilities}
+            for index in range(300)
+        ],
+        seed="columns",
+        **kwargs,
+    )
+    grouped = simulate_fields(
+        fields=[{"name": "all", "plots": 300, "probabilities": probabilities}],
+        seed="grouped",
+        **kwargs,
+    )
+    assert columns["field_seasons"] == 300 * 400
+    assert columns["plot_seasons"] == grouped["plot_seasons"]
+    for field in columns["fields"]:
+        assert sum(entry["count"] for entry in field["rainfall_counts"]) == 400
+
+    low = sum(field["rainfall_counts"][0]["count"] for field in columns["fields"])
+    assert low / columns["plot_seasons"] == pytest.approx(0.2, abs=0.03)
+    assert columns["pooled"]["mean_yield"] == pytest.approx(
+        grouped["pooled"]["mean_yield"], abs=0.1
+    )
+    assert columns["regional"]["sd_yield"] == pytest.approx(
+        grouped["regional"]["sd_yield"], abs=0.05
+    )
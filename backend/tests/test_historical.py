@@ -0,0 +1,88 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.app.simulation import arena_engine
+from backend.app.simulation.historical import (
+    HistoricalDataError,
+    block_bootstrap,
+    classify,
+    open_series,
+)
+from backend.app.simulation.rng import Pcg32
+
+
+@pytest.fixture()
+def rainfall_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAINFALL_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_csv_series_is_converted_to_a_mapped_sidecar(rainfall_dir) -> None:
+    (rainfall_dir / "station.csv").write_text(
+        "year,rainfall_mm\n2001,410.5\n2002,780\n\n2003,1200.25\n"
+    )
+    series = open_series("station")
+    assert list(series.values) == [410.5, 780.0, 1200.25]
+    assert (rainfall_dir / "station.f64").stat().st_size == 3 * 8
+
+    with pytest.raises(HistoricalDataError):
+        open_series("missing")
+    with pytest.raises(HistoricalDataError):
+        open_series("../station")
+
+
+def test_concurrent_first_opens_convert_the_csv_once(rainfall_dir) -> None:
+    values = [float(index % 997) for index in range(200_000)]
+    (rainfall_dir / "st.csv").write_text("".join(f"{value}\n" for value in values))
+
+    def first_open(_index: int) -> list[float]:
+        return list(open_series("st").values[:5])
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(first_open, range(6)))
+    assert results == [values[:5]] * 6
+    assert list(open_series("st").values) == values
+    assert sorted(path.name for path in rainfall_dir.iterdir()) == ["st.csv", "st.f64"]
+
+
+def test_block_bootstrap_copies_contiguous_blocks() -> None:
+    values = [float(index) for index in range(100)]
+    resampled = block_bootstrap(values, 13, 4, Pcg32(3))
+    assert len(resampled) == 13
+    for start in range(0, 13, 4):
+        block = resampled[start : start + 4]
+        assert block == values[int(block[0]) : int(block[0]) + len(block)]
+
+    assert classify([100.0, 500.0, 900.0], 300.0, 900.0) == ["low", "normal", "high"]
+
+
+def test_simulate_with_historical_rainfall(rainfall_dir) -> None:
+    record = array("d", [200.0, 250.0, 650.0, 700.0, 1100.0, 640.0] * 20)
+    with (rainfall_dir / "basin.f64").open("wb") as handle:
+        record.tofile(handle)
+    historical = {
+        "series": "basin",
+        "block_length": 2,
+        "low_below": 300.0,
+        "high_above": 1000.0,
+    }
+    kwargs = {
+        "scenario": "custom",
+        "seasons": 10,
+        "replications": 6,
+        "probabilities": None,
+        "seed": "record",
+        "include_rows": True,
+        "historical": historical,
+    }
+    result = arena_engine.simulate(**kwargs)
+    assert result == arena_engine.simulate(**kwargs)
+    assert result["probabilities"] is None
+    assert result["historical"] == historical
+    yields = {"low": 2.0, "normal": 4.0, "high": 3.0}
+    assert all(row["yield"] == yields[row["rainfall"]] for row in result["rows"])
+
+    with pytest.raises(ValueError):
+        arena_engine.simulate(**{**kwargs, "historical": {**historical, "series": "x"}})
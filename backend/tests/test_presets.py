@@ -0,0 +1,68 @@
+import json
+import os
+from pathlib import Path
+
+from backend.app.simulation import presets
+from backend.app.simulation.categorical import normalize_probabilities
+
+
+def _write_presets(path: Path, low: float, mtime_ns: int) -> None:
+    path.write_text(
+        json.dumps(
+            [
+                {
+                    "id": 1,
+                    "key": "balanced",
+                    "name": "Balanced",
+                    "description": "Test preset",
+                    "probabilities": {"low": low, "normal": 0.5, "high": 0.5 - low},
+                }
+            ]
+        ),
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_indexes_presets() -> None:
+    table = presets.registry.table()
+    assert table.by_key["drought"]["id"] == 2
+    assert table.by_id[2]["key"] == "drought"
+    assert presets.get_preset_by_key("flood") is table.by_key["flood"]
+    assert presets.get_preset_by_id(2) is table.by_id[2]
+    # Compiled from the normalised probabilities, as the engine would build it.
+    drought = normalize_probabilities(table.by_key["drought"]["probabilities"])
+    assert table.samplers["drought"].cutoffs == (
+        drought["low"],
+        drought["low"] + drought["normal"],
+    )
+
+
+def test_registry_reloads_changed_file_and_notifies(tmp_path: Path) -> None:
+    path = tmp_path / "presets.json"
+    _write_presets(path, 0.2, 1_000_000_000)
+    registry = presets.PresetRegistry(path, check_interval=0)
+    notified = []
+    registry.subscribe(notified.append)
+
+    first = registry.table()
+    assert first.api[0]["default_probabilities"] == {"low": 20, "normal": 50, "high": 30}
+    assert registry.table() is first
+    assert notified == []
+
+    _write_presets(path, 0.1, 2_000_000_000)
+    second = registry.table()
+    assert second is not first
+    assert second.api[0]["default_probabilities"]["low"] == 10
+    assert notified == [second]
+
+
+def test_registry_keeps_previous_table_when_file_is_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "presets.json"
+    _write_presets(path, 0.2, 1_000_000_000)
+    registry = presets.PresetRegistry(path, check_interval=0)
+    first = registry.table()
+
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert registry.table() is first
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Self time of the backend's own modules; third-party imports are excluded.
+BACKEND_IMPORT_BUDGET_US = 400_000
+
+
+def _import_times(module: str, database_path: Path) -> list[tuple[int, int, str]]:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+pysqlite:///{database_path.as_posix()}"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def test_importing_app_does_not_touch_the_database(tmp_path: Path) -> None:
+    database_path = tmp_path / "cold_start.db"
+    entries = _import_times("backend.app.main", database_path)
+
+    assert not database_path.exists()
+
+    backend = [entry for entry in entries if entry[2].startswith("backend")]
+    total_self_us = sum(self_us for self_us, _, _ in backend)
+    report = "\n".join(
+        f"{self_us:>10} {cumulative_us:>10}  {name}"
+        for self_us, cumulative_us, name in sorted(backend, reverse=True)
+    )
+    print(f"\nbackend import time (self us, cumulative us):\n{report}")
+    assert total_self_us < BACKEND_IMPORT_BUDGET_US, report
+
+
+def test_simulation_engine_does_not_import_the_database_layer() -> None:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, backend.app.simulation.arena_engine; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] == 'sqlalchemy' "
+            "or m == 'backend.app.db'))",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
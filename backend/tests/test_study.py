@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app import schemas
+from backend.app.simulation import study
+from backend.app.simulation.engine import build_simulation_payload
+
+SPEC = schemas.StudySpec.model_validate(
+    {
+        "name": "Grid",
+        "scenarioIds": [1, 2],
+        "probabilityGrid": {"low": [10, 70], "high": [20, 40]},
+        "numSeasons": [4],
+        "numReplications": 3,
+        "seeds": [7, 8],
+    }
+)
+
+
+def test_study_jobs_cover_the_grid_with_stable_ids() -> None:
+    jobs = list(study.iter_jobs(SPEC))
+    # low 70 with high 40 exceeds 100 and is skipped: 3 mixes per scenario.
+    assert len(jobs) == 2 * 3 * 2
+    assert [job.index for job in jobs] == list(range(12))
+    assert [job.id for job in study.iter_jobs(SPEC)] == [job.id for job in jobs]
+    assert len({job.id for job in jobs}) == 12
+
+    preset = schemas.StudySpec.model_validate(
+        {"scenarioIds": [2], "numSeasons": [3], "numReplications": 1, "seeds": [1]}
+    )
+    (job,) = study.iter_jobs(preset)
+    assert job.request.probabilities.low == 60
+
+
+def test_shards_merge_into_the_full_run() -> None:
+    full = io.BytesIO()
+    assert study.run_study(SPEC, full, compact=True) == 12
+
+    shards = []
+    for index in range(3):
+        shard = io.BytesIO()
+        study.run_study(SPEC, shard, shard=(index, 3), compact=True)
+        shards.append(shard.getvalue())
+
+    records = [json.loads(line) for line in full.getvalue().splitlines()]
+    assert all(record["storageMode"] == "recompute" for record in records)
+    assert all(run["seasons"] == [] for record in records for run in record["runs"])
+    assert sum(len(shard.splitlines()) for shard in shards) == 12
+    assert sorted(b"".join(shards).splitlines()) == sorted(full.getvalue().splitlines())
+
+
+def test_merge_streams_shards_in_job_order(tmp_path) -> None:
+    paths = []
+    for index in range(2):
+        path = tmp_path / f"part-{index}.ndjson.gz"
+        with study.open_output(path) as output:
+            study.run_study(SPEC, output, shard=(index, 2), compact=True)
+        paths.append(path)
+
+    merged = io.BytesIO()
+    report = study.merge_outputs(SPEC, [paths[1], paths[0], paths[1]], merged)
+    assert report == {"written": 12, "missing": [], "unknown": 0}
+    full = io.BytesIO()
+    study.run_study(SPEC, full, compact=True)
+    assert merged.getvalue() == full.getvalue()
+
+    partial = study.merge_outputs(SPEC, [paths[0]], io.BytesIO())
+    assert partial["missing"] == list(range(1, 12, 2))
+
+
+def test_chunked_jobs_match_the_stored_simulation_payload(monkeypatch) -> None:
+    monkeypatch.setattr(study, "RUN_CHUNK", 2)
+    (job,) = study.iter_jobs(
+        schemas.StudySpec.model_validate(
+            {"scenarioIds": [3], "numSeasons": [5], "numReplications": 7, "seeds": [11]}
+        )
+    )
+    payload = build_simulation_payload(job.request).model_copy(update={"id": job.id})
+    assert study.run_job(job) == (
+        payload.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+    )
+
+    compact = json.loads(study.run_job(job, compact=True))
+    assert compact["storageMode"] == "recompute"
+    assert compact["checksum"] == payload.checksum
+    assert [run["seasons"] for run in compact["runs"]] == [[]] * 7
+    assert compact["averageYield"] == payload.average_yield
+
+
+def test_oversized_jobs_are_rejected() -> None:
+    with pytest.raises(ValidationError, match="add seeds"):
+        schemas.StudySpec.model_validate(
+            {
+                "scenarioIds": [1],
+                "numSeasons": [10, 50],
+                "numReplications": schemas.MAX_STUDY_JOB_SEASONS // 10,
+                "seeds": [1],
+            }
+        )